@@ -0,0 +1,76 @@
+"""
+Helpers to run a benchmark against another checkout of mirri.
+
+The benchmark script is run again in a subprocess with the other tree first
+in PYTHONPATH and asked for its results as JSON, so both versions are
+measured by the same code.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+JSON_FLAG = "--json"
+
+# this checkout is used when mirri is not installed. It goes last, so the
+# tree given in PYTHONPATH by run_in_tree wins.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+
+def add_compare_arguments(parser):
+    parser.add_argument("--compare-with", type=Path, default=None,
+                        help="Root of another mirri checkout to compare with, "
+                             "e.g. a git worktree of an older commit")
+    parser.add_argument(JSON_FLAG, action="store_true",
+                        help="Print the results as JSON")
+
+
+def run_in_tree(script, tree, argv):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(tree).resolve())] + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p])
+    command = [sys.executable, str(script)] + _strip_compare_args(argv) + [JSON_FLAG]
+    output = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE,
+                            universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _strip_compare_args(argv):
+    stripped = []
+    skip_next = False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+        elif arg == "--compare-with":
+            skip_next = True
+        elif arg.startswith("--compare-with=") or arg == JSON_FLAG:
+            continue
+        else:
+            stripped.append(arg)
+    return stripped
+
+
+def report(results, args, script, argv=None, fhand=sys.stdout):
+    """Print the results of this tree, and of the other one if asked for"""
+    if args.json:
+        fhand.write(json.dumps(results) + "\n")
+        return
+    columns = {"this tree": results}
+    if args.compare_with is not None:
+        argv = sys.argv[1:] if argv is None else argv
+        columns[str(args.compare_with)] = run_in_tree(script, args.compare_with, argv)
+
+    width = max(len(key) for key in results)
+    fhand.write(f"{'':{width}}  " + "  ".join(f"{label:>18}" for label in columns) + "\n")
+    for key in results:
+        values = [_format(column.get(key)) for column in columns.values()]
+        fhand.write(f"{key:{width}}  " + "  ".join(f"{value:>18}" for value in values) + "\n")
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
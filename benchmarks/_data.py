@@ -0,0 +1,17 @@
+"""Test data for the benchmarks"""
+from copy import deepcopy
+from pathlib import Path
+
+from mirri.io.parsers.mirri_excel import parse_mirri_excel
+
+TEST_EXCEL = Path(__file__).parent.parent / "tests" / "data" / "valid.mirri.full.xlsx"
+
+
+def get_test_strains(num_strains):
+    """The strains of the full test excel file, copied up to num_strains"""
+    with TEST_EXCEL.open("rb") as fhand:
+        templates = list(parse_mirri_excel(fhand, version="20200601")["strains"])
+    for index in range(num_strains):
+        strain = deepcopy(templates[index % len(templates)])
+        strain.id.number = str(index)
+        yield strain
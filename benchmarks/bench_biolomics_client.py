@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Requests per second of BiolomicsClient against a local stand-in server.
+
+The server, from tests/biolomics/fake_server.py, answers at once, so the
+time is the one of the client and of the connections it opens. The real
+server is reached over TLS, and every new connection costs more there.
+With --delay the server takes that long to answer, as a remote one, and
+with --concurrency the records are retrieved with AsyncBiolomicsMirriClient.
+
+    python benchmarks/bench_biolomics_client.py -n 2000
+    python benchmarks/bench_biolomics_client.py -n 500 --delay 0.05 --concurrency 32
+    python benchmarks/bench_biolomics_client.py --compare-with /path/to/old/checkout
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent / "tests" / "biolomics"))
+from _compare import add_compare_arguments, report  # noqa: E402
+from fake_server import FakeBiolomicsServer  # noqa: E402
+
+from mirri.biolomics.remote.rest_client import BiolomicsClient  # noqa: E402
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_requests", type=int, default=1000,
+                        help="Number of records to retrieve")
+    parser.add_argument("--delay", type=float, default=0,
+                        help="Seconds the server takes to answer")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Requests in flight, with the asyncio client")
+    add_compare_arguments(parser)
+    return parser.parse_args()
+
+
+def measure_client(num_requests, delay=0, concurrency=None):
+    # the token is fetched over http
+    os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
+    with FakeBiolomicsServer() as server:
+        if concurrency:
+            elapsed, connections = asyncio.run(
+                _measure_async_client(server, num_requests, delay, concurrency))
+        else:
+            client = BiolomicsClient(server.url, "v2", "client_id", "secret", "user",
+                                     "password")
+            server.delay = delay
+            connections = server.connections
+            start = time.perf_counter()
+            for record_id in range(num_requests):
+                client.retrieve("WS Strains", record_id).json()
+            elapsed = time.perf_counter() - start
+            connections = server.connections - connections
+            # the older trees do not close their connections
+            getattr(client, "close", lambda: None)()
+
+    return {"requests": num_requests, "requests/s": num_requests / elapsed,
+            "connections": connections}
+
+
+async def _measure_async_client(server, num_requests, delay, concurrency):
+    # the older trees do not have it
+    from mirri.biolomics.remote.async_client import AsyncBiolomicsMirriClient
+    from mirri.biolomics.remote.endoint_names import GROWTH_MEDIUM_WS
+
+    client = await AsyncBiolomicsMirriClient.connect(
+        server.url, "v2", "client_id", "secret", "user", "password",
+        concurrency=concurrency)
+    async with client:
+        server.delay = delay
+        connections = server.connections
+        start = time.perf_counter()
+        await asyncio.gather(*[client.retrieve_by_id(GROWTH_MEDIUM_WS, record_id)
+                               for record_id in range(num_requests)])
+        elapsed = time.perf_counter() - start
+    return elapsed, server.connections - connections
+
+
+def main():
+    args = get_cmd_args()
+    report(measure_client(args.num_requests, delay=args.delay,
+                          concurrency=args.concurrency), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Speed of the entity codec.
+
+Encodes the strains with dict() and with the codec, and dumps and loads them
+as a JSON and, if msgpack is installed, a msgpack catalog.
+
+    python benchmarks/bench_codec.py -n 20000
+"""
+import argparse
+import json
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import report  # noqa: E402
+from _data import get_test_strains  # noqa: E402
+
+from mirri.io import codec  # noqa: E402
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_strains", type=int, default=5000,
+                        help="Number of strains to encode")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the results as JSON")
+    return parser.parse_args()
+
+
+def _strains_per_second(function, num_strains):
+    start = time.perf_counter()
+    result = function()
+    return num_strains / (time.perf_counter() - start), result
+
+
+def measure_codec(num_strains):
+    strains = list(get_test_strains(num_strains))
+    results = {"strains": num_strains}
+
+    results["dict() strains/s"], _ = _strains_per_second(
+        lambda: [strain.dict() for strain in strains], num_strains)
+    results["encode strains/s"], encoded = _strains_per_second(
+        lambda: [codec.encode(strain) for strain in strains], num_strains)
+    strain_class = strains[0].__class__
+    results["decode strains/s"], _ = _strains_per_second(
+        lambda: [codec.decode(data, strain_class) for data in encoded], num_strains)
+
+    def dump_dicts():
+        fhand = BytesIO()
+        for strain in strains:
+            fhand.write(json.dumps(strain.dict()).encode("utf-8") + b"\n")
+        return fhand
+    results["json.dumps(dict()) strains/s"], _ = _strains_per_second(dump_dicts, num_strains)
+
+    formats = [codec.JSON] if codec.msgpack is None else list(codec.FORMATS)
+    for format in formats:
+        def dump():
+            fhand = BytesIO()
+            codec.dump_catalog(strains, fhand, format=format)
+            return fhand
+        results[f"dump {format} strains/s"], fhand = _strains_per_second(dump, num_strains)
+        results[f"{format} catalog bytes per strain"] = len(fhand.getvalue()) // num_strains
+        fhand.seek(0)
+        results[f"load {format} strains/s"], _ = _strains_per_second(
+            lambda: list(codec.load_catalog(fhand, format=format)), num_strains)
+    return results
+
+
+def main():
+    args = get_cmd_args()
+    args.compare_with = None
+    report(measure_codec(args.num_strains), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Speed of the date range queries.
+
+Looks for the strains isolated in a given month and after the entry into
+force of the Nagoya protocol with a DateRangeIndex and with a scan of the
+strains.
+
+    python benchmarks/bench_date_index.py -n 100000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import report  # noqa: E402
+
+from mirri.entities.date_range import DateRangeIndex, FrozenDateRange  # noqa: E402
+
+NAGOYA_DATE = date(2014, 10, 12)
+NUM_QUERIES = 100
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_dates", type=int, default=100000,
+                        help="Number of dates to index")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the results as JSON")
+    return parser.parse_args()
+
+
+def _random_date_range(rng):
+    year = rng.randint(1900, 2020)
+    precision = rng.random()
+    if precision < 0.2:
+        return FrozenDateRange(year)
+    if precision < 0.5:
+        return FrozenDateRange(year, rng.randint(1, 12))
+    return FrozenDateRange(year, rng.randint(1, 12), rng.randint(1, 28))
+
+
+def _queries_per_second(query, periods):
+    start = time.perf_counter()
+    for period in periods:
+        query(period)
+    return len(periods) / (time.perf_counter() - start)
+
+
+def measure_index(num_dates):
+    rng = random.Random(42)
+    dates = [_random_date_range(rng) for _ in range(num_dates)]
+    months = [FrozenDateRange(rng.randint(1900, 2020), rng.randint(1, 12))
+              for _ in range(NUM_QUERIES)]
+    results = {"dates": num_dates}
+
+    start = time.perf_counter()
+    index = DateRangeIndex(dates)
+    results["build index s"] = time.perf_counter() - start
+
+    results["index month queries/s"] = _queries_per_second(
+        lambda month: index.overlapping(month, month), months)
+    results["scan month queries/s"] = _queries_per_second(
+        lambda month: [date_range for date_range in dates if date_range.overlaps(month)],
+        months)
+    results["index after Nagoya queries/s"] = _queries_per_second(
+        index.after, [NAGOYA_DATE] * NUM_QUERIES)
+    results["scan after Nagoya queries/s"] = _queries_per_second(
+        lambda day: [date_range for date_range in dates
+                     if date_range.range["start"] > day], [NAGOYA_DATE] * NUM_QUERIES)
+    return results
+
+
+def main():
+    args = get_cmd_args()
+    args.compare_with = None
+    report(measure_index(args.num_dates), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
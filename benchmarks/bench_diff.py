@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Speed of the strain comparison of the update pipeline.
+
+Compares every strain with an unchanged copy and with a copy with an edited
+field, with diff_entities and, if it is installed, with the DeepDiff call
+that the pipeline used before.
+
+    python benchmarks/bench_diff.py -n 2000
+"""
+import argparse
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import report  # noqa: E402
+from _data import get_test_strains  # noqa: E402
+
+from mirri.entities.diff import diff_entities  # noqa: E402
+
+try:
+    import deepdiff
+except ImportError:
+    deepdiff = None
+
+DEEPDIFF_EXCLUDE = [r"root\['publications'\]\[\d+\]\['id'\]",
+                    r"root\['publications'\]\[\d+\]\['RecordId'\]",
+                    r"root\['genetics'\]\['Markers'\]\[\d+\]\['RecordId'\]",
+                    r"root\['genetics'\]\['Markers'\]\[\d+\]\['RecordName'\]"]
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_strains", type=int, default=2000,
+                        help="Number of strains to compare")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the results as JSON")
+    return parser.parse_args()
+
+
+def _pairs_per_second(compare, pairs):
+    start = time.perf_counter()
+    num_different = sum(1 for old, new in pairs if compare(old, new))
+    return len(pairs) / (time.perf_counter() - start), num_different
+
+
+def _deepdiff(old, new):
+    return deepdiff.DeepDiff(old.dict(), new.dict(), ignore_order=True,
+                             exclude_regex_paths=DEEPDIFF_EXCLUDE)
+
+
+def measure_diff(num_strains):
+    strains = list(get_test_strains(num_strains))
+    edited = deepcopy(strains)
+    for strain in edited:
+        strain.taxonomy.comments = "edited"
+    pairs = [*zip(strains, deepcopy(strains)), *zip(strains, edited)]
+
+    results = {"strain pairs": len(pairs)}
+    results["diff_entities pairs/s"], results["diff_entities different"] = \
+        _pairs_per_second(diff_entities, pairs)
+    if deepdiff is not None:
+        results["DeepDiff pairs/s"], results["DeepDiff different"] = \
+            _pairs_per_second(_deepdiff, pairs)
+    return results
+
+
+def main():
+    args = get_cmd_args()
+    args.compare_with = None
+    report(measure_diff(args.num_strains), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
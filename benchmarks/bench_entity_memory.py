@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Memory used by the Strain entities.
+
+The strains of the full test excel file are copied until the requested
+number of strains is reached, and the memory allocated for them is measured
+with tracemalloc.
+
+    python benchmarks/bench_entity_memory.py -n 100000
+    python benchmarks/bench_entity_memory.py --compare-with /path/to/old/checkout
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import add_compare_arguments, report  # noqa: E402
+from _data import get_test_strains  # noqa: E402
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_strains", type=int, default=5000,
+                        help="Number of strains to keep in memory")
+    add_compare_arguments(parser)
+    return parser.parse_args()
+
+
+def measure_strains(num_strains):
+    new_strains = get_test_strains(num_strains + 1)
+    # the first one parses the excel file, it is not measured
+    next(new_strains)
+    gc.collect()
+    tracemalloc.start()
+    strains = list(new_strains)
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"strains": len(strains),
+            "allocated MB": allocated / 1024 ** 2,
+            "bytes per strain": allocated // len(strains)}
+
+
+def main():
+    args = get_cmd_args()
+    report(measure_strains(args.num_strains), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Time and peak memory of the streaming exporters of mirri.io.writers.exports.
+
+The strains of the full test excel file are copied until the requested
+number of strains is reached, and given to the exporter as a generator, as
+in bench_writer.py. The xlsx format runs write_mirri_excel in write_only
+mode, for reference.
+
+    python benchmarks/bench_exports.py -n 20000 --format dwca
+    python benchmarks/bench_exports.py -n 20000 --format xlsx
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import add_compare_arguments, report  # noqa: E402
+from _data import TEST_EXCEL, get_test_strains  # noqa: E402
+
+from mirri.io.parsers.mirri_excel import parse_mirri_excel  # noqa: E402
+from mirri.io.writers.mirri_excel import write_mirri_excel  # noqa: E402
+
+FORMATS = ("csv", "jsonl", "dwca", "xlsx")
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_strains", type=int, default=5000,
+                        help="Number of strains to export")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="Export format")
+    add_compare_arguments(parser)
+    return parser.parse_args()
+
+
+def _export(format, path, strains, growth_media):
+    if format == "xlsx":
+        write_mirri_excel(path, strains, growth_media, version="20200601",
+                          write_only=True)
+        return
+    # the older trees do not have the exporters
+    from mirri.io.writers.exports import write_csv_bundle, write_dwca, write_jsonl
+    if format == "csv":
+        write_csv_bundle(path, strains, growth_media)
+    elif format == "jsonl":
+        write_jsonl(path, strains)
+    else:
+        write_dwca(path, strains)
+
+
+def _get_size(path):
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.iterdir())
+    return path.stat().st_size
+
+
+def measure_export(num_strains, format):
+    with TEST_EXCEL.open("rb") as fhand:
+        growth_media = parse_mirri_excel(fhand, version="20200601")["growth_media"]
+    strains = get_test_strains(num_strains)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_path = Path(tmp_dir) / f"strains.{format}"
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        _export(format, out_path, strains, growth_media)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = _get_size(out_path)
+
+    # the strains are copied as they are exported, so the speed is a lower bound
+    return {"strains": num_strains, "strains/s": num_strains / elapsed,
+            "peak MB": peak / 1024 ** 2, "output MB": size / 1024 ** 2}
+
+
+def main():
+    args = get_cmd_args()
+    report(measure_export(args.num_strains, args.format), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
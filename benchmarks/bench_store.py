@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Speed of the SQLite catalog store.
+
+Ingests the strains into a store file and times indexed queries against
+a linear scan of the strains held in memory.
+
+    python benchmarks/bench_store.py -n 20000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import report  # noqa: E402
+from _data import get_test_strains  # noqa: E402
+
+from mirri.io.store import CatalogStore  # noqa: E402
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_strains", type=int, default=5000,
+                        help="Number of strains to store")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the results as JSON")
+    return parser.parse_args()
+
+
+def _elapsed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def measure_store(num_strains):
+    strains = list(get_test_strains(num_strains))
+    genus = strains[0].taxonomy.genus
+    accession_number = strains[-1].id.strain_id
+    results = {"strains": num_strains}
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "catalog.sqlite"
+        with CatalogStore(path) as store:
+            seconds, _ = _elapsed(lambda: store.add_strains(strains))
+            results["ingest strains/s"] = num_strains / seconds
+            results["store bytes per strain"] = path.stat().st_size // num_strains
+
+            seconds, _ = _elapsed(lambda: store.get_strain(accession_number))
+            results["get by accession number ms"] = seconds * 1000
+            seconds, _ = _elapsed(
+                lambda: [strain for strain in strains
+                         if strain.id.strain_id == accession_number])
+            results["scan by accession number ms"] = seconds * 1000
+
+            seconds, num_found = _elapsed(lambda: store.count_strains(genus=genus))
+            results["count by genus ms"] = seconds * 1000
+            seconds, found = _elapsed(lambda: list(store.find_strains(genus=genus)))
+            results["find by genus strains/s"] = len(found) / seconds
+    return results
+
+
+def main():
+    args = get_cmd_args()
+    args.compare_with = None
+    report(measure_store(args.num_strains), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Speed of the conversion of strains into rows of the strains sheet.
+
+The strains of the full test excel file are given again and again until
+the requested number of rows is reached, so only the conversion, and not
+the creation of the strains or the excel writing, is measured.
+
+    python benchmarks/bench_strain_rows.py -n 100000
+    python benchmarks/bench_strain_rows.py --compare-with /path/to/old/checkout
+"""
+import argparse
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import add_compare_arguments, report  # noqa: E402
+from _data import TEST_EXCEL  # noqa: E402
+
+from mirri.io.parsers.mirri_excel import parse_mirri_excel  # noqa: E402
+from mirri.io.writers.mirri_excel import (INITIAL_SEXUAL_STATES, PUB_HEADERS,  # noqa: E402
+                                          _deserialize_strains, _SideTable)
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_rows", type=int, default=100000,
+                        help="Number of rows to build")
+    add_compare_arguments(parser)
+    return parser.parse_args()
+
+
+def measure_rows(num_rows):
+    with TEST_EXCEL.open("rb") as fhand:
+        parsed = parse_mirri_excel(fhand, version="20200601")
+    strains = list(parsed["strains"])
+    growth_media_indexes = [str(gm.acronym) for gm in parsed["growth_media"]]
+
+    with _SideTable(["ID"]) as locations, _SideTable(PUB_HEADERS) as publications, \
+            _SideTable(["Strain AN"]) as genomic_markers:
+        rows = _deserialize_strains(islice(cycle(strains), num_rows), locations,
+                                    growth_media_indexes, publications,
+                                    set(INITIAL_SEXUAL_STATES), genomic_markers)
+        start = time.perf_counter()
+        for _ in rows:
+            pass
+        elapsed = time.perf_counter() - start
+
+    return {"rows": num_rows, "rows/s": num_rows / elapsed}
+
+
+def main():
+    args = get_cmd_args()
+    report(measure_rows(args.num_rows), args, __file__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Time and peak memory of write_mirri_excel.
+
+The strains of the full test excel file are copied until the requested
+number of strains is reached. They are given to the writer as a generator,
+so only the memory held by the writer is measured, with tracemalloc.
+With --time_only the strains are copied before the writer is run, and
+tracemalloc is not used, to time the writer alone.
+
+    python benchmarks/bench_writer.py -n 20000 --write_only
+    python benchmarks/bench_writer.py -n 20000 --time_only --engine parallel
+    python benchmarks/bench_writer.py -n 100 --time_only --engine parallel --repeat 5
+    python benchmarks/bench_writer.py --compare-with /path/to/old/checkout
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _compare import add_compare_arguments, report  # noqa: E402
+from _data import TEST_EXCEL, get_test_strains  # noqa: E402
+
+from mirri.io.parsers.mirri_excel import parse_mirri_excel  # noqa: E402
+from mirri.io.writers.mirri_excel import write_mirri_excel  # noqa: E402
+
+
+def get_cmd_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--num_strains", type=int, default=5000,
+                        help="Number of strains to write")
+    parser.add_argument("--write_only", action="store_true",
+                        help="Use the streaming mode of the writer")
+    parser.add_argument("--engine", default=None, help="Writer engine")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Worker processes of the parallel engine")
+    parser.add_argument("--compress_level", type=int, default=None,
+                        help="Zip compression level of the parallel engine")
+    parser.add_argument("--template_cache_dir", default=None,
+                        help="Template cache directory of the parallel engine")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Write the strains several times, report the last one")
+    parser.add_argument("--time_only", action="store_true",
+                        help="Do not measure the memory")
+    add_compare_arguments(parser)
+    return parser.parse_args()
+
+
+def measure_writer(num_strains, time_only=False, repeat=1, **options):
+    with TEST_EXCEL.open("rb") as fhand:
+        growth_media = parse_mirri_excel(fhand, version="20200601")["growth_media"]
+    # the older trees do not have all the options
+    kwargs = {key: value for key, value in options.items()
+              if value is not None and value is not False}
+    strains = get_test_strains(num_strains)
+    if time_only or repeat > 1:
+        strains = list(strains)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_path = Path(tmp_dir) / "strains.xlsx"
+        for _ in range(repeat):
+            gc.collect()
+            if not time_only:
+                tracemalloc.start()
+            start = time.perf_counter()
+            write_mirri_excel(out_path, strains, growth_media, version="20200601",
+                              **kwargs)
+            elapsed = time.perf_counter() - start
+            if not time_only:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        file_size = out_path.stat().st_size
+
+    results = {"strains": num_strains, "strains/s": num_strains / elapsed}
+    if not time_only:
+        results["peak MB"] = peak / 1024 ** 2
+    results["file MB"] = file_size / 1024 ** 2
+    return results
+
+
+def main():
+    args = get_cmd_args()
+    report(measure_writer(args.num_strains, time_only=args.time_only,
+                          write_only=args.write_only, engine=args.engine,
+                          processes=args.processes,
+                          compress_level=args.compress_level,
+                          template_cache_dir=args.template_cache_dir,
+                          repeat=args.repeat),
+           args, __file__)
+
+
+if __name__ == "__main__":
+    main()
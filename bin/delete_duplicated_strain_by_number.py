@@ -29,17 +29,6 @@ def get_cmd_args():
             'client_secret': args.client_secret}
 
 
-def write_errors_in_screen(errors, fhand=sys.stderr):
-    for key, errors_by_type in errors.items():
-        fhand.write(f'{key}\n')
-        fhand.write('-' * len(key) + '\n')
-        for error in errors_by_type:
-            if error.pk:
-                fhand.write(f'{error.pk}: ')
-            fhand.write(f'{error.message} - {error.code}\n')
-        fhand.write('\n')
-
-
 def main():
     args = get_cmd_args()
     out_fhand = sys.stdout
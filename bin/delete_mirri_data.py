@@ -5,7 +5,9 @@ import sys
 from mirri.biolomics.pipelines.strain import retrieve_strain_by_accession_number
 from mirri.biolomics.remote.biolomics_client import BiolomicsMirriClient
 from mirri.biolomics.remote.endoint_names import GROWTH_MEDIUM_WS, STRAIN_WS
+from mirri.io.parsers.cache import ParseCache
 from mirri.io.parsers.mirri_excel import parse_mirri_excel
+from mirri.validation.error_logging import TextRenderer
 from mirri.validation.excel_validator import validate_mirri_excel
 
 SERVER_URL = 'https://webservices.bio-aware.com/mirri_test'
@@ -30,38 +32,30 @@ def get_cmd_args():
                         action='store_true',
                         help='Use it if you want to update the existing strains')
 
+    parser.add_argument('--cache_dir', default=None,
+                        help='Directory to cache the parsed excel files in')
+
     args = parser.parse_args()
 
     return {'input_fhand': args.input, 'user': args.ws_user,
-            'version': args.spec_version,
+            'version': args.spec_version, 'cache_dir': args.cache_dir,
             'password': args.ws_password, 'client_id': args.client_id,
             'client_secret': args.client_secret, 'update': args.force_update}
 
 
-def write_errors_in_screen(errors, fhand=sys.stderr):
-    for key, errors_by_type in errors.items():
-        fhand.write(f'{key}\n')
-        fhand.write('-' * len(key) + '\n')
-        for error in errors_by_type:
-            if error.pk:
-                fhand.write(f'{error.pk}: ')
-            fhand.write(f'{error.message} - {error.code}\n')
-        fhand.write('\n')
-
-
 def main():
     args = get_cmd_args()
     input_fhand = args['input_fhand']
     spec_version = args['version']
     out_fhand = sys.stderr
     error_log = validate_mirri_excel(input_fhand, version=spec_version)
-    errors = error_log.get_errors()
-    if errors:
-        write_errors_in_screen(errors, out_fhand)
+    if len(error_log):
+        TextRenderer(out_fhand, group_by='entity').render(error_log)
         sys.exit(1)
 
     input_fhand.seek(0)
-    parsed_objects = parse_mirri_excel(input_fhand, version=spec_version)
+    cache = None if args['cache_dir'] is None else ParseCache(args['cache_dir'])
+    parsed_objects = parse_mirri_excel(input_fhand, version=spec_version, cache=cache)
     strains = list(parsed_objects['strains'])
     growth_media = list(parsed_objects['growth_media'])
 
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 import argparse
+import logging
 import sys
 from collections import Counter
 
 from mirri.biolomics.pipelines.growth_medium import get_or_create_or_update_growth_medium
-from mirri.biolomics.pipelines.strain import get_or_create_or_update_strain
+from mirri.biolomics.pipelines.strain import get_or_create_or_update_strain, upload_strains
 from mirri.biolomics.remote.biolomics_client import BiolomicsMirriClient
+from mirri.biolomics.remote.concurrency import AIMDController
+from mirri.io.parsers.cache import ParseCache
 from mirri.io.parsers.mirri_excel import parse_mirri_excel
+from mirri.validation.error_logging import TextRenderer
 from mirri.validation.excel_validator import validate_mirri_excel
 
 TEST_SERVER_URL = 'https://webservices.bio-aware.com/mirri_test'
@@ -42,37 +46,39 @@ def get_cmd_args():
     parser.add_argument('--skip_first_num', type=int,
                        help='skip first X strains to the tool')
 
+    parser.add_argument('--cache_dir', default=None,
+                        help='Directory to cache the parsed excel files in')
+    parser.add_argument('--max_concurrency', type=int, default=1,
+                        help='Most strains uploaded at once. The number is adjusted '
+                             'to the load of the server between 1 and this one')
+
     args = parser.parse_args()
 
     return {'input_fhand': args.input, 'user': args.ws_user,
-            'version': args.spec_version,
+            'version': args.spec_version, 'cache_dir': args.cache_dir,
             'password': args.ws_password, 'client_id': args.client_id,
             'client_secret': args.client_secret, 'update': args.force_update,
             'verbose': args.verbose, 'use_production_server': args.prod,
             'add_gm': args.dont_add_gm, 'add_strains': args.dont_add_strains,
-            'skip_first_num': args.skip_first_num}
-
-
-def write_errors_in_screen(errors, fhand=sys.stderr):
-    for key, errors_by_type in errors.items():
-        fhand.write(f'{key}\n')
-        fhand.write('-' * len(key) + '\n')
-        for error in errors_by_type:
-            if error.pk:
-                fhand.write(f'{error.pk}: ')
-            fhand.write(f'{error.message} - {error.code}\n')
-        fhand.write('\n')
+            'skip_first_num': args.skip_first_num,
+            'max_concurrency': args.max_concurrency}
 
 
 def create_or_upload_strains(client, strains, update=False, counter=None,
-                             out_fhand=None, seek=None):
-    for index, strain in enumerate(strains):
-        if seek is not None and index < seek:
-            continue
-        # if strain.id.strain_id != 'CECT 5766':
-        #     continue
-        result = get_or_create_or_update_strain(client, strain, update=update)
-
+                             out_fhand=None, seek=None, max_concurrency=1):
+    indexed_strains = list(enumerate(strains))[seek:]
+    if max_concurrency > 1:
+        # the strains are done in any order
+        indexes = {id(strain): index for index, strain in indexed_strains}
+        controller = AIMDController(max_limit=max_concurrency)
+        results = ((indexes[id(strain)], result) for strain, result in
+                   upload_strains(client, [strain for _, strain in indexed_strains],
+                                  update=update, controller=controller))
+    else:
+        results = ((index, get_or_create_or_update_strain(client, strain, update=update))
+                   for index, strain in indexed_strains)
+
+    for index, result in results:
         new_strain = result['record']
         created = result['created']
         updated = result.get('updated', False)
@@ -116,25 +122,30 @@ def main():
     spec_version = args['version']
     out_fhand = sys.stdout
     error_log = validate_mirri_excel(input_fhand, version=spec_version)
-    errors = error_log.get_errors()
     skip_first_num = args['skip_first_num']
-    if errors:
-        write_errors_in_screen(errors, out_fhand)
+    if len(error_log):
+        TextRenderer(out_fhand, group_by='entity').render(error_log)
         sys.exit(1)
 
     input_fhand.seek(0)
-    parsed_objects = parse_mirri_excel(input_fhand, version=spec_version)
+    cache = None if args['cache_dir'] is None else ParseCache(args['cache_dir'])
+    parsed_objects = parse_mirri_excel(input_fhand, version=spec_version, cache=cache)
     strains = list(parsed_objects['strains'])
     growth_media = list(parsed_objects['growth_media'])
 
     server_url = PROD_SERVER_URL if args['use_production_server'] else TEST_SERVER_URL
+    max_concurrency = args['max_concurrency']
+    if max_concurrency > 1:
+        # the changes of the strains in flight
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
 
     client = BiolomicsMirriClient(server_url=server_url,  api_version='v2',
                                   client_id=args['client_id'],
                                   client_secret=args['client_secret'],
                                   username=args['user'],
                                   password=args['password'],
-                                  verbose=args['verbose'])
+                                  verbose=args['verbose'],
+                                  pool_size=max(max_concurrency, 10))
 
     if args['add_gm']:
         client.start_transaction()
@@ -157,7 +168,8 @@ def main():
         try:
             create_or_upload_strains(client, strains, update=args['update'],
                                      counter=counter,
-                                     out_fhand=out_fhand, seek=skip_first_num)
+                                     out_fhand=out_fhand, seek=skip_first_num,
+                                     max_concurrency=args['max_concurrency'])
             client.finish_transaction()
         except (Exception, KeyboardInterrupt) as error:
             out_fhand.write('There were some errors in the Strain upload\n')
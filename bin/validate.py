@@ -1,18 +1,68 @@
 #!/usr/bin/env python
+import argparse
 import sys
 from pathlib import Path
+from mirri.validation.error_logging import render_error_log
+from mirri.validation.error_logging.renderers import GROUPINGS, RENDERERS
+from mirri.validation.excel_annotator import annotate_excel
 from mirri.validation.excel_validator import validate_mirri_excel
 import warnings
 warnings.simplefilter("ignore")
 
 
+def get_cmd_args():
+    desc = "Validate a MIRRI excel file"
+    parser = argparse.ArgumentParser(description=desc)
+    parser.add_argument('input', help='Excel file to validate', type=Path)
+    parser.add_argument('-v', '--spec_version', default='20200601',
+                        help='Version of he specification of the given excel file')
+    parser.add_argument('-f', '--format', default='text', choices=list(RENDERERS),
+                        help='Format of the error report')
+    parser.add_argument('-g', '--group_by', default=None,
+                        choices=[grouping for grouping in GROUPINGS if grouping],
+                        help='Group the errors by entity or summarize them by code')
+    parser.add_argument('-l', '--limit', type=int, default=None,
+                        help='Maximum number of errors to report')
+    parser.add_argument('--offset', type=int, default=0,
+                        help='Number of errors to skip before reporting')
+    parser.add_argument('-o', '--output', type=Path, default=None,
+                        help='Report file. Defaults to the standard output')
+    parser.add_argument('-a', '--annotated_copy', type=Path, default=None,
+                        help='Write a copy of the excel file with the errors highlighted')
+
+    args = parser.parse_args()
+
+    return {'input': args.input, 'version': args.spec_version,
+            'format': args.format, 'group_by': args.group_by,
+            'limit': args.limit, 'offset': args.offset, 'output': args.output,
+            'annotated_copy': args.annotated_copy}
+
+
 def main():
-    path = Path(sys.argv[1])
-    error_log = validate_mirri_excel(path.open("rb"))
+    args = get_cmd_args()
+    with args['input'].open("rb") as fhand:
+        error_log = validate_mirri_excel(fhand, version=args['version'])
+
+    render_kwargs = {'format': args['format'], 'group_by': args['group_by'],
+                     'limit': args['limit'], 'offset': args['offset']}
+    if args['output'] is not None:
+        if args['format'] == 'xlsx':
+            out_fhand = args['output'].open('wb')
+        else:
+            out_fhand = args['output'].open('w', newline='')
+        with out_fhand:
+            render_error_log(error_log, out_fhand, **render_kwargs)
+    elif args['format'] == 'xlsx':
+        render_error_log(error_log, sys.stdout.buffer, **render_kwargs)
+    else:
+        render_error_log(error_log, sys.stdout, **render_kwargs)
+
+    if args['annotated_copy'] is not None:
+        with args['input'].open("rb") as fhand, args['annotated_copy'].open("wb") as out_fhand:
+            annotate_excel(fhand, error_log, out_fhand)
 
-    for errors in error_log.get_errors().values():
-        for error in errors:
-            print(error.pk, error.message, error.code)
+    if len(error_log):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,27 @@
+import threading
+import zlib
 from pprint import pprint
-import deepdiff
 
 from mirri.biolomics.remote.biolomics_client import BiolomicsMirriClient, BIBLIOGRAPHY_WS, SEQUENCE_WS, STRAIN_WS
+from mirri.biolomics.remote.concurrency import AIMDController, run_adaptive
 
 from mirri.biolomics.serializers.sequence import GenomicSequenceBiolomics
 from mirri.biolomics.serializers.strain import StrainMirri
+from mirri.entities.diff import diff_entities
 from mirri.entities.publication import Publication
 
 
+# the strains uploaded at once share their publications and markers, and
+# each of them has to be created once. A few locks, chosen by the name of
+# the record, are enough for the workers of an upload.
+_CREATION_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def _get_creation_lock(entity_name, record_name):
+    key = f"{entity_name}:{record_name}".encode()
+    return _CREATION_LOCKS[zlib.crc32(key) % len(_CREATION_LOCKS)]
+
+
 def retrieve_strain_by_accession_number(client, accession_number):
     query = {"Query": [{"Index": 0,
                         "FieldName": "Collection accession number",
@@ -29,23 +43,46 @@ def retrieve_strain_by_accession_number(client, accession_number):
 
 
 def get_or_create_publication(client: BiolomicsMirriClient, pub: Publication):
-    new_pub = client.retrieve_by_name(BIBLIOGRAPHY_WS, pub.title)
+    with _get_creation_lock(BIBLIOGRAPHY_WS, pub.title):
+        new_pub = client.retrieve_by_name(BIBLIOGRAPHY_WS, pub.title)
 
-    if new_pub is not None:
-        return {'record': new_pub, 'created': False}
-    new_pub = client.create(BIBLIOGRAPHY_WS, pub)
+        if new_pub is not None:
+            return {'record': new_pub, 'created': False}
+        new_pub = client.create(BIBLIOGRAPHY_WS, pub)
     return {'record': new_pub, 'created': True}
 
 
 def get_or_create_sequence(client: BiolomicsMirriClient, sequence: GenomicSequenceBiolomics):
-    seq = client.retrieve_by_name(SEQUENCE_WS, sequence.marker_id)
-    if seq is not None:
-        return {'record': seq, 'created': False}
+    with _get_creation_lock(SEQUENCE_WS, sequence.marker_id):
+        seq = client.retrieve_by_name(SEQUENCE_WS, sequence.marker_id)
+        if seq is not None:
+            return {'record': seq, 'created': False}
 
-    new_seq = client.create(SEQUENCE_WS, sequence)
+        new_seq = client.create(SEQUENCE_WS, sequence)
     return {'record': new_seq, 'created': True}
 
 
+def upload_strains(client: BiolomicsMirriClient, strains, update=False, controller=None):
+    """
+    Get, create or update the strains, several at once.
+
+    The strains in flight are adjusted by the controller to the latency and
+    the errors of the requests, see AIMDController. The results of
+    get_or_create_or_update_strain are yielded, with their strains, as they
+    are done, not in the order of the strains.
+    """
+    if controller is None:
+        controller = AIMDController()
+    client.client.add_listener(controller.observe)
+    try:
+        yield from run_adaptive(
+            controller,
+            lambda strain: get_or_create_or_update_strain(client, strain, update=update),
+            strains)
+    finally:
+        client.client.remove_listener(controller.observe)
+
+
 def get_or_create_or_update_strain(client: BiolomicsMirriClient,
                                    record: StrainMirri, update=False):
     response = get_or_create_strain(client, record)
@@ -66,16 +103,12 @@ def get_or_create_or_update_strain(client: BiolomicsMirriClient,
         record.synonyms = new_record.synonyms
 
     # compare_strains
-    # we exclude pub id as it is an internal reference of pub and can be changed
-    diffs = deepdiff.DeepDiff(new_record.dict(), record.dict(),
-                              ignore_order=True, exclude_paths=None,
-                              exclude_regex_paths=[r"root\[\'publications\'\]\[\d+\]\[\'id\'\]",
-                                                   r"root\[\'publications\'\]\[\d+\]\[\'RecordId\'\]",
-                                                   r"root\[\'genetics\'\]\[\'Markers\'\]\[\d+\]\[\'RecordId\'\]",
-                                                   r"root\[\'genetics\'\]\[\'Markers\'\]\[\d+\]\[\'RecordName\'\]"])
+    # we exclude pub id as it is an internal reference of pub and can be changed,
+    # and the same for the marker records
+    diffs = diff_entities(new_record, record)
 
     if diffs:
-        pprint(diffs,  width=200)
+        pprint([str(change) for change in diffs],  width=200)
         # pprint('en el que yo mando')
         # pprint(record.dict())
         # pprint('lo que hay en db')
@@ -0,0 +1,103 @@
+"""
+Asyncio client of MIRRI-IS, to keep many requests in flight.
+
+It runs the operations of BiolomicsMirriClient in a pool of threads, so it
+uses the same serializers, including the requests they make for the
+records they refer to, e.g. the growth media of a strain. A semaphore
+bounds the operations in flight. The connections are pooled by the session
+of the client, and the access token is shared, see TokenManager.
+
+    async with await AsyncBiolomicsMirriClient.connect(server_url, api_version,
+                                                       client_id, client_secret,
+                                                       username, password,
+                                                       concurrency=32) as client:
+        strains = await asyncio.gather(*[client.retrieve_by_id(STRAIN_WS, record_id)
+                                         for record_id in record_ids])
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from mirri.biolomics.remote.biolomics_client import BiolomicsMirriClient
+
+DEFAULT_CONCURRENCY = 16
+
+
+class AsyncBiolomicsMirriClient():
+    """
+    Asyncio wrapper of a BiolomicsMirriClient.
+
+    Its session should keep at least concurrency connections alive, as the
+    one made by connect does. The transactions of BiolomicsMirriClient are
+    not supported.
+
+    Args:
+        client (BiolomicsMirriClient): client that makes the requests.
+        concurrency (int, optional): operations in flight.
+    """
+
+    def __init__(self, client, concurrency=DEFAULT_CONCURRENCY):
+        self.client = client
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency,
+                                            thread_name_prefix="biolomics")
+        # created in the loop that uses it
+        self._semaphore = None
+
+    @classmethod
+    async def connect(cls, server_url, api_version, client_id, client_secret, username,
+                      password, concurrency=DEFAULT_CONCURRENCY, **kwargs):
+        """
+        Client with a new BiolomicsMirriClient, built without blocking the loop.
+
+        The keyword arguments go to BiolomicsMirriClient, and pool_size is
+        concurrency by default.
+        """
+        kwargs.setdefault("pool_size", concurrency)
+        loop = asyncio.get_running_loop()
+        client = await loop.run_in_executor(
+            None, partial(BiolomicsMirriClient, server_url, api_version, client_id,
+                          client_secret, username, password, **kwargs))
+        return cls(client, concurrency=concurrency)
+
+    async def _run(self, method, *args, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        # the operations wait here, so the cancelled ones never start
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor,
+                                              partial(method, *args, **kwargs))
+
+    async def search(self, entity_name, query):
+        return await self._run(self.client.search, entity_name, query)
+
+    async def retrieve_by_id(self, entity_name, _id):
+        return await self._run(self.client.retrieve_by_id, entity_name, _id)
+
+    async def retrieve_by_name(self, entity_name, name):
+        return await self._run(self.client.retrieve_by_name, entity_name, name)
+
+    async def create(self, entity_name, entity):
+        return await self._run(self.client.create, entity_name, entity)
+
+    async def update(self, entity_name, entity):
+        return await self._run(self.client.update, entity_name, entity)
+
+    async def delete_by_id(self, entity_name, record_id):
+        return await self._run(self.client.delete_by_id, entity_name, record_id)
+
+    async def delete_by_name(self, entity_name, record_name):
+        return await self._run(self.client.delete_by_name, entity_name, record_name)
+
+    async def close(self):
+        """Wait for the operations in flight and close the connections"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -2,7 +2,10 @@ from mirri.biolomics.remote.endoint_names import (SEQUENCE_WS, STRAIN_WS,
                                                   GROWTH_MEDIUM_WS, TAXONOMY_WS,
                                                   COUNTRY_WS, ONTOBIOTOPE_WS,
                                                   BIBLIOGRAPHY_WS)
-from mirri.biolomics.remote.rest_client import BiolomicsClient
+from mirri.biolomics.remote.rest_client import (DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT,
+                                                BiolomicsClient)
+from mirri.biolomics.remote.retry import DEFAULT_MAX_RETRIES
+from mirri.biolomics.remote.token_manager import DEFAULT_SKEW
 from mirri.biolomics.serializers.sequence import (
     serialize_to_biolomics as sequence_to_biolomics,
     serialize_from_biolomics as sequence_from_biolomics)
@@ -57,10 +60,16 @@ class BiolomicsMirriClient:
     }
 
     def __init__(self, server_url, api_version, client_id, client_secret, username,
-                 password, website_id=1, verbose=False):
+                 password, website_id=1, verbose=False, pool_size=DEFAULT_POOL_SIZE,
+                 max_retries=DEFAULT_MAX_RETRIES, timeout=DEFAULT_TIMEOUT,
+                 token_skew=DEFAULT_SKEW, retry_policy=None, rate_limit=None, burst=None):
         _client = BiolomicsClient(server_url, api_version, client_id,
                                   client_secret, username, password,
-                                  website_id=website_id, verbose=verbose)
+                                  website_id=website_id, verbose=verbose,
+                                  pool_size=pool_size, max_retries=max_retries,
+                                  timeout=timeout, token_skew=token_skew,
+                                  retry_policy=retry_policy, rate_limit=rate_limit,
+                                  burst=burst)
 
         self.client = _client
         self.schemas = self.client.get_schemas()
@@ -69,6 +78,15 @@ class BiolomicsMirriClient:
         self._in_transaction = False
         self._verbose = verbose
 
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def _initialize_transaction_storage(self):
         if self._in_transaction:
             msg = 'Can not initialize transaction if already in a transaction'
@@ -0,0 +1,201 @@
+"""
+Adaptive number of requests in flight to the Biolomics web services.
+
+The AIMDController listens to the requests of a BiolomicsClient and, every
+window of requests, adds one to the requests let in flight if the server
+kept up, or halves them if it got slow or answered with errors. It is the
+additive increase, multiplicative decrease of the TCP congestion control.
+
+    controller = AIMDController(min_limit=1, max_limit=32)
+    client.client.add_listener(controller.observe)
+    for item, result in run_adaptive(controller, upload, items):
+        ...
+"""
+import logging
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 32
+DEFAULT_WINDOW = 20
+
+
+class AIMDController():
+    """
+    Limit of requests in flight, adjusted to the latency and errors seen.
+
+    Every window observations the limit is multiplied by decrease_factor if
+    any request was throttled (429), more than error_threshold of them
+    failed (5xx or no answer) or the percentile of their latency went over
+    latency_target. Without a target, the latency is too high when it is
+    latency_tolerance times the lowest median latency seen. Otherwise, the
+    limit is increased by increase, but only if it was reached in the
+    window, so it does not grow while it is not what holds the requests.
+    The limit stays between min_limit and max_limit, and its changes are
+    logged.
+
+    The controller is also the limiter: take a slot with it as a context
+    manager, or with acquire and release.
+
+    Args:
+        min_limit (int, optional): lowest limit.
+        max_limit (int, optional): highest limit.
+        initial_limit (int, optional): first limit, min_limit by default.
+        increase (int, optional): slots added when the server keeps up.
+        decrease_factor (float, optional): factor of the limit when it does
+            not.
+        window (int, optional): requests observed between adjustments.
+        percentile (float, optional): latency percentile to watch.
+        latency_target (float, optional): highest latency percentile, in
+            seconds.
+        latency_tolerance (float, optional): highest latency percentile, as
+            a factor of the lowest median, without a target.
+        error_threshold (float, optional): highest rate of errors.
+    """
+
+    def __init__(self, min_limit=DEFAULT_MIN_LIMIT, max_limit=DEFAULT_MAX_LIMIT,
+                 initial_limit=None, increase=1, decrease_factor=0.5,
+                 window=DEFAULT_WINDOW, percentile=90, latency_target=None,
+                 latency_tolerance=2.0, error_threshold=0.05):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("The limits should be 1 <= min_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min_limit if initial_limit is None else initial_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.window = window
+        self.percentile = percentile
+        self.latency_target = latency_target
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._saturated = False
+        self._latencies = []
+        self._errors = 0
+        self._throttled = 0
+        self._lowest_median = None
+
+    def acquire(self):
+        """Wait for a slot under the limit, and take it"""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+            if self.in_flight >= self.limit:
+                self._saturated = True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def observe(self, end_point, method, latency, status):
+        """
+        Take a request into account, see BiolomicsClient.add_listener.
+
+        Args:
+            latency (float): seconds to get the answer or the error.
+            status (int): status of the answer, None if there was none.
+        """
+        with self._condition:
+            self._latencies.append(latency)
+            if status == 429:
+                self._throttled += 1
+            elif status is None or status >= 500:
+                self._errors += 1
+            if len(self._latencies) >= self.window:
+                self._adjust()
+
+    def _adjust(self):
+        latencies = sorted(self._latencies)
+        num_requests = len(latencies)
+        median = _get_percentile(latencies, 50)
+        latency = _get_percentile(latencies, self.percentile)
+        if self._lowest_median is None or median < self._lowest_median:
+            self._lowest_median = median
+        latency_target = self.latency_target
+        if latency_target is None:
+            latency_target = self._lowest_median * self.latency_tolerance
+
+        if self._throttled:
+            reason = f"{self._throttled} of {num_requests} requests throttled"
+        elif self._errors / num_requests > self.error_threshold:
+            reason = f"{self._errors} of {num_requests} requests failed"
+        elif latency > latency_target:
+            reason = (f"p{self.percentile} latency {latency:.3f} s over "
+                      f"{latency_target:.3f} s")
+        else:
+            reason = None
+
+        limit = self.limit
+        if reason is not None:
+            limit = max(self.min_limit, math.floor(limit * self.decrease_factor))
+        elif self._saturated:
+            limit = min(self.max_limit, limit + self.increase)
+            reason = f"p{self.percentile} latency {latency:.3f} s, no errors"
+        if limit != self.limit:
+            logger.info("Requests in flight %d -> %d: %s", self.limit, limit, reason)
+            self.limit = limit
+            self._condition.notify_all()
+
+        self._latencies = []
+        self._errors = 0
+        self._throttled = 0
+        self._saturated = self.in_flight >= self.limit
+
+
+def _get_percentile(sorted_values, percentile):
+    # nearest rank
+    index = max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run_adaptive(controller, function, items):
+    """
+    Call the function with every item, as many at once as the controller lets.
+
+    The results are yielded as they are done, with their items. If a call
+    fails, the calls that did not start are cancelled, and its error is
+    raised once the rest are done.
+
+    Args:
+        controller (AIMDController): limiter of the calls.
+        function (callable): function called with every item.
+        items (iterable): items.
+    """
+    def call(item):
+        with controller:
+            return function(item)
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=controller.max_limit) as executor:
+        # up to max_limit calls are queued, so the items are read as needed
+        pending = {}
+        try:
+            for item in items:
+                pending[executor.submit(call, item)] = item
+                if len(pending) < controller.max_limit:
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
@@ -1,64 +1,179 @@
 import time
 import re
 import sys
+import threading
+from collections import Counter
 
 import requests
-from requests_oauthlib import OAuth2Session
-from oauthlib.oauth2 import LegacyApplicationClient
-from oauthlib.oauth2.rfc6749.errors import InvalidGrantError
+from requests.adapters import HTTPAdapter
 
+from mirri.biolomics.remote.retry import DEFAULT_MAX_RETRIES, RateLimiter, RetryPolicy
+from mirri.biolomics.remote.token_manager import DEFAULT_SKEW, TokenManager
 from mirri.entities.strain import ValidationError
 
+DEFAULT_POOL_SIZE = 10
+# seconds to connect and to wait for the answer
+DEFAULT_TIMEOUT = (10, 120)
+IDEMPOTENT_METHODS = frozenset(["GET", "PUT", "DELETE", "HEAD", "OPTIONS"])
+RETRIES = "retries"
+THROTTLE_WAITS = "throttle_waits"
+THROTTLE_SECONDS = "throttle_seconds"
+
+
+def build_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Session that keeps up to pool_size connections alive to every host.
+
+    It does not retry, BiolomicsClient does.
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class BiolomicsClient:
+    """
+    Client of the Biolomics web services.
+
+    All the requests go through a session, so the connections are reused.
+    Close the client, or use it as a context manager, to close them.
+
+    The requests are sent again when it is safe, as the retry policy
+    says, and the last answer is returned once the retries are exhausted.
+    Every attempt carries the access token valid at the time, so a retry
+    after a long wait does not go with an expired one.
+    The requests to every endpoint can be limited to rate_limit per second.
+    The retries and the waits for the rate limit are counted, see
+    get_counters.
+
+    Args:
+        pool_size (int, optional): connections kept alive.
+        max_retries (int, optional): retries of every request, if no
+            retry_policy is given.
+        timeout (float or tuple, optional): seconds to connect and to wait
+            for the answer of every request, as in requests.
+        token_skew (float, optional): seconds before the expiry of the
+            access token to refresh it, see TokenManager.
+        retry_policy (RetryPolicy, optional): when and after how long to
+            retry.
+        rate_limit (float, optional): requests per second to each endpoint.
+        burst (int, optional): requests to an endpoint let through at once,
+            by default the rate limit.
+    """
     schemas = None
     allowed_fields = None
 
     def __init__(self, server_url, api_version, client_id, client_secret,
-                 username, password, website_id=1, verbose=False):
-        self._client_id = client_id
-        self._client_secret = client_secret
-        self._username = username
-        self._password = password
-        self._client = None
+                 username, password, website_id=1, verbose=False,
+                 pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+                 timeout=DEFAULT_TIMEOUT, token_skew=DEFAULT_SKEW, retry_policy=None,
+                 rate_limit=None, burst=None):
+        self.session = build_session(pool_size=pool_size)
+        self.timeout = timeout
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_retries=max_retries)
+        self.retry_policy = retry_policy
+        self.rate_limiter = None if rate_limit is None else RateLimiter(rate_limit, burst)
+        self._counters = Counter()
+        self._counters_lock = threading.Lock()
+        self._listeners = []
         self.server_url = server_url
         self._api_version = api_version
         self._auth_url = self.server_url + "/connect/token"
-        self.access_token = None
+        self.tokens = TokenManager(self._auth_url, client_id, client_secret, username,
+                                   password, skew=token_skew, timeout=timeout)
         self.website_id = website_id
         self._verbose = verbose
-        self._schema = self.get_schemas()
+        try:
+            self._schema = self.get_schemas()
+        except BaseException:
+            self.close()
+            raise
 
-    def get_access_token(self):
-        if self._client is None:
-            self._client = LegacyApplicationClient(client_id=self._client_id)
-            authenticated = False
-        else:
-            expires_at = self._client.token["expires_at"]
-            authenticated = expires_at > time.time()
-        if not authenticated:
-            oauth = OAuth2Session(client=self._client)
+    def close(self):
+        self.session.close()
+        self.tokens.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, method, url, end_point=None, idempotent=None, **kwargs):
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        headers = dict(kwargs.pop("headers", None) or {})
+        retry = 0
+        while True:
+            if self.rate_limiter is not None and end_point is not None:
+                waited = self.rate_limiter.acquire(end_point)
+                if waited:
+                    self._count(THROTTLE_WAITS, 1)
+                    self._count(THROTTLE_SECONDS, waited)
+            headers["Authorization"] = f"Bearer {self.get_access_token()}"
+            start = time.perf_counter()
             try:
-                token = oauth.fetch_token(
-                    token_url=self._auth_url,
-                    username=self._username,
-                    password=self._password,
-                    client_id=self._client_id,
-                    client_secret=self._client_secret,
-                )
-            except InvalidGrantError:
-                oauth.close()
-                raise
-            self.access_token = token["access_token"]
-            oauth.close()
-        return self.access_token
+                response = self.session.request(method, url, headers=headers,
+                                                timeout=self.timeout, **kwargs)
+            except requests.RequestException as error:
+                self._notify(end_point, method, time.perf_counter() - start, None)
+                wait = self.retry_policy.get_wait(retry, idempotent, error=error)
+                if wait is None:
+                    raise
+            else:
+                self._notify(end_point, method, time.perf_counter() - start,
+                             response.status_code)
+                wait = self.retry_policy.get_wait(retry, idempotent, response=response)
+                if wait is None:
+                    return response
+                response.close()
+            self._count(RETRIES, 1)
+            time.sleep(wait)
+            retry += 1
+
+    def add_listener(self, listener):
+        """
+        Call the listener after every request, retries included.
+
+        It is called with the endpoint, the method, the seconds until the
+        answer or the error and the status of the answer, None if there was
+        none, e.g. AIMDController.observe. It can be called from several
+        threads at once.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, end_point, method, latency, status):
+        for listener in self._listeners:
+            listener(end_point, method, latency, status)
+
+    def _count(self, counter, value):
+        with self._counters_lock:
+            self._counters[counter] += value
+
+    def get_counters(self):
+        """Retries, waits for the rate limit and seconds waited for it"""
+        with self._counters_lock:
+            return {counter: self._counters[counter]
+                    for counter in (RETRIES, THROTTLE_WAITS, THROTTLE_SECONDS)}
+
+    @property
+    def access_token(self):
+        return self.get_access_token()
+
+    def get_access_token(self):
+        return self.tokens.get_access_token()
 
     def _build_headers(self):
-        self.get_access_token()
+        # the Authorization header is added by _request to every attempt
         return {
             "accept": "application/json",
             "websiteId": str(self.website_id),
-            "Authorization": f"Bearer {self.access_token}",
         }
 
     def get_detail_url(self, end_point, record_id, api_version=None):
@@ -84,7 +199,8 @@ class BiolomicsClient:
         header = self._build_headers()
         url = self.get_search_url(end_point)
         time0 = time.time()
-        response = requests.post(url, json=search_query, headers=header)
+        response = self._request("POST", url, end_point=end_point, idempotent=True,
+                                 json=search_query, headers=header)
         time1 = time.time()
         if self._verbose:
             sys.stdout.write(f'Search to {end_point} request time for {url}: {time1 - time0}\n')
@@ -95,7 +211,7 @@ class BiolomicsClient:
         header = self._build_headers()
         url = self.get_detail_url(end_point, record_id, api_version=self._api_version)
         time0 = time.time()
-        response = requests.get(url, headers=header)
+        response = self._request("GET", url, end_point=end_point, headers=header)
         time1 = time.time()
         if self._verbose:
             sys.stdout.write(f'Get to {end_point} request time for {url}: {time1-time0}\n')
@@ -106,7 +222,7 @@ class BiolomicsClient:
         self._check_data_consistency(data, self.allowed_fields[end_point])
         header = self._build_headers()
         url = self.get_list_url(end_point)
-        return requests.post(url, json=data, headers=header)
+        return self._request("POST", url, end_point=end_point, json=data, headers=header)
 
     def update(self, end_point, record_id, data):
         self._check_end_point_exists(end_point)
@@ -114,26 +230,27 @@ class BiolomicsClient:
                                      update=True)
         header = self._build_headers()
         url = self.get_detail_url(end_point, record_id=record_id)
-        return requests.put(url, json=data, headers=header)
+        return self._request("PUT", url, end_point=end_point, json=data, headers=header)
 
     def delete(self, end_point, record_id):
         self._check_end_point_exists(end_point)
         header = self._build_headers()
         url = self.get_detail_url(end_point, record_id)
-        return requests.delete(url, headers=header)
+        return self._request("DELETE", url, end_point=end_point, headers=header)
 
     def find_by_name(self, end_point, name):
         self._check_end_point_exists(end_point)
         header = self._build_headers()
         url = self.get_find_by_name_url(end_point)
-        response = requests.get(url, headers=header, params={'name': name})
+        response = self._request("GET", url, end_point=end_point, headers=header,
+                                 params={'name': name})
         return response
 
     def get_schemas(self):
         if self.schemas is None:
             headers = self._build_headers()
             url = self.server_url + '/schemas'
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url, headers=headers)
             if response.status_code == 200:
                 self.schemas = response.json()
             else:
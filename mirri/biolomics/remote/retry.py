@@ -0,0 +1,150 @@
+"""
+Retries and rate limits of the requests to the Biolomics web services.
+
+A request is sent again only when it is safe: the idempotent ones after any
+error of the request, timeouts included, or an error answer of
+RETRIED_STATUSES, and the rest, e.g. the creations, only when the server
+did not get them or turned them down without doing them. The waits follow the Retry-After header of the
+answer, up to a limit, or, without it, an exponential backoff with full
+jitter.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from requests.exceptions import ConnectionError, ConnectTimeout, RequestException
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+RETRIED_STATUSES = (429, 502, 503, 504)
+# the server did not do the request, so even a creation can be sent again
+DECLINED_STATUSES = (429, 503)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 60
+DEFAULT_MAX_RETRY_AFTER = 300
+
+
+class RetryPolicy():
+    """
+    When to send a request again, and how long to wait before.
+
+    Args:
+        max_retries (int, optional): retries of every request.
+        backoff_factor (float, optional): the wait before the retry n, from
+            0, is at most backoff_factor * 2 ** n seconds.
+        max_backoff (float, optional): longest wait, but for the ones asked
+            for by the server with Retry-After.
+        max_retry_after (float, optional): longest wait asked for by the
+            server with Retry-After.
+        statuses (tuple, optional): answer statuses to retry.
+    """
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, max_backoff=DEFAULT_MAX_BACKOFF,
+                 max_retry_after=DEFAULT_MAX_RETRY_AFTER, statuses=RETRIED_STATUSES):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.declined_statuses = self.statuses.intersection(DECLINED_STATUSES)
+
+    def get_wait(self, retry, idempotent, response=None, error=None):
+        """
+        Seconds to wait before sending the request again, or None to give up.
+
+        Args:
+            retry (int): retries already done.
+            idempotent (bool): whether sending the request twice does it once.
+            response (requests.Response, optional): answer to the request.
+            error (requests.RequestException, optional): error of the request.
+        """
+        if retry >= self.max_retries:
+            return None
+        if error is not None:
+            if not (idempotent and isinstance(error, RequestException)
+                    or not was_sent(error)):
+                return None
+        else:
+            statuses = self.statuses if idempotent else self.declined_statuses
+            if response.status_code not in statuses:
+                return None
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** retry))
+
+
+def was_sent(error):
+    """Whether the request of the error could have reached the server"""
+    if isinstance(error, ConnectTimeout):
+        return False
+    if isinstance(error, ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", None)
+        if isinstance(reason, (NewConnectionError, ConnectTimeoutError)):
+            return False
+    return True
+
+
+def parse_retry_after(value):
+    """Seconds of a Retry-After header, given in seconds or as a date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket():
+    """
+    Thread-safe token bucket, rate tokens per second up to burst.
+
+    Every acquire takes a token, and waits for it if the bucket is empty.
+    The tokens are reserved in order, so the callers waiting at the same
+    time are let through at the rate, one after the other.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = max(1, rate) if burst is None else burst
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, and return the seconds waited for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter():
+    """A TokenBucket per key, e.g. per endpoint"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Take a token of the key, and return the seconds waited for it"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(self.rate, self.burst))
+        return bucket.acquire()
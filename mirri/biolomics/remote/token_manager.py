@@ -0,0 +1,130 @@
+"""
+OAuth access tokens of the Biolomics web services, shared by every caller.
+
+The token is refreshed ahead of its expiry, and a single caller fetches it
+at a time: the rest of the threads and coroutines that need it meanwhile
+wait for that same fetch.
+
+    tokens = TokenManager(token_url, client_id, client_secret, username, password)
+    access_token = tokens.get_access_token()
+    access_token = await tokens.get_access_token_async()
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from oauthlib.oauth2 import LegacyApplicationClient
+from requests_oauthlib import OAuth2Session
+
+# seconds before the expiry of the token to refresh it
+DEFAULT_SKEW = 60
+
+
+class TokenManager():
+    """
+    Access token fetched with the password grant and kept until it expires.
+
+    The token is refreshed skew seconds before it expires, or halfway
+    through its life if it is short. The expiry is followed with a monotonic
+    clock, counted from the moment the token was asked for. The OAuth
+    session, and so its connection, is kept between the refreshes.
+
+    Args:
+        token_url (str): url of the token endpoint.
+        skew (float, optional): seconds before the expiry to refresh.
+        timeout (float or tuple, optional): timeout of the token requests,
+            as in requests.
+    """
+
+    def __init__(self, token_url, client_id, client_secret, username, password,
+                 skew=DEFAULT_SKEW, timeout=None):
+        self.token_url = token_url
+        self.skew = skew
+        self.timeout = timeout
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._username = username
+        self._password = password
+        self._oauth = OAuth2Session(client=LegacyApplicationClient(client_id=client_id))
+        self._lock = threading.Lock()
+        # access token and monotonic time to refresh it, replaced as a whole
+        self._token = None
+        self._refresh = None
+
+    def _get_valid_token(self):
+        token = self._token
+        if token is not None and time.monotonic() < token[1]:
+            return token[0]
+        return None
+
+    def get_access_token(self):
+        """Access token, fetched if it is missing or about to expire"""
+        access_token = self._get_valid_token()
+        if access_token is not None:
+            return access_token
+        refresh, is_owner = self._join_refresh()
+        if is_owner:
+            self._run_refresh(refresh)
+        return refresh.result()
+
+    async def get_access_token_async(self):
+        """
+        Access token, as get_access_token, without blocking the event loop.
+
+        The token is fetched in the default executor of the loop.
+        """
+        access_token = self._get_valid_token()
+        if access_token is not None:
+            return access_token
+        refresh, is_owner = self._join_refresh()
+        if is_owner:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._run_refresh, refresh)
+        return await asyncio.wrap_future(refresh)
+
+    def _join_refresh(self):
+        """The refresh in flight, and whether the caller has to run it"""
+        with self._lock:
+            if self._refresh is not None:
+                return self._refresh, False
+            refresh = Future()
+            # another caller could have refreshed it since it was checked
+            access_token = self._get_valid_token()
+            if access_token is not None:
+                refresh.set_result(access_token)
+                return refresh, False
+            self._refresh = refresh
+            return refresh, True
+
+    def _run_refresh(self, refresh):
+        # the errors go to every caller waiting for the refresh
+        try:
+            access_token = self._fetch_token()
+        except BaseException as error:
+            refresh.set_exception(error)
+        else:
+            refresh.set_result(access_token)
+        finally:
+            with self._lock:
+                self._refresh = None
+
+    def _fetch_token(self):
+        asked_at = time.monotonic()
+        token = self._oauth.fetch_token(token_url=self.token_url,
+                                        username=self._username,
+                                        password=self._password,
+                                        client_id=self._client_id,
+                                        client_secret=self._client_secret,
+                                        timeout=self.timeout)
+        expires_in = token.get("expires_in")
+        if expires_in is None:
+            refresh_at = float("inf")
+        else:
+            expires_in = float(expires_in)
+            refresh_at = asked_at + expires_in - min(self.skew, expires_in / 2)
+        self._token = (token["access_token"], refresh_at)
+        return token["access_token"]
+
+    def close(self):
+        self._oauth.close()
@@ -3,6 +3,8 @@ from mirri.biolomics.serializers import RECORD_ID, RECORD_NAME, RECORD_DETAILS
 
 
 class GenomicSequenceBiolomics(GenomicSequence):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(freeze=False, **kwargs)
 
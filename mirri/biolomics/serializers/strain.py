@@ -4,6 +4,7 @@ import pycountry
 
 from mirri import rgetattr, rsetattr
 from mirri.entities.date_range import DateRange
+from mirri.entities.location import intern_location
 from mirri.entities.strain import ORG_TYPES, OrganismType, StrainId, StrainMirri, add_taxon_to_strain
 from mirri.biolomics.remote.endoint_names import (GROWTH_MEDIUM_WS, TAXONOMY_WS,
                                                   ONTOBIOTOPE_WS, BIBLIOGRAPHY_WS, SEQUENCE_WS, COUNTRY_WS)
@@ -430,6 +431,9 @@ def serialize_from_biolomics(biolomics_strain, client=None):  # sourcery no-metr
             country_3 = None
         if country_3:
             strain.collect.location.country = country_3
+    # the strains from the same site share the location
+    strain.collect.location = intern_location(strain.collect.location)
+
     # Markers:
     if client:
         markers = []
@@ -4,6 +4,8 @@ from mirri.entities.strain import Taxonomy
 #TODO this is all wrong, needs deep revision
 
 class TaxonomyMirri(Taxonomy):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(freeze=False, **kwargs)
 
@@ -1,18 +1,28 @@
 class FrozenClass(object):
-    __isfrozen = False
+    """Base for classes that do not accept new attributes.
+
+    The attributes are fixed by __slots__, so every subclass must declare
+    its own __slots__ (empty if it adds none) to stay frozen and compact.
+    """
+    __slots__ = ()
 
     def __setattr__(self, key, value):
-        # print(dir(self))
-        if self.__isfrozen and not hasattr(self, key):
+        try:
+            object.__setattr__(self, key, value)
+        except AttributeError:
+            # errors raised inside the property setters are kept as they are
+            if hasattr(type(self), key):
+                raise
             msg = f"Can not add {key} to {self.__class__.__name__}. It is not one of its attributes"
-            raise TypeError(msg)
-        object.__setattr__(self, key, value)
+            raise TypeError(msg) from None
 
     def _freeze(self):
-        self.__isfrozen = True
+        # the attributes are already frozen by __slots__
+        pass
 
 
 class _FieldBasedClass(FrozenClass):
+    __slots__ = ('_data',)
     _fields = []
 
     def __init__(self, data=None, freeze=True):
@@ -1,7 +1,16 @@
+from array import array
+from bisect import bisect_left, bisect_right
 from calendar import monthrange
 from collections import OrderedDict
 from copy import copy
 from datetime import date
+from functools import total_ordering
+from typing import Callable, Iterable, Optional, Union
+
+# the longest range a date can cover, a leap year
+MAX_RANGE_DAYS = 366
+# days from the first to the last day of the ranges of a day, a month and a year
+_RANGE_LENGTHS = (0, 30, MAX_RANGE_DAYS - 1)
 
 
 class DateRange:
@@ -85,3 +94,202 @@ class DateRange:
     @property
     def range(self):
         return OrderedDict([("start", self._start), ("end", self._end)])
+
+    def freeze(self) -> "FrozenDateRange":
+        return FrozenDateRange(self._year, self._month, self._day)
+
+
+@total_ordering
+class FrozenDateRange(DateRange):
+    """Immutable and hashable DateRange
+
+    The range is kept as the ordinals of its first and last days, and the
+    instances are sorted by them: by start and, for the same start, the
+    shorter ranges first. The empty range goes before any other.
+
+    strpdate returns a new instance instead of modifying the range:
+
+        FrozenDateRange.from_strfdate("201410--")
+
+    It is only equal to, and sorted with, other FrozenDateRange instances,
+    as a DateRange is not hashable by value. Freeze a DateRange to compare
+    it.
+    """
+
+    def __init__(self, year=None, month=None, day=None):
+        date_range = DateRange(year, month, day)
+        set_attr = object.__setattr__
+        for attr in ("_year", "_month", "_day", "_start", "_end"):
+            set_attr(self, attr, getattr(date_range, attr))
+        set_attr(self, "_start_ordinal",
+                 None if self._start is None else self._start.toordinal())
+        set_attr(self, "_end_ordinal",
+                 None if self._end is None else self._end.toordinal())
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{self.__class__.__name__} can not be modified")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{self.__class__.__name__} can not be modified")
+
+    def __reduce__(self):
+        return self.__class__, (self._year, self._month, self._day)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._year!r}, {self._month!r}, {self._day!r})"
+
+    @classmethod
+    def from_strfdate(cls, date_str: str) -> "FrozenDateRange":
+        return DateRange().strpdate(date_str).freeze()
+
+    def strpdate(self, date_str: str) -> "FrozenDateRange":
+        return self.from_strfdate(date_str)
+
+    def freeze(self) -> "FrozenDateRange":
+        return self
+
+    def thaw(self) -> DateRange:
+        return DateRange(self._year, self._month, self._day)
+
+    @property
+    def start_ordinal(self) -> Optional[int]:
+        return self._start_ordinal
+
+    @property
+    def end_ordinal(self) -> Optional[int]:
+        return self._end_ordinal
+
+    def _sort_key(self):
+        if self._start_ordinal is None:
+            return (0, 0)
+        return (self._start_ordinal, self._end_ordinal)
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenDateRange):
+            return NotImplemented
+        return (self._year, self._month, self._day) == (other._year, other._month, other._day)
+
+    def __hash__(self):
+        return hash((self._year, self._month, self._day))
+
+    def __lt__(self, other):
+        if not isinstance(other, FrozenDateRange):
+            return NotImplemented
+        return self._sort_key() < other._sort_key()
+
+    def __contains__(self, day: date) -> bool:
+        if self._start_ordinal is None:
+            return False
+        return self._start_ordinal <= day.toordinal() <= self._end_ordinal
+
+    def overlaps(self, other: DateRange) -> bool:
+        other = other.freeze()
+        if self._start_ordinal is None or other._start_ordinal is None:
+            return False
+        return (self._start_ordinal <= other._end_ordinal
+                and other._start_ordinal <= self._end_ordinal)
+
+
+def _to_ordinals(value: Union[date, DateRange, None]):
+    if value is None:
+        return None, None
+    if isinstance(value, DateRange):
+        value = value.freeze()
+        if not value:
+            raise ValueError("Can not query an empty date range")
+        return value.start_ordinal, value.end_ordinal
+    ordinal = value.toordinal()
+    return ordinal, ordinal
+
+
+class DateRangeIndex():
+    """Index of items by a date range, e.g. of the strains by their collection date
+
+    The ranges are kept in arrays sorted by their start. A range lasts a day,
+    a month or a year, so the ranges that overlap a period start at most that
+    long before it. The ranges are also grouped by how long they last and
+    every query is a binary search per group plus a scan of the matching
+    ranges.
+
+    Args:
+        items: items to index.
+        get_date (callable, optional): function that returns the DateRange of
+            an item. Defaults to the item itself. The items without date are
+            not indexed.
+    """
+
+    def __init__(self, items: Iterable = (),
+                 get_date: Optional[Callable] = None) -> None:
+        entries = []
+        for item in items:
+            date_range = item if get_date is None else get_date(item)
+            if not date_range:
+                continue
+            date_range = date_range.freeze()
+            entries.append((date_range.start_ordinal, date_range.end_ordinal, item))
+        entries.sort(key=lambda entry: entry[:2])
+        self._starts = array("l", (entry[0] for entry in entries))
+        self._ends = array("l", (entry[1] for entry in entries))
+        self._items = [entry[2] for entry in entries]
+
+        # (longest length, starts, positions in the sorted arrays) of the
+        # ranges of a day, a month and a year
+        groups = {}
+        for position, (start, end, _) in enumerate(entries):
+            length = _RANGE_LENGTHS[bisect_left(_RANGE_LENGTHS, end - start)]
+            group_starts, positions = groups.setdefault(length, (array("l"), array("l")))
+            group_starts.append(start)
+            positions.append(position)
+        self._groups = [(length, *groups[length]) for length in sorted(groups)]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def overlapping(self, start: Union[date, DateRange, None] = None,
+                    end: Union[date, DateRange, None] = None) -> list:
+        """
+        Items whose range overlaps the period from start to end, both included.
+
+        Args:
+            start (date or DateRange, optional): first day of the period.
+                Defaults to None, no lower bound.
+            end (date or DateRange, optional): last day of the period.
+                Defaults to None, no upper bound.
+
+        Returns:
+            list: the items, sorted by date.
+        """
+        from_ordinal = _to_ordinals(start)[0]
+        to_ordinal = _to_ordinals(end)[1]
+        if from_ordinal is None:
+            if to_ordinal is None:
+                return list(self._items)
+            return self._items[:bisect_right(self._starts, to_ordinal)]
+
+        ends = self._ends
+        found = []
+        for length, starts, positions in self._groups:
+            stop = len(starts) if to_ordinal is None else bisect_right(starts, to_ordinal)
+            first = bisect_left(starts, from_ordinal - length, 0, stop)
+            found.extend(position for position in positions[first:stop]
+                         if ends[position] >= from_ordinal)
+        found.sort()
+        items = self._items
+        return [items[position] for position in found]
+
+    def after(self, day: Union[date, DateRange]) -> list:
+        """Items whose whole range is after the given day, or range"""
+        after_ordinal = _to_ordinals(day)[1]
+        return self._items[bisect_right(self._starts, after_ordinal):]
+
+    def before(self, day: Union[date, DateRange]) -> list:
+        """Items whose whole range is before the given day, or range"""
+        before_ordinal = _to_ordinals(day)[0]
+        stop = bisect_left(self._starts, before_ordinal)
+        first = bisect_left(self._starts, before_ordinal - MAX_RANGE_DAYS, 0, stop)
+        ends = self._ends
+        return self._items[:first] + [self._items[index] for index in range(first, stop)
+                                      if ends[index] < before_ordinal]
@@ -0,0 +1,209 @@
+"""
+Field level comparison of entities.
+
+The entities are compared through their dict() data. Dicts are compared key
+by key and lists regardless of their order: every item is turned into a
+hashable, order insensitive fingerprint and the lists are compared as
+multisets of fingerprints, so the cost grows linearly with their length.
+
+Some fields are not meaningful in a comparison, like the ids given to the
+publications by the server. They are excluded with paths of keys, in which
+"*" stands for every item of a list:
+
+    diff_entities(remote_strain, strain, exclude=STRAIN_DIFF_EXCLUDE)
+"""
+from collections import Counter, namedtuple
+from typing import Iterable, List, Optional, Tuple
+
+from mirri.settings import GENETICS, MARKERS, PUBLICATIONS
+
+ANY_ITEM = "*"
+
+CHANGED = "changed"
+ADDED = "added"
+REMOVED = "removed"
+
+# internal references of the publications and markers in the remote database
+STRAIN_DIFF_EXCLUDE = (
+    (PUBLICATIONS, ANY_ITEM, "id"),
+    (PUBLICATIONS, ANY_ITEM, "RecordId"),
+    (GENETICS, MARKERS, ANY_ITEM, "RecordId"),
+    (GENETICS, MARKERS, ANY_ITEM, "RecordName"),
+)
+
+_EXCLUDED = True
+_NOTHING_EXCLUDED = {}
+
+
+class Change(namedtuple("Change", ["kind", "path", "old", "new"])):
+    """A difference between two entities
+
+    Attributes:
+        kind (str): changed, added or removed.
+        path (tuple): keys, and list indexes, to reach the value.
+        old: value in the first entity, None when it was added.
+        new: value in the second entity, None when it was removed.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.kind} {format_path(self.path)}: {self.old!r} -> {self.new!r}"
+
+
+def format_path(path: Tuple) -> str:
+    return "root" + "".join(f"[{key!r}]" for key in path)
+
+
+def compile_exclude(paths: Optional[Iterable[Tuple]]) -> dict:
+    """
+    Build the lookup tree of a set of excluded paths.
+
+    Every level is a dict keyed by the next key of the paths, and the
+    excluded fields end in True. The result can be given as the exclude
+    argument of the diff functions to reuse it between comparisons.
+    """
+    tree = {}
+    for path in paths or ():
+        if not path:
+            raise ValueError("Can not exclude the root")
+        node = tree
+        for key in path[:-1]:
+            child = node.setdefault(key, {})
+            if child is _EXCLUDED:
+                break
+            node = child
+        else:
+            node[path[-1]] = _EXCLUDED
+    return tree
+
+
+def _get_exclude(exclude):
+    if exclude is None:
+        return _NOTHING_EXCLUDED
+    if isinstance(exclude, dict):
+        return exclude
+    return compile_exclude(exclude)
+
+
+def fingerprint(value, exclude: dict = _NOTHING_EXCLUDED):
+    """Hashable form of a value in which the order of the lists does not matter"""
+    if isinstance(value, dict):
+        return frozenset((key, fingerprint(item, exclude.get(key, _NOTHING_EXCLUDED)))
+                         for key, item in value.items()
+                         if exclude.get(key) is not _EXCLUDED)
+    if isinstance(value, (list, tuple)):
+        item_exclude = exclude.get(ANY_ITEM, _NOTHING_EXCLUDED)
+        if item_exclude is _EXCLUDED:
+            # every item is excluded, as in _diff the lists are all equal
+            return frozenset()
+        return frozenset(Counter(fingerprint(item, item_exclude) for item in value).items())
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def diff_data(old, new, exclude=None) -> List[Change]:
+    """
+    Compare two data structures made of dicts, lists and plain values.
+
+    Args:
+        old: first value.
+        new: second value.
+        exclude (optional): iterable of excluded paths, or its compiled form.
+
+    Returns:
+        list[Change]: the differences. Empty if the values are equal.
+    """
+    changes = []
+    _diff(old, new, _get_exclude(exclude), (), changes)
+    return changes
+
+
+def diff_entities(old, new, exclude=STRAIN_DIFF_EXCLUDE) -> List[Change]:
+    """
+    Compare two entities with a dict() method, e.g. two strains.
+
+    Args:
+        old: first entity.
+        new: second entity.
+        exclude (optional): excluded paths. Defaults to the internal ids of
+            the publications and markers of the strains.
+
+    Returns:
+        list[Change]: the differences. Empty if the entities are equal.
+    """
+    if exclude is STRAIN_DIFF_EXCLUDE:
+        exclude = _STRAIN_DIFF_EXCLUDE
+    return diff_data(old.dict(), new.dict(), exclude=exclude)
+
+
+def _diff(old, new, exclude, path, changes):
+    if isinstance(old, dict) and isinstance(new, dict):
+        _diff_dicts(old, new, exclude, path, changes)
+    elif isinstance(old, (list, tuple)) and isinstance(new, (list, tuple)):
+        item_exclude = exclude.get(ANY_ITEM, _NOTHING_EXCLUDED)
+        if item_exclude is not _EXCLUDED:
+            _diff_lists(old, new, item_exclude, path, changes)
+    elif old != new or type(old) is not type(new) and not _are_numbers(old, new):
+        changes.append(Change(CHANGED, path, old, new))
+
+
+def _are_numbers(old, new):
+    return (isinstance(old, (int, float)) and isinstance(new, (int, float))
+            and not isinstance(old, bool) and not isinstance(new, bool))
+
+
+def _diff_dicts(old, new, exclude, path, changes):
+    for key, old_value in old.items():
+        key_exclude = exclude.get(key, _NOTHING_EXCLUDED)
+        if key_exclude is _EXCLUDED:
+            continue
+        if key not in new:
+            changes.append(Change(REMOVED, path + (key,), old_value, None))
+            continue
+        new_value = new[key]
+        if old_value is new_value:
+            continue
+        _diff(old_value, new_value, key_exclude, path + (key,), changes)
+    for key, new_value in new.items():
+        if key not in old and exclude.get(key) is not _EXCLUDED:
+            changes.append(Change(ADDED, path + (key,), None, new_value))
+
+
+def _diff_lists(old, new, item_exclude, path, changes):
+    old_prints = [fingerprint(item, item_exclude) for item in old]
+    new_prints = [fingerprint(item, item_exclude) for item in new]
+    if Counter(old_prints) == Counter(new_prints):
+        return
+
+    # the items with the same fingerprint in both lists are paired, in order,
+    # and the rest reported as removed and added
+    removed = _unpaired(old_prints, Counter(new_prints))
+    added = _unpaired(new_prints, Counter(old_prints))
+
+    # an item edited in place is reported as the changes of its fields
+    if len(removed) == len(added) and all(
+            isinstance(old[old_index], dict) and isinstance(new[new_index], dict)
+            for old_index, new_index in zip(removed, added)):
+        for old_index, new_index in zip(removed, added):
+            _diff_dicts(old[old_index], new[new_index], item_exclude,
+                        path + (new_index,), changes)
+        return
+
+    for index in removed:
+        changes.append(Change(REMOVED, path + (index,), old[index], None))
+    for index in added:
+        changes.append(Change(ADDED, path + (index,), None, new[index]))
+
+
+def _unpaired(prints, available):
+    unpaired = []
+    for index, item_print in enumerate(prints):
+        if available[item_print] > 0:
+            available[item_print] -= 1
+        else:
+            unpaired.append(index)
+    return unpaired
+
+
+_STRAIN_DIFF_EXCLUDE = compile_exclude(STRAIN_DIFF_EXCLUDE)
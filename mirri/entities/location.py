@@ -1,6 +1,6 @@
 from __future__ import  annotations
-import hashlib
 from typing import Union
+from weakref import WeakValueDictionary
 
 from mirri.entities._private_classes import _FieldBasedClass
 from mirri.settings import (
@@ -22,6 +22,8 @@ import pycountry
 
 
 class Location(_FieldBasedClass):
+    # the interned locations are kept by weak references
+    __slots__ = ('__weakref__',)
     _fields = [
         {"attribute": "country", "label": COUNTRY},
         {"attribute": "state", "label": STATE},
@@ -51,13 +53,18 @@ class Location(_FieldBasedClass):
 
         return ": ".join(_site)
 
+    def key(self) -> tuple:
+        """Values of all the fields, the identity of the location"""
+        data = self._data
+        return tuple(data.get(label) for label in _LOCATION_LABELS)
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, Location):
+            return self.key() == o.key()
+        return super().__eq__(o)
+
     def __hash__(self):
-        hash_str = ''
-        for field in self._fields:
-            value = str(getattr(self, field, None))
-            hash_str += value
-        # hash_str = str(self.country) + str(self.province) + str(self.municipality) + str(self.site)
-        return int(hashlib.sha1(hash_str.encode("utf-8")).hexdigest(), 16) % (10 ** 8)
+        return hash(self.key())
 
     @property
     def country(self) -> Union[str, None]:
@@ -168,3 +175,34 @@ class Location(_FieldBasedClass):
     @other.setter
     def other(self, other):
         self._data[OTHER] = other
+
+
+_LOCATION_LABELS = tuple(field["label"] for field in Location._fields)
+_INTERNED_LOCATIONS = WeakValueDictionary()
+
+
+def intern_location(location: Location) -> Location:
+    """
+    Get the shared instance of the locations equal to the given one.
+
+    The strains collected at the same site can share one Location instead of
+    holding a copy each. The shared instances must not be modified: to change
+    the location of a strain give it a new Location. Empty locations are not
+    shared, as they are usually filled in later.
+
+    Args:
+        location (Location): location to intern.
+
+    Returns:
+        Location: the first interned location equal to the given one still
+            in use, or the given one.
+    """
+    key = location.key()
+    if all(value is None for value in key):
+        return location
+    interned = _INTERNED_LOCATIONS.get(key)
+    # an interned location modified in spite of it all is replaced
+    if interned is None or interned.key() != key:
+        _INTERNED_LOCATIONS[key] = location
+        return location
+    return interned
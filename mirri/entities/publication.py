@@ -11,6 +11,11 @@ RECORD_NAME = 'RecordName'
 
 
 class Publication:
+    # besides _data, the attributes that are set by the parsers and
+    # serializers but are not part of dict()
+    __slots__ = ('_data', 'full_reference', 'book_editor', 'editor',
+                 'strains', 'taxa', 'journal_book')
+
     def __init__(self, data=None):
         self._data = {}
         if data:
@@ -1,3 +1,6 @@
+import re
+import zlib
+
 from mirri.entities._private_classes import _FieldBasedClass
 from mirri.settings import (
     ALLOWED_MARKER_TYPES,
@@ -7,8 +10,105 @@ from mirri.settings import (
 
 from mirri import  ValidationError
 
+# the accepted marker types, each one mapped to itself so every marker
+# holds the same str instance
+_MARKER_TYPES = {marker["acronym"]: marker["acronym"] for marker in ALLOWED_MARKER_TYPES}
+
+_PACKED_BASES = "ACGT"
+# ACGT to the base 4 digits that int() packs, anything else to 0
+_TO_DIGITS = str.maketrans({base: str(index) for index, base in enumerate(_PACKED_BASES)})
+# every packed byte to its four bases
+_FROM_BYTE = tuple("".join(_PACKED_BASES[(byte >> shift) & 3] for shift in (6, 4, 2, 0))
+                   for byte in range(256))
+_NOT_PACKED = re.compile(f"[^{_PACKED_BASES}]+")
+_NOT_DIGITS = re.compile("[^0-3]")
+
+
+class NucleotideSequence():
+    """Immutable DNA sequence packed in two bits per base
+
+    A, C, G and T are packed four to a byte. The runs of any other character,
+    IUPAC ambiguity codes, gaps or lower case bases in a mixed case sequence,
+    are kept apart as they are. A sequence all in lower case is packed as
+    upper case and lowered back when decoded.
+
+    The length and a CRC-32 checksum of the sequence are computed once, so
+    sequences of different length or checksum are told apart without
+    decoding them. str() decodes the sequence.
+
+    Args:
+        sequence (str): the sequence.
+    """
+    __slots__ = ("_packed", "_length", "_others", "_lower", "_checksum")
+
+    def __init__(self, sequence: str) -> None:
+        set_attr = object.__setattr__
+        set_attr(self, "_checksum", zlib.crc32(sequence.encode("utf-8")))
+        lower = sequence.islower()
+        if lower:
+            sequence = sequence.upper()
+        set_attr(self, "_lower", lower)
+        set_attr(self, "_length", len(sequence))
+        set_attr(self, "_others", tuple((match.start(), match.group())
+                                        for match in _NOT_PACKED.finditer(sequence)))
+        digits = sequence.translate(_TO_DIGITS)
+        if self._others:
+            digits = _NOT_DIGITS.sub("0", digits)
+        num_bytes = (len(digits) + 3) // 4
+        packed = int(digits, 4).to_bytes(num_bytes, "big") if digits else b""
+        set_attr(self, "_packed", packed)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("NucleotideSequence can not be modified")
+
+    def __reduce__(self):
+        return self.__class__, (str(self),)
+
+    def __str__(self) -> str:
+        sequence = "".join(map(_FROM_BYTE.__getitem__, self._packed))
+        # the digits are right aligned in the packed bytes
+        sequence = sequence[len(sequence) - self._length:]
+        if self._others:
+            pieces = []
+            end = 0
+            for start, others in self._others:
+                pieces.append(sequence[end:start])
+                pieces.append(others)
+                end = start + len(others)
+            pieces.append(sequence[end:])
+            sequence = "".join(pieces)
+        return sequence.lower() if self._lower else sequence
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self)!r})"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return bool(self._length)
+
+    @property
+    def checksum(self) -> int:
+        return self._checksum
+
+    def __hash__(self):
+        return hash((self._length, self._checksum))
+
+    def __eq__(self, other):
+        if isinstance(other, NucleotideSequence):
+            return (self._length == other._length and self._checksum == other._checksum
+                    and self._packed == other._packed and self._others == other._others
+                    and self._lower == other._lower)
+        if isinstance(other, str):
+            return (self._length == len(other)
+                    and self._checksum == zlib.crc32(other.encode("utf-8"))
+                    and str(self) == other)
+        return NotImplemented
+
 
 class GenomicSequence(_FieldBasedClass):
+    __slots__ = ()
     _fields = [
         {"attribute": "marker_type", "label": MARKER_TYPE},
         {"attribute": "marker_id", "label": MARKER_INSDC},
@@ -22,10 +122,12 @@ class GenomicSequence(_FieldBasedClass):
     @marker_type.setter
     def marker_type(self, value: str):
         if value is not None:
-            types = " ".join([m["acronym"] for m in ALLOWED_MARKER_TYPES])
-            if value not in types:
+            try:
+                value = _MARKER_TYPES[value]
+            except (KeyError, TypeError):
+                types = " ".join(_MARKER_TYPES)
                 msg = f"{value} not in allowed marker types: {types}"
-                raise ValidationError(msg)
+                raise ValidationError(msg) from None
             self._data[MARKER_TYPE] = value
 
     @property
@@ -38,8 +140,22 @@ class GenomicSequence(_FieldBasedClass):
 
     @property
     def marker_seq(self) -> str:
-        return self._data.get(MARKER_SEQ, None)
+        value = self._data.get(MARKER_SEQ, None)
+        if isinstance(value, NucleotideSequence):
+            return str(value)
+        return value
 
     @marker_seq.setter
     def marker_seq(self, value: str):
+        # the sequences are kept packed and decoded when they are read
+        if isinstance(value, str):
+            value = NucleotideSequence(value)
         self._data[MARKER_SEQ] = value
+
+    @property
+    def packed_marker_seq(self) -> NucleotideSequence:
+        """The sequence without decoding it, e.g. to compare it"""
+        value = self._data.get(MARKER_SEQ, None)
+        if isinstance(value, str):
+            value = NucleotideSequence(value)
+        return value
@@ -122,40 +122,67 @@ ORG_TYPES = {
 }
 
 
+ORG_TYPE_NAMES = {code: name for name, code in ORG_TYPES.items()}
+
+
 class OrganismType(FrozenClass):
+    """Organism type, given by its code or its name
+
+    There is one shared, immutable instance per organism type, so building
+    them does not allocate anything:
+
+        OrganismType(3) is OrganismType("Bacteria")
+    """
+    __slots__ = ('_data',)
+
+    def __new__(cls, value=None):
+        try:
+            return _ORGANISM_TYPES[value]
+        except (KeyError, TypeError):
+            # guess_type raises the error for the unknown values
+            return super().__new__(cls)
 
     def __init__(self, value=None):
+        if self._is_built():
+            return
         self._data = {}
         self.guess_type(value)
         self._freeze()
 
+    def _is_built(self):
+        return bool(getattr(self, "_data", None))
+
+    def __reduce__(self):
+        return self.__class__, (self.code,)
+
     def dict(self):
-        return self._data
+        return dict(self._data)
 
     def __str__(self):
         return f"{self.code} {self.name}"
 
+    def _check_not_built(self):
+        if self._is_built():
+            raise AttributeError("OrganismType instances are shared and can not be modified")
+
     @property
     def code(self):
         return self._data.get("code", None)
 
     @code.setter
     def code(self, code: int):
+        self._check_not_built()
         try:
             code = int(code)
         except TypeError as error:
             msg = f"code {code} not accepted for organism type"
             raise ValidationError(msg) from error
 
-        if code not in ORG_TYPES.values():
+        if code not in ORG_TYPE_NAMES:
             msg = f"code {code} not accepted for organism type"
             raise ValidationError(msg)
         self._data["code"] = code
-        name = None
-        for _name, _code in ORG_TYPES.items():
-            if _code == code:
-                name = _name
-        self._data["name"] = name
+        self._data["name"] = ORG_TYPE_NAMES[code]
 
     @property
     def name(self):
@@ -163,6 +190,7 @@ class OrganismType(FrozenClass):
 
     @name.setter
     def name(self, name: str):
+        self._check_not_built()
         error_msg = f"name {name} not accepted for organism type"
         accepted_types = ORG_TYPES.keys()
         if name not in accepted_types:
@@ -180,7 +208,23 @@ class OrganismType(FrozenClass):
             self.name = value
 
 
+def _build_organism_types():
+    organism_types = {}
+    for name, code in ORG_TYPES.items():
+        organism_type = object.__new__(OrganismType)
+        object.__setattr__(organism_type, "_data", {"code": code, "name": name})
+        organism_types[code] = organism_types[str(code)] = organism_type
+        organism_types[name] = organism_type
+    return organism_types
+
+
+# the shared instances, by code, code as str and name
+_ORGANISM_TYPES = _build_organism_types()
+
+
 class Taxonomy(FrozenClass):
+    __slots__ = ('_data',)
+
     def __init__(self, data=None):
         self._data = {}
         if data is not None:
@@ -373,6 +417,7 @@ class Taxonomy(FrozenClass):
 
 
 class _GeneralStep(FrozenClass):
+    __slots__ = ('_data',)
     _date_tag = None
     _who_tag = None
     _location_tag = None
@@ -381,8 +426,9 @@ class _GeneralStep(FrozenClass):
         self._data = {}
         if data is None:
             data = {}
-        if self._location_tag is not None:
-            self.location = Location(data.get(self._location_tag, None))
+        # the location is only built here when it is given, see location
+        if self._location_tag is not None and data.get(self._location_tag):
+            self.location = Location(data[self._location_tag])
         if self._date_tag:
             self.who = data.get(self._who_tag, None)
         if self._date_tag:
@@ -392,11 +438,18 @@ class _GeneralStep(FrozenClass):
                 self.date = _date
 
     def __bool__(self):
-        return bool(self.location) or bool(self.date) or bool(self.who)
+        return (bool(self._data.get(self._location_tag)) or bool(self.date)
+                or bool(self.who))
 
     @property
     def location(self) -> Location:
-        return self._data.get(self._location_tag, None)
+        if self._location_tag is None:
+            return None
+        try:
+            return self._data[self._location_tag]
+        except KeyError:
+            location = self._data[self._location_tag] = Location()
+            return location
 
     @location.setter
     def location(self, location: Location):
@@ -431,8 +484,9 @@ class _GeneralStep(FrozenClass):
 
     def dict(self):
         _data = {}
-        if self.location:
-            _data[self._location_tag] = self.location.dict()
+        location = self._data.get(self._location_tag)
+        if location:
+            _data[self._location_tag] = location.dict()
         if self.who:
             _data[self._who_tag] = self._data[self._who_tag]
         if self.date:
@@ -441,6 +495,7 @@ class _GeneralStep(FrozenClass):
 
 
 class Collect(_GeneralStep):
+    __slots__ = ()
     _date_tag = DATE_OF_COLLECTION
     _who_tag = COLLECTED_BY
     _location_tag = LOCATION
@@ -500,6 +555,7 @@ class Collect(_GeneralStep):
 
 
 class Isolation(_GeneralStep):
+    __slots__ = ()
     _who_tag = ISOLATED_BY
     _date_tag = DATE_OF_ISOLATION
 
@@ -528,6 +584,7 @@ class Isolation(_GeneralStep):
 
 
 class Deposit(_GeneralStep):
+    __slots__ = ()
     _who_tag = DEPOSITOR
     _date_tag = DATE_OF_DEPOSIT
 
@@ -539,6 +596,8 @@ class Deposit(_GeneralStep):
 
 
 class StrainId(FrozenClass):
+    __slots__ = ('_id_dict',)
+
     def __init__(self, id_dict=None, collection=None, number=None):
         if id_dict and (collection or number):
             msg = "Can not initialize with dict and number or collection"
@@ -621,6 +680,8 @@ class StrainId(FrozenClass):
 
 
 class Genetics(FrozenClass):
+    __slots__ = ('_data',)
+
     def __init__(self, data=None):
         self._data = {}
         if data and SEXUAL_STATE in data:
@@ -753,6 +814,7 @@ class Genetics(FrozenClass):
 
 
 class Growth(_FieldBasedClass):
+    __slots__ = ()
     _fields = [
         {"attribute": "tested_temp_range", "label": TESTED_TEMPERATURE_GROWTH_RANGE},
         {"attribute": "recommended_media", "label": RECOMMENDED_GROWTH_MEDIUM},
@@ -799,6 +861,8 @@ class Growth(_FieldBasedClass):
 
 
 class Strain(FrozenClass):
+    __slots__ = ('_data',)
+
     def __init__(self, data=None):
         self._data = {}
         if data is None:
@@ -820,31 +884,37 @@ class Strain(FrozenClass):
             inclusion_date = _date.strpdate(inclusion_date)
         self.catalog_inclusion_date = inclusion_date
 
-        self.id = StrainId(data.get(STRAIN_ID, None))
-
-        self.taxonomy = Taxonomy(data.get(TAXONOMY, None))
-
-        self.deposit = Deposit(data.get(DEPOSIT, None))
-
-        self.collect = Collect(data.get(COLLECT, None))
-
-        self.isolation = Isolation(data.get(ISOLATION, None))
-
-        self.growth = Growth(data.get(GROWTH, None))
-
-        self.genetics = Genetics(data.get(GENETICS, None))
-
-        self.other_numbers = []
-        if data and OTHER_CULTURE_NUMBERS in data:
-            for other_number in data[OTHER_CULTURE_NUMBERS]:
-                self.other_numbers.append(StrainId(other_number))
-
-        self.publications = []
-        if data and PUBLICATIONS in data:
-            for pub in data[PUBLICATIONS]:
-                self.publications.append(Publication(pub))
+        # the parts of the strain are only built here when they are given.
+        # The rest are built the first time they are accessed, see _get_part
+        if STRAIN_ID in data:
+            self.id = StrainId(data[STRAIN_ID])
+        if TAXONOMY in data:
+            self.taxonomy = Taxonomy(data[TAXONOMY])
+        if DEPOSIT in data:
+            self.deposit = Deposit(data[DEPOSIT])
+        if COLLECT in data:
+            self.collect = Collect(data[COLLECT])
+        if ISOLATION in data:
+            self.isolation = Isolation(data[ISOLATION])
+        if GROWTH in data:
+            self.growth = Growth(data[GROWTH])
+        if GENETICS in data:
+            self.genetics = Genetics(data[GENETICS])
+
+        if OTHER_CULTURE_NUMBERS in data:
+            self.other_numbers = [StrainId(other_number)
+                                  for other_number in data[OTHER_CULTURE_NUMBERS]]
+        if PUBLICATIONS in data:
+            self.publications = [Publication(pub) for pub in data[PUBLICATIONS]]
         self._freeze()
 
+    def _get_part(self, key, factory):
+        try:
+            return self._data[key]
+        except KeyError:
+            part = self._data[key] = factory()
+            return part
+
     def __str__(self):
         return f"Strain {self.id.collection} {self.id.number}"
 
@@ -871,7 +941,7 @@ class Strain(FrozenClass):
 
     @property
     def id(self) -> StrainId:
-        return self._data.get(STRAIN_ID, None)
+        return self._get_part(STRAIN_ID, StrainId)
 
     @id.setter
     def id(self, _id: StrainId):
@@ -1011,7 +1081,7 @@ class Strain(FrozenClass):
 
     @property
     def other_numbers(self) -> List[StrainId]:
-        return self._data.get(OTHER_CULTURE_NUMBERS, None)
+        return self._get_part(OTHER_CULTURE_NUMBERS, list)
 
     @other_numbers.setter
     def other_numbers(self, value: List[StrainId]):
@@ -1055,7 +1125,7 @@ class Strain(FrozenClass):
 
     @property
     def taxonomy(self) -> Taxonomy:
-        return self._data.get(TAXONOMY, None)
+        return self._get_part(TAXONOMY, Taxonomy)
 
     @taxonomy.setter
     def taxonomy(self, value: Taxonomy):
@@ -1063,7 +1133,7 @@ class Strain(FrozenClass):
 
     @property
     def collect(self) -> Collect:
-        return self._data.get(COLLECT, None)
+        return self._get_part(COLLECT, Collect)
 
     @collect.setter
     def collect(self, _collect: Collect):
@@ -1071,7 +1141,7 @@ class Strain(FrozenClass):
 
     @property
     def deposit(self) -> Deposit:
-        return self._data.get(DEPOSIT, None)
+        return self._get_part(DEPOSIT, Deposit)
 
     @deposit.setter
     def deposit(self, _deposit: Deposit):
@@ -1079,7 +1149,7 @@ class Strain(FrozenClass):
 
     @property
     def isolation(self) -> Isolation:
-        return self._data.get(ISOLATION, None)
+        return self._get_part(ISOLATION, Isolation)
 
     @isolation.setter
     def isolation(self, _isolation: Isolation):
@@ -1087,7 +1157,7 @@ class Strain(FrozenClass):
 
     @property
     def growth(self) -> Growth:
-        return self._data.get(GROWTH, None)
+        return self._get_part(GROWTH, Growth)
 
     @growth.setter
     def growth(self, _growth: Growth):
@@ -1095,7 +1165,7 @@ class Strain(FrozenClass):
 
     @property
     def genetics(self) -> Genetics:
-        return self._data.get(GENETICS, None)
+        return self._get_part(GENETICS, Genetics)
 
     @genetics.setter
     def genetics(self, _genetics: Genetics):
@@ -1103,7 +1173,7 @@ class Strain(FrozenClass):
 
     @property
     def publications(self) -> Union[List[Publication], None]:
-        return self._data.get(PUBLICATIONS, None)
+        return self._get_part(PUBLICATIONS, list)
 
     @publications.setter
     def publications(self, value: List[Publication]):
@@ -1184,6 +1254,7 @@ class Strain(FrozenClass):
 
 
 class StrainMirri(Strain):
+    __slots__ = ()
 
     @property
     def record_id(self):
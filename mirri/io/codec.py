@@ -0,0 +1,435 @@
+"""
+Fast conversion of the entities to and from plain data.
+
+The codec works directly on the internal data of the entities. A schema
+tells, for every entity, which of its keys hold other entities, lists of
+entities or dates, and from it an encoder and a decoder are built once per
+entity class. The rest of the values are plain python values and are passed
+through as they are, they are not copied. The dates are decoded as
+FrozenDateRange instances.
+
+The encoded form is the one of the dict() methods of the entities, so it can
+be dumped as JSON or, if msgpack is installed, as msgpack. Decoding does not
+go through the property setters, so it does not validate the data again: it
+is meant to load what encode produced.
+
+A catalog is a stream of entities written one record at a time:
+
+    with open("catalog.jsonl", "wb") as fhand:
+        dump_catalog(strains, fhand)
+    with open("catalog.jsonl", "rb") as fhand:
+        for strain in load_catalog(fhand):
+            ...
+"""
+import json
+from collections import namedtuple
+from functools import lru_cache
+from operator import attrgetter
+
+from mirri.biolomics.serializers.sequence import GenomicSequenceBiolomics
+from mirri.entities.date_range import FrozenDateRange
+from mirri.entities.growth_medium import GrowthMedium
+from mirri.entities.location import Location, intern_location
+from mirri.entities.publication import Publication
+from mirri.entities.sequence import GenomicSequence, NucleotideSequence
+from mirri.entities.strain import (Collect, Deposit, Genetics, Growth, Isolation,
+                                   OrganismType, Strain, StrainId, StrainMirri,
+                                   Taxonomy)
+from mirri.settings import (COLLECT, DATE_OF_COLLECTION, DATE_OF_DEPOSIT,
+                            DATE_OF_INCLUSION, DATE_OF_ISOLATION, DEPOSIT,
+                            GENETICS, GROWTH, ID_SYNONYMS, ISOLATION, LOCATION,
+                            MARKER_SEQ, MARKERS, ORGANISM_TYPE, OTHER_CULTURE_NUMBERS,
+                            PUBLICATIONS, QUARANTINE, STRAIN_ID, TAXONOMY)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+FORMATS = (JSON, MSGPACK)
+
+CATALOG_FORMAT = "mirri-catalog"
+CATALOG_VERSION = 1
+
+# publication attributes that are not part of its dict()
+PUBLICATION_ATTRIBUTES = ("full_reference", "book_editor", "editor", "strains",
+                          "taxa", "journal_book")
+PUBLICATION_ATTRIBUTES_KEY = "_attributes"
+
+_ENTITY = "entity"
+_ENTITY_LIST = "entity_list"
+_DATE = "date"
+_SEQUENCE = "sequence"
+
+_Field = namedtuple("_Field", ["kind", "schema"])
+# required: keys always set by the constructor of the entity. When they are
+# not in the encoded data they are decoded as an empty entity, an empty list
+# or None
+_Schema = namedtuple("_Schema", ["entity_class", "data_attr", "fields", "required"])
+_Codec = namedtuple("_Codec", ["encode", "decode"])
+
+_DATE_FIELD = _Field(_DATE, None)
+_SEQUENCE_FIELDS = {MARKER_SEQ: _Field(_SEQUENCE, None)}
+
+_STRAIN_FIELDS = {
+    STRAIN_ID: _Field(_ENTITY, "StrainId"),
+    TAXONOMY: _Field(_ENTITY, "Taxonomy"),
+    DEPOSIT: _Field(_ENTITY, "Deposit"),
+    COLLECT: _Field(_ENTITY, "Collect"),
+    ISOLATION: _Field(_ENTITY, "Isolation"),
+    GROWTH: _Field(_ENTITY, "Growth"),
+    GENETICS: _Field(_ENTITY, "Genetics"),
+    OTHER_CULTURE_NUMBERS: _Field(_ENTITY_LIST, "StrainId"),
+    ID_SYNONYMS: _Field(_ENTITY_LIST, "StrainId"),
+    PUBLICATIONS: _Field(_ENTITY_LIST, "Publication"),
+    DATE_OF_INCLUSION: _DATE_FIELD,
+}
+# the other parts of the strains are built when they are first accessed
+_STRAIN_REQUIRED = (QUARANTINE,)
+
+SCHEMAS = {
+    "Location": _Schema(Location, "_data", {}, ()),
+    "GenomicSequence": _Schema(GenomicSequence, "_data", _SEQUENCE_FIELDS, ()),
+    "GenomicSequenceBiolomics": _Schema(GenomicSequenceBiolomics, "_data",
+                                        _SEQUENCE_FIELDS, ()),
+    "OrganismType": _Schema(OrganismType, "_data", {}, ()),
+    "Publication": _Schema(Publication, "_data", {}, ()),
+    "GrowthMedium": _Schema(GrowthMedium, "_data", {}, ()),
+    "StrainId": _Schema(StrainId, "_id_dict", {}, ()),
+    "Growth": _Schema(Growth, "_data", {}, ()),
+    "Taxonomy": _Schema(Taxonomy, "_data",
+                        {ORGANISM_TYPE: _Field(_ENTITY_LIST, "OrganismType")}, ()),
+    "Collect": _Schema(Collect, "_data", {LOCATION: _Field(_ENTITY, "Location"),
+                                          DATE_OF_COLLECTION: _DATE_FIELD}, ()),
+    "Isolation": _Schema(Isolation, "_data", {DATE_OF_ISOLATION: _DATE_FIELD}, ()),
+    "Deposit": _Schema(Deposit, "_data", {DATE_OF_DEPOSIT: _DATE_FIELD}, ()),
+    "Genetics": _Schema(Genetics, "_data",
+                        {MARKERS: _Field(_ENTITY_LIST, "GenomicSequence")},
+                        (MARKERS,)),
+    "Strain": _Schema(Strain, "_data", _STRAIN_FIELDS, _STRAIN_REQUIRED),
+    # the markers of the MIRRI-IS strains keep their record ids and names
+    "GeneticsMirri": _Schema(Genetics, "_data",
+                             {MARKERS: _Field(_ENTITY_LIST, "GenomicSequenceBiolomics")},
+                             (MARKERS,)),
+    "StrainMirri": _Schema(StrainMirri, "_data",
+                           dict(_STRAIN_FIELDS, **{GENETICS: _Field(_ENTITY, "GeneticsMirri")}),
+                           _STRAIN_REQUIRED),
+}
+# the schema used for each class when encoding, and the one that names the
+# records of a catalog
+SCHEMA_BY_CLASS = {schema.entity_class: name for name, schema in SCHEMAS.items()
+                   if name != "GeneticsMirri"}
+
+_CODECS = {}
+
+
+def get_codec(schema_name):
+    """
+    Get the encoder and decoder of a schema, compiling them the first time.
+
+    Args:
+        schema_name (str): name of the schema, one of SCHEMAS.
+
+    Returns:
+        _Codec: (encode, decode) functions.
+    """
+    try:
+        return _CODECS[schema_name]
+    except KeyError:
+        pass
+    try:
+        schema = SCHEMAS[schema_name]
+    except KeyError:
+        raise ValueError(f"No codec for {schema_name}")
+    codec = _compile(schema)
+    _CODECS[schema_name] = codec
+    return codec
+
+
+def _compile(schema):
+    get_data = attrgetter(schema.data_attr)
+    entity_class = schema.entity_class
+    new = entity_class.__new__
+    set_data = object.__setattr__
+    data_attr = schema.data_attr
+
+    encoders = {}
+    decoders = {}
+    for key, field in schema.fields.items():
+        encoders[key], decoders[key] = _compile_field(field)
+    required = tuple((key, _compile_default(schema.fields.get(key)))
+                     for key in schema.required)
+
+    if not encoders and not required:
+        # entities with plain values only
+        def encode(entity):
+            return {key: value for key, value in get_data(entity).items()
+                    if value is not None}
+
+        def decode(encoded):
+            entity = new(entity_class)
+            set_data(entity, data_attr, dict(encoded))
+            return entity
+    else:
+        def encode(entity):
+            encoded = {}
+            for key, value in get_data(entity).items():
+                if value is None:
+                    continue
+                encoder = encoders.get(key)
+                if encoder is not None:
+                    value = encoder(value)
+                    # empty entities and dates are left out, as dict() does
+                    if not value:
+                        continue
+                encoded[key] = value
+            return encoded
+
+        decoders = tuple(decoders.items())
+
+        def decode(encoded):
+            data = dict(encoded)
+            for key, decoder in decoders:
+                value = data.get(key)
+                if value is not None:
+                    data[key] = decoder(value)
+            for key, default in required:
+                if key not in data:
+                    data[key] = default()
+            entity = new(entity_class)
+            set_data(entity, data_attr, data)
+            return entity
+
+    if entity_class is Publication:
+        return _Codec(_with_publication_attributes(encode),
+                      _with_publication_attributes_decoded(decode))
+    if entity_class is Location:
+        return _Codec(encode, _interned_location_decoded(decode))
+    if entity_class is OrganismType:
+        # there is one shared instance per organism type
+        return _Codec(encode, _decode_organism_type)
+    return _Codec(encode, decode)
+
+
+def _compile_field(field):
+    if field.kind == _DATE:
+        return _encode_date, _decode_date
+    if field.kind == _SEQUENCE:
+        return _encode_sequence, NucleotideSequence
+
+    # the schemas have no cycles, so the codecs of the sub entities can be
+    # compiled right away
+    encode_entity, decode_entity = get_codec(field.schema)
+    if field.kind == _ENTITY:
+        return encode_entity, decode_entity
+
+    def encode_list(entities):
+        return [encode_entity(entity) for entity in entities]
+
+    if field.schema == "OrganismType":
+        # the organism types can be given by their code or name too
+        def decode_list(encoded):
+            return [_decode_organism_type(item) for item in encoded]
+    else:
+        def decode_list(encoded):
+            return [decode_entity(item) for item in encoded]
+    return encode_list, decode_list
+
+
+def _compile_default(field):
+    if field is None or field.kind == _DATE:
+        return lambda: None
+    if field.kind == _ENTITY_LIST:
+        return list
+    decode_entity = get_codec(field.schema).decode
+    return lambda: decode_entity({})
+
+
+def _encode_date(date_range):
+    return date_range.strfdate if date_range else None
+
+
+def _encode_sequence(sequence):
+    return str(sequence)
+
+
+# the dates are decoded as immutable ranges, so the same date can be shared
+# by all the entities that have it
+@lru_cache(maxsize=4096)
+def _decode_date(strfdate):
+    return FrozenDateRange.from_strfdate(strfdate)
+
+
+def _decode_organism_type(encoded):
+    if isinstance(encoded, dict):
+        encoded = encoded.get("code")
+    return OrganismType(encoded)
+
+
+def _interned_location_decoded(decode):
+    def decode_location(encoded):
+        return intern_location(decode(encoded))
+    return decode_location
+
+
+def _with_publication_attributes(encode):
+    def encode_publication(publication):
+        encoded = encode(publication)
+        attributes = {}
+        for attribute in PUBLICATION_ATTRIBUTES:
+            value = getattr(publication, attribute, None)
+            if value is not None:
+                attributes[attribute] = value
+        if attributes:
+            encoded[PUBLICATION_ATTRIBUTES_KEY] = attributes
+        return encoded
+    return encode_publication
+
+
+def _with_publication_attributes_decoded(decode):
+    def decode_publication(encoded):
+        attributes = encoded.get(PUBLICATION_ATTRIBUTES_KEY)
+        if attributes is None:
+            return decode(encoded)
+        encoded = {key: value for key, value in encoded.items()
+                   if key != PUBLICATION_ATTRIBUTES_KEY}
+        publication = decode(encoded)
+        for attribute, value in attributes.items():
+            setattr(publication, attribute, value)
+        return publication
+    return decode_publication
+
+
+def _get_schema_name(entity):
+    try:
+        return SCHEMA_BY_CLASS[entity.__class__]
+    except KeyError:
+        raise ValueError(f"No codec for {entity.__class__.__name__}")
+
+
+def encode(entity) -> dict:
+    """
+    Encode an entity into plain python data.
+
+    Args:
+        entity: Strain, StrainMirri, Publication, GrowthMedium or GenomicSequence
+            instance, or any of their parts.
+
+    Returns:
+        dict: the data of the entity, in the form given by its dict() method.
+    """
+    return get_codec(_get_schema_name(entity)).encode(entity)
+
+
+def decode(encoded: dict, entity_class):
+    """
+    Build an entity from the data given by encode.
+
+    Args:
+        encoded (dict): data of the entity.
+        entity_class: class of the entity to build.
+
+    Returns:
+        An instance of entity_class.
+    """
+    try:
+        schema_name = SCHEMA_BY_CLASS[entity_class]
+    except KeyError:
+        raise ValueError(f"No codec for {entity_class.__name__}")
+    return get_codec(schema_name).decode(encoded)
+
+
+def _plain_default(value):
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {value.__class__.__name__} can not be encoded")
+
+
+def _check_format(format):
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format}. Use one of {FORMATS}")
+    if format == MSGPACK and msgpack is None:
+        raise ImportError("msgpack is required for the msgpack format. "
+                          "Install it with pip install msgpack")
+
+
+def dump_catalog(entities, fhand, format: str = JSON) -> int:
+    """
+    Write entities to a file one by one.
+
+    JSON catalogs have one JSON document per line. The first one is a header,
+    and the rest are [schema name, encoded entity] pairs.
+
+    Args:
+        entities: iterable of entities. They can be of different classes.
+        fhand: binary file handle to write to.
+        format (str, optional): json or msgpack. Defaults to json.
+
+    Returns:
+        int: number of entities written.
+    """
+    _check_format(format)
+    header = {"format": CATALOG_FORMAT, "version": CATALOG_VERSION}
+    if format == JSON:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"),
+                                 default=_plain_default).encode
+
+        def write(record):
+            fhand.write(dumps(record).encode("utf-8"))
+            fhand.write(b"\n")
+    else:
+        write_packed = msgpack.Packer(use_bin_type=True, default=_plain_default).pack
+
+        def write(record):
+            fhand.write(write_packed(record))
+
+    write(header)
+    codecs = {}
+    num_entities = 0
+    for entity in entities:
+        entity_class = entity.__class__
+        try:
+            schema_name, encode_entity = codecs[entity_class]
+        except KeyError:
+            schema_name = _get_schema_name(entity)
+            encode_entity = get_codec(schema_name).encode
+            codecs[entity_class] = schema_name, encode_entity
+        write([schema_name, encode_entity(entity)])
+        num_entities += 1
+    return num_entities
+
+
+def load_catalog(fhand, format: str = JSON):
+    """
+    Read the entities written by dump_catalog one by one.
+
+    Args:
+        fhand: binary file handle to read from.
+        format (str, optional): json or msgpack. Defaults to json.
+
+    Yields:
+        The entities, in the order they were written.
+    """
+    _check_format(format)
+    if format == JSON:
+        loads = json.loads
+        records = (loads(line) for line in fhand if line.strip())
+    else:
+        records = msgpack.Unpacker(fhand, raw=False)
+
+    header = next(records, None)
+    if (not isinstance(header, dict) or header.get("format") != CATALOG_FORMAT):
+        raise ValueError("Not a mirri catalog")
+    if header.get("version") != CATALOG_VERSION:
+        raise ValueError(f"Unsupported catalog version {header.get('version')}")
+
+    decoders = {}
+    for schema_name, encoded in records:
+        try:
+            decode_entity = decoders[schema_name]
+        except KeyError:
+            decode_entity = get_codec(schema_name).decode
+            decoders[schema_name] = decode_entity
+        yield decode_entity(encoded)
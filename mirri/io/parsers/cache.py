@@ -0,0 +1,161 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from mirri.entities.growth_medium import GrowthMedium
+from mirri.entities.publication import Publication
+from mirri.io.codec import JSON, MSGPACK, dump_catalog, load_catalog, msgpack
+
+CACHE_SUFFIX = ".catalog"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+def hash_content(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class ParseCache():
+    """Directory with the entities parsed from the MIRRI excel files
+
+    Every entry holds the strains, growth media and publications of one
+    file, stored as a catalog (see mirri.io.codec). The entries are keyed
+    by the SHA-256 of the file content, the specification version and the
+    parser version, so a changed file or parser never hits a stale entry.
+
+    The total size of the directory is bounded. When a new entry makes it
+    grow over max_size the least recently used entries are removed. The
+    modification time of the entry files is used to record their last use,
+    so the order is kept across runs.
+
+    Args:
+        directory (str or Path): cache directory. It is created if needed.
+        max_size (int, optional): maximum size in bytes. Defaults to 256 MiB.
+        format (str, optional): catalog format. Defaults to msgpack when it is
+            installed and json otherwise.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_size: int = DEFAULT_MAX_SIZE,
+                 format: Optional[str] = None) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive number")
+        if format is None:
+            format = JSON if msgpack is None else MSGPACK
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.format = format
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory / f"{key}.{self.format}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Load the parsed entities of an entry.
+
+        Args:
+            key (str): entry key, see get_key.
+
+        Returns:
+            dict: strains, growth_media and publications lists, or None
+                if the entry is not in the cache.
+        """
+        path = self._get_path(key)
+        try:
+            fhand = path.open("rb")
+        except FileNotFoundError:
+            return None
+        parsed = {"strains": [], "growth_media": [], "publications": []}
+        with fhand:
+            try:
+                for entity in load_catalog(fhand, format=self.format):
+                    if isinstance(entity, GrowthMedium):
+                        parsed["growth_media"].append(entity)
+                    elif isinstance(entity, Publication):
+                        parsed["publications"].append(entity)
+                    else:
+                        parsed["strains"].append(entity)
+            except (ValueError, KeyError, TypeError):
+                # a corrupted entry is treated as a miss and parsed again
+                self._remove(path)
+                return None
+        self._touch(path)
+        return parsed
+
+    def set(self, key: str, parsed: dict) -> None:
+        """
+        Store the parsed entities of a file.
+
+        The entry is written to a temporary file first, so other processes
+        never read a half written entry.
+
+        Args:
+            key (str): entry key, see get_key.
+            parsed (dict): strains, growth_media and publications lists.
+        """
+        entities = [*parsed["strains"], *parsed["growth_media"],
+                    *parsed.get("publications", [])]
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fhand:
+                dump_catalog(entities, fhand, format=self.format)
+            os.replace(tmp_path, self._get_path(key))
+        except BaseException:
+            self._remove(Path(tmp_path))
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until the cache fits in max_size.
+
+        Returns:
+            int: number of entries removed.
+        """
+        entries = []
+        total_size = 0
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            self._remove(path)
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_path(key).exists()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob(f"*{CACHE_SUFFIX}"))
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def get_key(content: bytes, spec_version: str, parser_version: int) -> str:
+        return f"{hash_content(content)}-{spec_version}-{parser_version}"
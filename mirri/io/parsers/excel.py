@@ -15,6 +15,16 @@ def is_none(value):
 
 def workbook_sheet_reader(workbook, sheet_name, mandatory_column_name=None,
                           allowed_empty_line_slots=5):
+    rows = workbook_sheet_row_reader(workbook, sheet_name,
+                                     mandatory_column_name=mandatory_column_name,
+                                     allowed_empty_line_slots=allowed_empty_line_slots)
+    for _, data in rows:
+        yield data
+
+
+def workbook_sheet_row_reader(workbook, sheet_name, mandatory_column_name=None,
+                              allowed_empty_line_slots=5):
+    """Same as workbook_sheet_reader, but yields (excel row number, data)"""
     try:
         sheet = workbook[sheet_name]
     except KeyError as error:
@@ -23,7 +33,7 @@ def workbook_sheet_reader(workbook, sheet_name, mandatory_column_name=None,
     first = True
     header = []
     empty_lines = 0
-    for row in sheet.rows:
+    for row_number, row in enumerate(sheet.rows, start=1):
         values = []
         for cell in row:
             if cell.value is not None and cell.data_type == 's':
@@ -50,7 +60,7 @@ def workbook_sheet_reader(workbook, sheet_name, mandatory_column_name=None,
             # msg += "Check file for empty lines"
             # print(msg)
             continue
-        yield data
+        yield row_number, data
 
 
 def get_all_cell_data_from_sheet(workbook, sheet_name, allowed_empty_line_slots=5):
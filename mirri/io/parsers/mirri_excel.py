@@ -9,6 +9,7 @@ from mirri import rsetattr, ValidationError
 from mirri.biolomics.serializers.sequence import GenomicSequenceBiolomics
 from mirri.biolomics.serializers.strain import StrainMirri
 from mirri.entities.growth_medium import GrowthMedium
+from mirri.entities.location import intern_location
 from mirri.io.parsers.excel import workbook_sheet_reader
 from mirri.entities.publication import Publication
 from mirri.entities.date_range import DateRange
@@ -37,17 +38,45 @@ TRUEFALSE_TRANSLATOR = {
 }
 
 
-def parse_mirri_excel(fhand, version="20200601"):
-    if version == "20200601":
-        return _parse_mirri_v20200601(fhand)
-    else:
-        raise NotImplementedError("Only version 20200601 is implemented")
+# Bump it whenever a change in the parser changes the parsed entities, so
+# the cached results of the previous parser are not used
+PARSER_VERSION = 1
+
+
+def parse_mirri_excel(fhand, version="20200601", cache=None):
+    """
+    Parse the strains, growth media and publications of a MIRRI excel file.
+
+    Args:
+        fhand: binary file handle of the excel file.
+        version (str, optional): version of the specification. Defaults to "20200601".
+        cache (ParseCache, optional): cache with previously parsed files. On a hit
+            the entities are loaded from it without opening the workbook.
+            Defaults to None.
 
+    Returns:
+        dict: strains, growth_media and publications. Without a cache the
+            strains are a generator, with a cache all of them are lists.
+    """
+    if version != "20200601":
+        raise NotImplementedError("Only version 20200601 is implemented")
 
-def _parse_mirri_v20200601(fhand):
     fhand.seek(0)
-    file_content = BytesIO(fhand.read())
-    wb = load_workbook(filename=file_content, read_only=True, data_only=True)
+    content = fhand.read()
+    if cache is None:
+        return _parse_mirri_v20200601(content)
+
+    key = cache.get_key(content, version, PARSER_VERSION)
+    parsed = cache.get(key)
+    if parsed is None:
+        parsed = _parse_mirri_v20200601(content)
+        parsed["strains"] = list(parsed["strains"])
+        cache.set(key, parsed)
+    return parsed
+
+
+def _parse_mirri_v20200601(content):
+    wb = load_workbook(filename=BytesIO(content), read_only=True, data_only=True)
 
     locations = workbook_sheet_reader(wb, LOCATIONS)
     ontobiotopes = workbook_sheet_reader(wb, ONTOBIOTOPE)
@@ -62,7 +91,8 @@ def _parse_mirri_v20200601(fhand):
                             markers=markers, publications=publications,
                             ontobiotopes=ontobiotopes)
 
-    return {"strains": strains, "growth_media": growth_media}
+    return {"strains": strains, "growth_media": growth_media,
+            "publications": publications}
 
 
 def index_list_by(list_, id_):
@@ -252,6 +282,9 @@ def parse_strains(wb, locations, growth_media, markers, publications,
                 #print(attribute, value, type(value))
                 rsetattr(strain, attribute, value)
 
+        # the strains from the same site share the location
+        strain.collect.location = intern_location(strain.collect.location)
+
         # add markers
         strain_id = strain.id.strain_id
         if strain_id in markers:
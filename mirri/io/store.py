@@ -0,0 +1,323 @@
+"""
+Local catalog of parsed entities stored in a SQLite file.
+
+The strains are stored encoded with mirri.io.codec, next to a few indexed
+columns to query them by: accession number, collection, genus, species,
+organism types, country and collection and isolation dates. The queries
+return the entities one by one, as the rows are read, so they never have to
+be held all in memory:
+
+    with CatalogStore("catalog.sqlite") as store:
+        store.ingest(parse_mirri_excel(fhand))
+        for strain in store.find_strains(genus="Aspergillus", country="ESP"):
+            ...
+"""
+import json
+import re
+import sqlite3
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+from mirri.entities.date_range import DateRange
+from mirri.entities.growth_medium import GrowthMedium
+from mirri.entities.publication import Publication
+from mirri.entities.strain import OrganismType
+from mirri.io.codec import SCHEMA_BY_CLASS, get_codec
+
+STORE_VERSION = 1
+DEFAULT_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS strains (
+    id INTEGER PRIMARY KEY,
+    accession_number TEXT NOT NULL UNIQUE,
+    collection TEXT,
+    genus TEXT,
+    species TEXT,
+    country TEXT,
+    collection_start TEXT,
+    collection_end TEXT,
+    isolation_start TEXT,
+    isolation_end TEXT,
+    schema TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS strains_collection ON strains (collection);
+CREATE INDEX IF NOT EXISTS strains_taxon ON strains (genus, species);
+CREATE INDEX IF NOT EXISTS strains_country ON strains (country);
+CREATE INDEX IF NOT EXISTS strains_collection_date ON strains (collection_start, collection_end);
+CREATE INDEX IF NOT EXISTS strains_isolation_date ON strains (isolation_start, isolation_end);
+CREATE TABLE IF NOT EXISTS strain_organism_types (
+    strain_id INTEGER NOT NULL REFERENCES strains (id) ON DELETE CASCADE,
+    code INTEGER NOT NULL,
+    PRIMARY KEY (code, strain_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS growth_media (
+    acronym TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS publications (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+_STRAIN_COLUMNS = ("accession_number", "collection", "genus", "species", "country",
+                   "collection_start", "collection_end", "isolation_start",
+                   "isolation_end", "schema", "data")
+_INSERT_STRAIN = (f"INSERT INTO strains ({', '.join(_STRAIN_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(_STRAIN_COLUMNS))})")
+
+# a year, a month or a day, as DateRange.strpdate reads them
+_QUERY_DATE = re.compile(r"\d{4}([-/]?\d{2}){0,2}")
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _date_bounds(date_range):
+    if not date_range:
+        return None, None
+    range_ = date_range.range
+    return range_["start"].isoformat(), range_["end"].isoformat()
+
+
+def _query_date_bounds(value: Union[date, str]) -> Tuple[str, str]:
+    """First and last days of a date given to a query, as ISO strings
+
+    A year, e.g. "2005", or a month, "2005-10", is taken as its whole period.
+    """
+    if isinstance(value, date):
+        return value.isoformat(), value.isoformat()
+    if not _QUERY_DATE.fullmatch(value):
+        raise ValueError(f"Invalid date {value}, use YYYY, YYYY-MM or YYYY-MM-DD")
+    return _date_bounds(DateRange().strpdate(value))
+
+
+def _batches(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class CatalogStore():
+    """SQLite store of strains, growth media and publications
+
+    Args:
+        path (str or Path, optional): database file. Defaults to ":memory:",
+            a database that only lives as long as the store.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        self.path = path
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            self._connection.close()
+            raise ValueError(f"Unsupported catalog store version {version}")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM strains").fetchone()[0]
+
+    def __contains__(self, accession_number: str) -> bool:
+        row = self._connection.execute(
+            "SELECT 1 FROM strains WHERE accession_number = ?",
+            (accession_number,)).fetchone()
+        return row is not None
+
+    def ingest(self, parsed: dict, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+        """
+        Store the output of parse_mirri_excel.
+
+        Args:
+            parsed (dict): strains, growth_media and, optionally, publications.
+            batch_size (int, optional): strains written per transaction.
+
+        Returns:
+            dict: number of entities stored, by kind.
+        """
+        return {
+            "strains": self.add_strains(parsed["strains"], batch_size=batch_size),
+            "growth_media": self.add_growth_media(parsed["growth_media"]),
+            "publications": self.add_publications(parsed.get("publications", [])),
+        }
+
+    def add_strains(self, strains: Iterable, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Store strains, replacing the stored ones with the same accession number.
+
+        The strains are written in transactions of batch_size strains, so
+        any iterable, the parser generator included, can be given.
+
+        Returns:
+            int: number of strains stored.
+        """
+        codecs = {}
+        num_strains = 0
+        for batch in _batches(strains, batch_size):
+            with self._connection:
+                for strain in batch:
+                    self._add_strain(strain, codecs)
+            num_strains += len(batch)
+        return num_strains
+
+    def _add_strain(self, strain, codecs) -> None:
+        strain_class = strain.__class__
+        try:
+            schema_name, encode = codecs[strain_class]
+        except KeyError:
+            schema_name = SCHEMA_BY_CLASS[strain_class]
+            encode = get_codec(schema_name).encode
+            codecs[strain_class] = schema_name, encode
+
+        accession_number = strain.id.strain_id
+        location = strain.collect.location
+        taxonomy = strain.taxonomy
+        row = (accession_number, strain.id.collection, taxonomy.genus,
+               taxonomy.species, location.country if location else None,
+               *_date_bounds(strain.collect.date), *_date_bounds(strain.isolation.date),
+               schema_name, _dumps(encode(strain)))
+
+        execute = self._connection.execute
+        execute("DELETE FROM strains WHERE accession_number = ?", (accession_number,))
+        strain_id = execute(_INSERT_STRAIN, row).lastrowid
+        codes = {organism_type.code for organism_type in taxonomy.organism_type or []}
+        self._connection.executemany(
+            "INSERT INTO strain_organism_types (strain_id, code) VALUES (?, ?)",
+            [(strain_id, code) for code in codes])
+
+    def add_growth_media(self, growth_media: Iterable[GrowthMedium]) -> int:
+        encode = get_codec("GrowthMedium").encode
+        with self._connection:
+            cursor = self._connection.executemany(
+                "INSERT OR REPLACE INTO growth_media (acronym, data) VALUES (?, ?)",
+                ((str(medium.acronym), _dumps(encode(medium))) for medium in growth_media))
+        return cursor.rowcount
+
+    def add_publications(self, publications: Iterable[Publication]) -> int:
+        encode = get_codec("Publication").encode
+        with self._connection:
+            cursor = self._connection.executemany(
+                "INSERT OR REPLACE INTO publications (id, data) VALUES (?, ?)",
+                ((publication.id, _dumps(encode(publication)))
+                 for publication in publications))
+        return cursor.rowcount
+
+    def remove_strains(self, accession_numbers: Iterable[str]) -> int:
+        with self._connection:
+            cursor = self._connection.executemany(
+                "DELETE FROM strains WHERE accession_number = ?",
+                ((accession_number,) for accession_number in accession_numbers))
+        return cursor.rowcount
+
+    def get_strain(self, accession_number: str):
+        return next(self.find_strains(accession_number=accession_number), None)
+
+    def find_strains(self, accession_number: Optional[str] = None,
+                     collection: Optional[str] = None, genus: Optional[str] = None,
+                     species: Optional[str] = None,
+                     organism_type: Union[int, str, None] = None,
+                     country: Optional[str] = None,
+                     collected_from: Union[date, str, None] = None,
+                     collected_to: Union[date, str, None] = None,
+                     isolated_from: Union[date, str, None] = None,
+                     isolated_to: Union[date, str, None] = None):
+        """
+        Look for strains. All the given filters have to match.
+
+        The dates match when the date range of the strain, a year or a month
+        if the day or the month are not known, overlaps with the given one.
+
+        Args:
+            accession_number (str, optional): e.g. "CECT 1".
+            collection (str, optional): collection code.
+            genus (str, optional): genus name.
+            species (str, optional): species name.
+            organism_type (int or str, optional): code or name of an organism type.
+            country (str, optional): ISO 3166 alpha-3 code of the collection site.
+            collected_from, collected_to (date or str, optional): collection dates.
+                The strings can be a day, "YYYY-MM-DD", or a month or a year,
+                "YYYY-MM" or "YYYY", that count from their first day to their
+                last one.
+            isolated_from, isolated_to (date or str, optional): isolation dates.
+
+        Yields:
+            The strains, ordered by accession number.
+        """
+        where, params = self._build_filters(
+            accession_number=accession_number, collection=collection, genus=genus,
+            species=species, organism_type=organism_type, country=country,
+            collected_from=collected_from, collected_to=collected_to,
+            isolated_from=isolated_from, isolated_to=isolated_to)
+        query = f"SELECT schema, data FROM strains{where} ORDER BY accession_number"
+        decoders = {}
+        loads = json.loads
+        for schema_name, data in self._connection.execute(query, params):
+            try:
+                decode = decoders[schema_name]
+            except KeyError:
+                decode = decoders[schema_name] = get_codec(schema_name).decode
+            yield decode(loads(data))
+
+    def count_strains(self, **filters) -> int:
+        """Number of strains that match the filters of find_strains"""
+        where, params = self._build_filters(**filters)
+        return self._connection.execute(
+            f"SELECT COUNT(*) FROM strains{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _build_filters(accession_number=None, collection=None, genus=None,
+                       species=None, organism_type=None, country=None,
+                       collected_from=None, collected_to=None,
+                       isolated_from=None, isolated_to=None):
+        conditions = []
+        params = []
+        for column, value in (("accession_number", accession_number),
+                              ("collection", collection), ("genus", genus),
+                              ("species", species), ("country", country)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if organism_type is not None:
+            conditions.append("id IN (SELECT strain_id FROM strain_organism_types "
+                              "WHERE code = ?)")
+            params.append(OrganismType(organism_type).code)
+        for prefix, start, end in (("collection", collected_from, collected_to),
+                                   ("isolation", isolated_from, isolated_to)):
+            if start is not None:
+                conditions.append(f"{prefix}_end >= ?")
+                params.append(_query_date_bounds(start)[0])
+            if end is not None:
+                conditions.append(f"{prefix}_start <= ?")
+                params.append(_query_date_bounds(end)[1])
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def iter_growth_media(self):
+        decode = get_codec("GrowthMedium").decode
+        for data, in self._connection.execute(
+                "SELECT data FROM growth_media ORDER BY acronym"):
+            yield decode(json.loads(data))
+
+    def iter_publications(self):
+        decode = get_codec("Publication").decode
+        for data, in self._connection.execute("SELECT data FROM publications ORDER BY id"):
+            yield decode(json.loads(data))
@@ -0,0 +1,306 @@
+"""
+Streaming exporters of strains for the consumers that do not need xlsx.
+
+The strains are read once, as they come, and written row by row, so any
+number of them is exported in constant memory. The columns are the ones of
+the Strains sheet written by write_mirri_excel, see _StrainRows.
+
+    write_csv_bundle(directory, strains, growth_media)
+    write_jsonl("strains.jsonl", strains)
+    write_dwca("strains.dwca.zip", strains)
+
+For a lossless dump of the entities, to be loaded again, see
+mirri.io.codec.dump_catalog.
+"""
+import csv
+import io
+import json
+import tempfile
+import zipfile
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+
+import pycountry
+
+from mirri.settings import GROWTH_MEDIA, MIRRI_FIELDS, PUBLICATION_FIELDS
+from mirri.io.writers.mirri_excel import (INITIAL_SEXUAL_STATES, PUB_HEADERS,
+                                          _deserialize_strains, _SideTable,
+                                          _StrainRows)
+
+CSV_FILES = {
+    "Strains": "strains.csv",
+    GROWTH_MEDIA: "growth_media.csv",
+    "Geographic origin": "geographic_origin.csv",
+    "Literature": "literature.csv",
+    "Sexual states": "sexual_states.csv",
+    "Genomic information": "genomic_information.csv",
+}
+
+DWC = "http://rs.tdwg.org/dwc/terms/"
+DC = "http://purl.org/dc/terms/"
+OCCURRENCE_ROW_TYPE = DWC + "Occurrence"
+DNA_DERIVED_DATA_ROW_TYPE = "http://rs.gbif.org/terms/1.0/DNADerivedData"
+REFERENCES_ROW_TYPE = "http://rs.gbif.org/terms/1.0/References"
+BASIS_OF_RECORD = "LivingSpecimen"
+
+# the core columns after id and basisOfRecord, with the attributes of the
+# strains sheet
+DWC_CORE_FIELDS = [
+    {"attribute": "id", "term": DWC + "occurrenceID"},
+    {"attribute": "id.collection", "term": DWC + "collectionCode"},
+    {"attribute": "id.number", "term": DWC + "catalogNumber"},
+    {"attribute": "other_numbers", "term": DWC + "otherCatalogNumbers"},
+    {"attribute": "taxonomy.taxon_name", "term": DWC + "scientificName"},
+    {"attribute": "collect.who", "term": DWC + "recordedBy"},
+    {"attribute": "collect.date", "term": DWC + "eventDate"},
+    {"attribute": "collect.habitat", "term": DWC + "habitat"},
+    {"attribute": "collect.location.country", "term": DWC + "countryCode"},
+    {"attribute": "collect.location.site", "term": DWC + "locality"},
+    {"attribute": "collect.location.latitude", "term": DWC + "decimalLatitude"},
+    {"attribute": "collect.location.longitude", "term": DWC + "decimalLongitude"},
+    {"attribute": "genetics.markers", "term": DWC + "associatedSequences"},
+    {"attribute": "remarks", "term": DWC + "occurrenceRemarks"},
+]
+DNA_DERIVED_DATA_TERMS = [
+    "https://w3id.org/mixs/0000044",  # target_gene
+    DWC + "associatedSequences",
+    "http://rs.gbif.org/terms/dna_sequence",
+]
+REFERENCES_TERMS = [
+    DC + "identifier",
+    DC + "bibliographicCitation",
+    DC + "title",
+    DC + "creator",
+    DC + "date",
+    DC + "source",
+]
+
+DWC_CORE_FILE = "occurrence.txt"
+DNA_DERIVED_DATA_FILE = "dna_derived_data.txt"
+REFERENCES_FILE = "references.txt"
+DWC_META_FILE = "meta.xml"
+
+
+class _NullTable():
+    """Side table that drops every row, taking every key as already added"""
+
+    def __contains__(self, key):
+        return True
+
+    def __len__(self):
+        return 0
+
+    def add(self, key, *rows):
+        pass
+
+    def replace(self, key, *rows):
+        pass
+
+
+def write_csv_bundle(directory, strains, growth_media=(), error_log=None) -> int:
+    """
+    Write the strains as CSV files, one per sheet of write_mirri_excel.
+
+    The files, named in CSV_FILES, have the columns of their sheets. The
+    constant sheets, like Markers and Ontobiotope, are not written.
+
+    Args:
+        directory (str or Path): output directory. It is created if needed.
+        strains (iterable): strains.
+        growth_media (list, optional): growth media.
+        error_log (ErrorLog, optional): log for the growth media referred to
+            by the strains that are not in growth_media.
+
+    Returns:
+        int: number of strains written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    def write_csv(sheet, rows):
+        with (directory / CSV_FILES[sheet]).open("w", newline="", encoding="utf-8") as fhand:
+            csv.writer(fhand).writerows(rows)
+
+    write_csv(GROWTH_MEDIA, [["Acronym", "Description", "Full description"]] + [
+        [growth_medium.acronym, growth_medium.description, growth_medium.full_description]
+        for growth_medium in growth_media])
+
+    num_strains = 0
+    sexual_states = set(INITIAL_SEXUAL_STATES)
+    with ExitStack() as stack:
+        locations = stack.enter_context(
+            _SideTable(["ID", "Country", "Region", "City", "Locality"]))
+        publications = stack.enter_context(_SideTable(PUB_HEADERS))
+        genomic_markers = stack.enter_context(
+            _SideTable(['Strain AN', 'Marker', 'INSDC AN', 'Sequence']))
+        rows = _deserialize_strains(strains, locations,
+                                    [str(gm.acronym) for gm in growth_media],
+                                    publications, sexual_states, genomic_markers,
+                                    error_log=error_log)
+
+        with (directory / CSV_FILES["Strains"]).open("w", newline="",
+                                                     encoding="utf-8") as fhand:
+            writer = csv.writer(fhand)
+            writer.writerow([field["label"] for field in MIRRI_FIELDS])
+            for row in rows:
+                writer.writerow(row)
+                num_strains += 1
+
+        write_csv("Geographic origin", locations)
+        write_csv("Literature", publications)
+        write_csv("Sexual states", ([sexual_state] for sexual_state in sorted(sexual_states)))
+        write_csv("Genomic information", genomic_markers)
+    return num_strains
+
+
+def write_jsonl(path, strains) -> int:
+    """
+    Write the strains as JSON Lines, one object per strain.
+
+    The keys are the labels of the columns of the Strains sheet, and the
+    empty values are left out. The publications and the markers of the
+    strains, in their own sheets in the excel file, are given as lists of
+    objects under the Literature and Genomic information keys.
+
+    Args:
+        path (str or Path): output file.
+        strains (iterable): strains.
+
+    Returns:
+        int: number of strains written.
+    """
+    labels = [field["label"] for field in MIRRI_FIELDS]
+    rows = _StrainRows(MIRRI_FIELDS, _NullTable(), [], _NullTable(), set(), _NullTable(),
+                       extra_formatters={"publications": _get_publication_records})
+    num_strains = 0
+    with open(path, "w", encoding="utf-8") as fhand:
+        for strain in strains:
+            record = {label: value for label, value in zip(labels, rows.get_row(strain))
+                      if value is not None and value != ""}
+            markers = [{"Marker": marker.marker_type, "INSDC AN": marker.marker_id}
+                       for marker in strain.genetics.markers]
+            if markers:
+                record["Genomic information"] = markers
+            fhand.write(json.dumps(record, ensure_ascii=False, default=str))
+            fhand.write("\n")
+            num_strains += 1
+    return num_strains
+
+
+def _get_publication_records(publications):
+    return [{pub_field["label"]: value for pub_field in PUBLICATION_FIELDS
+             for value in [getattr(pub, pub_field["attribute"], None)] if value}
+            for pub in publications] or None
+
+
+def write_dwca(path, strains, compress_level=6) -> int:
+    """
+    Write the strains as a zipped Darwin Core Archive.
+
+    The core is an occurrence table, with a row per strain, see
+    DWC_CORE_FIELDS. The markers go to a DNA derived data extension and the
+    publications to a references extension, with a row per strain and marker
+    or publication. The core is compressed as it is written, and the
+    extensions are spooled to temporary files until it is done.
+
+    Args:
+        path (str or Path): output file.
+        strains (iterable): strains.
+        compress_level (int, optional): zip compression level, from 0 to 9.
+
+    Returns:
+        int: number of strains written.
+    """
+    rows = _StrainRows(DWC_CORE_FIELDS, _NullTable(), [], _NullTable(), set(), _NullTable(),
+                       extra_formatters={"collect.date": _format_iso_date,
+                                         "collect.location.country": _get_alpha_2,
+                                         "genetics.markers": _format_insdc_ids})
+    num_strains = 0
+    with ExitStack() as stack:
+        zip_file = stack.enter_context(zipfile.ZipFile(
+            path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compress_level))
+        sequences_fhand = stack.enter_context(_open_spool())
+        references_fhand = stack.enter_context(_open_spool())
+        sequences = _dwc_writer(sequences_fhand)
+        references = _dwc_writer(references_fhand)
+        sequences.writerow(["id"] + DNA_DERIVED_DATA_TERMS)
+        references.writerow(["id"] + REFERENCES_TERMS)
+
+        with io.TextIOWrapper(zip_file.open(DWC_CORE_FILE, "w"), encoding="utf-8",
+                              newline="") as fhand:
+            core = _dwc_writer(fhand)
+            core.writerow(["id", DWC + "basisOfRecord"] +
+                          [field["term"] for field in DWC_CORE_FIELDS])
+            for strain in strains:
+                row = rows.get_row(strain)
+                strain_id = row[0]
+                core.writerow([strain_id, BASIS_OF_RECORD] + row)
+                for marker in strain.genetics.markers:
+                    sequences.writerow([strain_id, marker.marker_type, marker.marker_id,
+                                        marker.marker_seq])
+                for pub in strain.publications:
+                    # only the publications of the excel files have a full reference
+                    references.writerow([strain_id, pub.doi or pub.id,
+                                         getattr(pub, "full_reference", None), pub.title,
+                                         pub.authors, pub.year, pub.journal])
+                num_strains += 1
+
+        for fname, spool in ((DNA_DERIVED_DATA_FILE, sequences_fhand),
+                             (REFERENCES_FILE, references_fhand)):
+            spool.seek(0)
+            with io.TextIOWrapper(zip_file.open(fname, "w"), encoding="utf-8",
+                                  newline="") as fhand:
+                for chunk in iter(lambda: spool.read(2 ** 16), ""):
+                    fhand.write(chunk)
+        zip_file.writestr(DWC_META_FILE, _get_dwc_meta())
+    return num_strains
+
+
+def _open_spool():
+    return tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+
+
+def _dwc_writer(fhand):
+    return csv.writer(fhand, delimiter="\t", lineterminator="\n")
+
+
+def _get_dwc_meta():
+    def fields(terms):
+        return "".join(f'\n    <field index="{index}" term="{term}"/>'
+                       for index, term in enumerate(terms, 1))
+
+    def table(tag, row_type, fname, terms, id_tag):
+        return (f'\n  <{tag} encoding="UTF-8" fieldsTerminatedBy="\\t" '
+                f'linesTerminatedBy="\\n" fieldsEnclosedBy="&quot;" ignoreHeaderLines="1" '
+                f'rowType="{row_type}">\n    <files><location>{fname}</location></files>'
+                f'\n    <{id_tag} index="0"/>{fields(terms)}\n  </{tag}>')
+
+    core_terms = [DWC + "basisOfRecord"] + [field["term"] for field in DWC_CORE_FIELDS]
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<archive xmlns="http://rs.tdwg.org/dwc/text/">' +
+            table("core", OCCURRENCE_ROW_TYPE, DWC_CORE_FILE, core_terms, "id") +
+            table("extension", DNA_DERIVED_DATA_ROW_TYPE, DNA_DERIVED_DATA_FILE,
+                  DNA_DERIVED_DATA_TERMS, "coreid") +
+            table("extension", REFERENCES_ROW_TYPE, REFERENCES_FILE, REFERENCES_TERMS,
+                  "coreid") +
+            '\n</archive>\n')
+
+
+def _format_iso_date(value):
+    # 1991----, 199105-- and 19910503 to 1991, 1991-05 and 1991-05-03
+    strfdate = value.strfdate if value else None
+    if not strfdate or strfdate.startswith("-"):
+        return None
+    parts = [strfdate[:4], strfdate[4:6], strfdate[6:8]]
+    return "-".join(part for part in parts if part != "--")
+
+
+@lru_cache(maxsize=None)
+def _get_alpha_2(alpha_3):
+    country = pycountry.countries.get(alpha_3=alpha_3)
+    return country.alpha_2 if country else None
+
+
+def _format_insdc_ids(markers):
+    return " | ".join(marker.marker_id for marker in markers if marker.marker_id) or None
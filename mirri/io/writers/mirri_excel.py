@@ -1,11 +1,36 @@
 import csv
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from copy import deepcopy
+from functools import lru_cache
+from itertools import chain, islice
+from operator import attrgetter
+from pathlib import Path
+from openpyxl.utils import get_column_letter
 from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
 
-from mirri import rgetattr
 from mirri.settings import GROWTH_MEDIA, MIRRI_FIELDS, DATA_DIR, PUBLICATION_FIELDS
 from mirri.io.parsers.mirri_excel import NAGOYA_TRANSLATOR, RESTRICTION_USE_TRANSLATOR
+from mirri.io.writers.xlsx import (DEFAULT_COMPRESS_LEVEL, WORKSHEET_TAIL, SegmentCache,
+                                   XlsxPackage, iter_pickled_rows, rows_to_xml,
+                                   worksheet_head, write_rows_segment, write_segment)
+
+OPENPYXL_ENGINE = "openpyxl"
+PARALLEL_ENGINE = "parallel"
+ENGINES = (OPENPYXL_ENGINE, PARALLEL_ENGINE)
+# rows of the sheets given to each worker of the parallel engine
+ROWS_PER_SEGMENT = 5000
+# bump it when the XML written for the template sheets changes
+TEMPLATE_VERSION = 1
+
+_Template = namedtuple("_Template", ["title", "rows", "widths", "key"])
 
 INITIAL_SEXUAL_STATES = [
     "Mata",
@@ -49,14 +74,65 @@ REV_NAGOYA_TRANSLATOR = {v: k for k, v in NAGOYA_TRANSLATOR.items()}
 PUB_HEADERS = [pb["label"] for pb in PUBLICATION_FIELDS]
 
 
-def write_mirri_excel(path, strains, growth_media, version):
+def write_mirri_excel(path, strains, growth_media, version, write_only=False,
+                      error_log=None, engine=OPENPYXL_ENGINE, processes=None,
+                      compress_level=DEFAULT_COMPRESS_LEVEL, template_cache_dir=None):
+    """
+    Write the strains and growth media in a MIRRI excel file.
+
+    Args:
+        path (str or Path): output file.
+        strains (iterable): strains. Any iterable, a generator included.
+        growth_media (list): growth media.
+        version (str): version of the specification.
+        write_only (bool, optional): stream the rows to the file as they are
+            produced. The strains are never held in memory, so the memory
+            used does not grow with the number of strains.
+        error_log (ErrorLog, optional): log for the references to missing
+            entities, e.g. recommended growth media that are not in
+            growth_media.
+        engine (str, optional): "openpyxl" or "parallel". The parallel engine
+            turns the rows into the XML of the sheets in worker processes,
+            while the strains are being read, and assembles the file from
+            their output. It always streams the rows, as write_only.
+        processes (int, optional): worker processes of the parallel engine.
+            Defaults to the number of CPUs.
+        compress_level (int, optional): zip compression level of the
+            parallel engine, from 0, no compression, to 9.
+        template_cache_dir (str or Path, optional): directory to keep the
+            XML of the sheets that do not depend on the data, e.g. the
+            ontobiotopes, for the parallel engine. It is always kept in
+            memory.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine}, use one of: {', '.join(ENGINES)}")
     if version == "20200601":
-        _write_mirri_excel_20200601(path, strains, growth_media)
-
-
-def _write_mirri_excel_20200601(path, strains, growth_media):
-    wb = Workbook()
-
+        _write_mirri_excel_20200601(path, strains, growth_media, write_only=write_only,
+                                    error_log=error_log, engine=engine,
+                                    processes=processes, compress_level=compress_level,
+                                    template_cache_dir=template_cache_dir)
+
+
+def _write_mirri_excel_20200601(path, strains, growth_media, write_only=False,
+                                error_log=None, engine=OPENPYXL_ENGINE, processes=None,
+                                compress_level=DEFAULT_COMPRESS_LEVEL,
+                                template_cache_dir=None):
+    with ExitStack() as stack:
+        if engine == PARALLEL_ENGINE:
+            template_cache = _get_template_cache(
+                None if template_cache_dir is None else str(template_cache_dir))
+            wb = stack.enter_context(_SegmentsWorkbook(processes=processes,
+                                                       compress_level=compress_level,
+                                                       template_cache=template_cache))
+        else:
+            wb = Workbook(write_only=write_only)
+        _write_workbook_20200601(wb, strains, growth_media, error_log=error_log)
+        if engine == OPENPYXL_ENGINE and not write_only:
+            del wb["Sheet"]
+        wb.save(str(path))
+
+
+def _write_workbook_20200601(wb, strains, growth_media, error_log=None):
     write_markers_sheet(wb)
 
     ontobiotope_path = DATA_DIR / "ontobiotopes.csv"
@@ -65,183 +141,216 @@ def _write_mirri_excel_20200601(path, strains, growth_media):
     write_growth_media(wb, growth_media)
     growth_media_indexes = [str(gm.acronym) for gm in growth_media]
 
-    locations = {}
-    publications = {}
     sexual_states = set(deepcopy(INITIAL_SEXUAL_STATES))
-    genomic_markers = {}
-    strains_data = _deserialize_strains(strains, locations, growth_media_indexes,
-                                        publications, sexual_states, genomic_markers)
-    strains_data = list(strains_data)
-
-    # write strain to generate indexed data
-    strain_sheet = wb.create_sheet("Strains")
-    strain_sheet.append([field["label"] for field in MIRRI_FIELDS])
-    for strain_row in strains_data:
-        strain_sheet.append(strain_row)
-    redimension_cell_width(strain_sheet)
-
-    # write locations
-    loc_sheet = wb.create_sheet("Geographic origin")
-    loc_sheet.append(["ID", "Country", "Region", "City", "Locality"])
-    for index, loc_index in enumerate(locations.keys()):
-        location = locations[loc_index]
-        row = [index, location.country, location.state, location.municipality,
-               loc_index]
-        loc_sheet.append(row)
-    redimension_cell_width(loc_sheet)
-
-    # write publications
-    pub_sheet = wb.create_sheet("Literature")
-    pub_sheet.append(PUB_HEADERS)
-    for publication in publications.values():
-        row = []
-        for pub_field in PUBLICATION_FIELDS:
-            # if pub_field['attribute'] == 'id':
-            #     value = index
-            value = getattr(publication, pub_field['attribute'], None)
-            row.append(value)
-        pub_sheet.append(row)
-    redimension_cell_width(pub_sheet)
-
-    # write sexual states
-    sex_sheet = wb.create_sheet("Sexual states")
-    for sex_state in sorted(list(sexual_states)):
-        sex_sheet.append([sex_state])
-    redimension_cell_width(sex_sheet)
-
-    # write genetic markers
-    markers_sheet = wb.create_sheet("Genomic information")
-    markers_sheet.append(['Strain AN', 'Marker', 'INSDC AN', 'Sequence'])
-    for strain_id, markers in genomic_markers.items():
-        for marker in markers:
-            row = [strain_id, marker.marker_type, marker.marker_id, marker.marker_seq]
-            markers_sheet.append(row)
-    redimension_cell_width(markers_sheet)
-
-    del wb["Sheet"]
-    wb.save(str(path))
+    with ExitStack() as stack:
+        locations = stack.enter_context(
+            _SideTable(["ID", "Country", "Region", "City", "Locality"]))
+        publications = stack.enter_context(_SideTable(PUB_HEADERS))
+        genomic_markers = stack.enter_context(
+            _SideTable(['Strain AN', 'Marker', 'INSDC AN', 'Sequence']))
+        strains_data = _deserialize_strains(strains, locations, growth_media_indexes,
+                                            publications, sexual_states,
+                                            genomic_markers, error_log=error_log)
+
+        # write strain to generate indexed data
+        strain_sheet = wb.create_sheet("Strains")
+        _write_rows(strain_sheet, [[field["label"] for field in MIRRI_FIELDS]],
+                    strains_data)
+
+        locations.write(wb.create_sheet("Geographic origin"))
+        publications.write(wb.create_sheet("Literature"))
+
+        # the sexual states are a short controlled vocabulary
+        sex_sheet = wb.create_sheet("Sexual states")
+        _write_rows(sex_sheet, [[sex_state] for sex_state in sorted(sexual_states)])
+
+        genomic_markers.write(wb.create_sheet("Genomic information"))
+        if isinstance(wb, _SegmentsWorkbook):
+            # the workers read the side tables until the segments are done
+            wb.wait()
 
 
 def _deserialize_strains(strains, locations, growth_media_indexes,
-                         publications, sexual_states, genomic_markers):
+                         publications, sexual_states, genomic_markers, error_log=None):
+    rows = _StrainRows(MIRRI_FIELDS, locations, growth_media_indexes, publications,
+                       sexual_states, genomic_markers, error_log=error_log)
     for strain in strains:
-        strain_row = []
-        for field in MIRRI_FIELDS:
+        yield rows.get_row(strain)
+
+
+# attributes read for the columns not named after one
+_COLUMN_ATTRIBUTES = {
+    "id": "id.strain_id",
+    "taxonomy.taxon_name": "taxonomy.long_name",
+    "collect.location.coords": "collect.location",
+}
+
+
+def _format_bool(value):
+    if value is True:
+        return 2
+    if value is False:
+        return 1
+    return None
+
+
+def _format_date(value):
+    return value.strfdate if value else None
+
+
+def _format_temp_range(value):
+    return f'{value["min"]}; {value["max"]}' if value else None
+
+
+def _format_other_numbers(value):
+    return "; ".join(f"{on.collection} {on.number}" for on in value)
+
+
+def _format_organism_types(value):
+    return "; ".join(str(org_type.code) for org_type in value) if value else None
+
+
+def _format_coords(location):
+    if location.latitude is not None and location.longitude is not None:
+        return f"{location.latitude};{location.longitude}"
+    return None
+
+
+def _format_nagoya(value):
+    return REV_NAGOYA_TRANSLATOR[value] if value else value
+
+
+def _join_with(separator):
+    def join(value):
+        return separator.join(value) if value else None
+    return join
+
+
+_FORMATTERS = {
+    "restriction_on_use": REV_RESTRICTION_USE_TRANSLATOR.__getitem__,
+    "nagoya_protocol": _format_nagoya,
+    "other_numbers": _format_other_numbers,
+    "other_denominations": _join_with("; "),
+    "is_from_registered_collection": _format_bool,
+    "is_subject_to_quarantine": _format_bool,
+    "is_potentially_harmful": _format_bool,
+    "genetics.gmo": _format_bool,
+    "taxonomy.interspecific_hybrid": _format_bool,
+    "deposit.date": _format_date,
+    "collect.date": _format_date,
+    "isolation.date": _format_date,
+    "catalog_inclusion_date": _format_date,
+    "growth.tested_temp_range": _format_temp_range,
+    "growth.recommended_temp": _format_temp_range,
+    "form_of_supply": _join_with(";"),
+    "collect.location.coords": _format_coords,
+    "abs_related_files": _join_with(";"),
+    "mta_files": _join_with(";"),
+    "taxonomy.organism_type": _format_organism_types,
+    "history": _join_with(" < "),
+    "genetics.plasmids": _join_with(";"),
+}
+
+
+class _StrainRows():
+    """
+    Rows of the strains sheet.
+
+    The attribute getter and the formatter of every column are resolved
+    once, so the values of a strain go through them without looking at the
+    fields again. The columns that refer to the other sheets add their
+    entries to the side tables. The recommended growth media that are not
+    in growth_media_indexes are reported to the error log, if given.
+    The extra formatters, by attribute, replace the ones of the excel sheet.
+    """
+
+    def __init__(self, fields, locations, growth_media_indexes, publications,
+                 sexual_states, genomic_markers, error_log=None, extra_formatters=None):
+        self._locations = locations
+        self._location_indexes = {}
+        self._growth_media_indexes = set(growth_media_indexes)
+        self._publications = publications
+        self._sexual_states = sexual_states
+        self._genomic_markers = genomic_markers
+        self._error_log = error_log
+        self._strain_id = None
+        # the header is the first row
+        self._row_number = 1
+
+        formatters = dict(_FORMATTERS)
+        formatters.update({
+            "collect.location": self._format_location,
+            "publications": self._format_publications,
+            "genetics.sexual_state": self._add_sexual_state,
+            "growth.recommended_media": self._format_growth_media,
+        })
+        if extra_formatters:
+            formatters.update(extra_formatters)
+        self._media_label = None
+        columns = []
+        for field in fields:
             attribute = field["attribute"]
+            if attribute == "growth.recommended_media":
+                self._media_label = field["label"]
+            columns.append((attrgetter(_COLUMN_ATTRIBUTES.get(attribute, attribute)),
+                            formatters.get(attribute)))
+        self._columns = tuple(columns)
+
+    def get_row(self, strain):
+        self._strain_id = strain_id = strain.id.strain_id
+        self._row_number += 1
+        row = []
+        for get_value, format_value in self._columns:
+            value = get_value(strain)
+            if value is not None and format_value is not None:
+                value = format_value(value)
+            row.append(value)
 
-            if attribute == "id":
-                value = strain.id.strain_id
-            elif attribute == "restriction_on_use":
-                value = rgetattr(strain, attribute)
-                if value is not None:
-                    value = REV_RESTRICTION_USE_TRANSLATOR[value]
-            elif attribute == "nagoya_protocol":
-                value = rgetattr(strain, attribute)
-                if value:
-                    value = REV_NAGOYA_TRANSLATOR[value]
-            elif attribute == "other_numbers":
-                value = rgetattr(strain, attribute)
-                if value is not None:
-                    value = [f"{on.collection} {on.number}" for on in value]
-                    value = "; ".join(value)
-            elif attribute == 'other_denominations':
-                od = strain.other_denominations
-                value = "; ".join(od) if od else None
-            elif attribute in (
-                "is_from_registered_collection",
-                "is_subject_to_quarantine",
-                "is_potentially_harmful",
-                "genetics.gmo",
-                "taxonomy.interspecific_hybrid"
-            ):
-                value = rgetattr(strain, attribute)
-                if value is True:
-                    value = 2
-                elif value is False:
-                    value = 1
-                else:
-                    value = None
-            elif attribute == "taxonomy.taxon_name":
-                value = strain.taxonomy.long_name
-            elif attribute in ("deposit.date", "collect.date", "isolation.date",
-                               'catalog_inclusion_date'):
-                value = rgetattr(strain, attribute)
-                value = value.strfdate if value else None
-            elif attribute == "growth.recommended_media":
-                value = rgetattr(strain, attribute)
-                if value is not None:
-                    for gm in value:
-                        gm = str(gm)
-                        if gm not in growth_media_indexes:
-                            print(gm, growth_media_indexes)
-                            msg = f"Growth media {gm} not in the provided ones"
-                            continue
-                            raise ValueError(msg)
-                    value = "/".join(value)
-            elif attribute in ('growth.tested_temp_range',
-                               "growth.recommended_temp"):
-                value = rgetattr(strain, attribute)
-                if value:
-                    value = f'{value["min"]}; {value["max"]}'
-            elif attribute == "form_of_supply":
-                value = rgetattr(strain, attribute)
-                value = ";".join(value)
-            elif attribute == "collect.location.coords":
-                lat = strain.collect.location.latitude
-                long = strain.collect.location.longitude
-                if lat is not None and long is not None:
-                    value = f"{lat};{long}"
-                else:
-                    value = None
-
-            elif attribute == "collect.location":
-                location = strain.collect.location
-                loc_index = _build_location_index(location)
-                if loc_index is None:
-                    continue
-                if loc_index not in locations:
-                    locations[loc_index] = location
-                value = loc_index
-            elif attribute in ("abs_related_files", "mta_files"):
-                value = rgetattr(strain, attribute)
-                value = ";".join(value) if value else None
-            elif attribute == "taxonomy.organism_type":
-                value = rgetattr(strain, attribute)
-                if value:
-                    value = "; ".join([str(v.code) for v in value])
-
-            elif attribute == "history":
-                value = rgetattr(strain, attribute)
-                if value is not None:
-                    value = " < ".join(value)
-            elif attribute == "genetics.sexual_state":
-                value = rgetattr(strain, attribute)
-                if value:
-                    sexual_states.add(value)
-            elif attribute == "genetics.ploidy":
-                value = rgetattr(strain, attribute)
-            elif attribute == "taxonomy.organism_type":
-                organism_types = rgetattr(strain, attribute)
-                if organism_types is not None:
-                    value = [org_type.code for org_type in organism_types]
-                    value = ";".join(value)
-            elif attribute == 'publications':
-                value = []
-                for pub in strain.publications:
-                    value.append(pub.id)
-                    if pub.id not in publications:
-                        publications[pub.id] = pub
-                value = ';'.join(str(v) for v in value) if value else None
-            elif attribute == 'genetics.plasmids':
-                value = rgetattr(strain, attribute)
-                if value is not None:
-                    value = ';'.join(value)
-            else:
-                value = rgetattr(strain, attribute)
-
-            strain_row.append(value)
-        genomic_markers[strain.id.strain_id] = strain.genetics.markers
-        yield strain_row
+        # the markers of the last strain with an accession number are kept.
+        # The strains without markers are not added, so they take no memory.
+        markers = strain.genetics.markers
+        if markers or strain_id in self._genomic_markers:
+            self._genomic_markers.replace(
+                strain_id, *([strain_id, marker.marker_type, marker.marker_id,
+                              marker.marker_seq] for marker in markers))
+        return row
+
+    def _format_location(self, location):
+        # most strains share their location, see intern_location
+        try:
+            loc_index = self._location_indexes[location]
+        except KeyError:
+            loc_index = _build_location_index(location)
+            self._location_indexes[location] = loc_index
+        if loc_index is not None and loc_index not in self._locations:
+            self._locations.add(loc_index, [len(self._locations), location.country,
+                                            location.state, location.municipality,
+                                            loc_index])
+        return loc_index
+
+    def _format_publications(self, publications):
+        ids = []
+        for pub in publications:
+            ids.append(pub.id)
+            if pub.id not in self._publications:
+                self._publications.add(pub.id, [getattr(pub, pub_field['attribute'], None)
+                                                for pub_field in PUBLICATION_FIELDS])
+        return ';'.join(str(pub_id) for pub_id in ids) if ids else None
+
+    def _add_sexual_state(self, sexual_state):
+        if sexual_state:
+            self._sexual_states.add(sexual_state)
+        return sexual_state
+
+    def _format_growth_media(self, growth_media):
+        growth_media = [str(growth_medium) for growth_medium in growth_media]
+        if self._error_log is not None:
+            for growth_medium in growth_media:
+                if growth_medium not in self._growth_media_indexes:
+                    self._error_log.add("STD35", pk=self._strain_id, data=growth_medium,
+                                        sheet="Strains", field=self._media_label,
+                                        row=self._row_number)
+        return "/".join(growth_media)
 
 
 def _build_location_index(location):
@@ -254,44 +363,396 @@ def _build_location_index(location):
 
 
 def write_markers_sheet(wb):
-    sheet = wb.create_sheet("Markers")
-    _write_work_sheet(
-        sheet,
-        labels=[f["label"] for f in MARKER_FIELDS],
-        attributes=[f["attribute"] for f in MARKER_FIELDS],
-        data=MARKER_DATA,
-    )
-    redimension_cell_width(sheet)
+    _write_template(wb, _get_template("Markers", _get_markers_rows))
 
 
 def write_ontobiotopes(workbook, ontobiotype_path):
-    ws = workbook.create_sheet("Ontobiotope")
-    with ontobiotype_path.open() as fhand:
-        for row in csv.reader(fhand, delimiter="\t"):
-            ws.append(row)
-    redimension_cell_width(ws)
+    _write_template(workbook, _get_template("Ontobiotope", _get_ontobiotope_rows,
+                                            ontobiotype_path))
+
 
+def _get_markers_rows():
+    attributes = [f["attribute"] for f in MARKER_FIELDS]
+    return [[f["label"] for f in MARKER_FIELDS]] + [
+        [row[attribute] for attribute in attributes] for row in MARKER_DATA]
 
-def _write_work_sheet(sheet, labels, attributes, data):
-    sheet.append(labels)
-    for row in data:
-        row_data = [row[field] for field in attributes]
-        sheet.append(row_data)
 
-    redimension_cell_width(sheet)
+def _get_ontobiotope_rows(path):
+    with open(path) as fhand:
+        return list(csv.reader(fhand, delimiter="\t"))
+
+
+@lru_cache(maxsize=None)
+def _get_template(title, get_rows, *args):
+    """
+    Sheet that does not depend on the exported data, built once per process.
+
+    Its key changes with its content, so it names the cached XML of the
+    sheet of every specification version, see _SegmentsWorkbook.
+    """
+    rows = tuple(tuple(row) for row in get_rows(*args))
+    widths = _ColumnWidths()
+    for row in rows:
+        widths.update(row)
+    digest = hashlib.sha256(pickle.dumps((rows, widths.as_dict()), protocol=4)).hexdigest()
+    return _Template(title, rows, widths, f"{title}-{TEMPLATE_VERSION}-{digest}")
+
+
+def _write_template(wb, template):
+    if isinstance(wb, _SegmentsWorkbook):
+        wb.add_template_sheet(template)
+        return
+    ws = wb.create_sheet(template.title)
+    # the widths are known, so a write-only sheet does not need a spool
+    template.widths.apply(ws)
+    for row in template.rows:
+        ws.append(row)
 
 
 def write_growth_media(wb, growth_media):
     ws = wb.create_sheet(GROWTH_MEDIA)
-    ws.append(["Acronym", "Description", "Full description"])
-    for growth_medium in growth_media:
-        row = [
-            growth_medium.acronym,
-            growth_medium.description,
-            growth_medium.full_description,
-        ]
-        ws.append(row)
-    redimension_cell_width(ws)
+    rows = ([growth_medium.acronym, growth_medium.description,
+             growth_medium.full_description]
+            for growth_medium in growth_media)
+    _write_rows(ws, [["Acronym", "Description", "Full description"]], rows)
+
+
+def _write_rows(ws, *row_groups):
+    """
+    Append the rows to a sheet and fit its columns to their content.
+
+    The column widths are measured as the rows go by. A write-only sheet
+    needs its widths before the first row, so its rows are spooled to a
+    temporary file while they are measured and appended from there.
+    """
+    if isinstance(ws, _SheetSegments):
+        # the segments measure the rows themselves
+        for rows in row_groups:
+            for row in rows:
+                ws.append(row)
+        ws.submit()
+        return
+
+    widths = _ColumnWidths()
+    if not isinstance(ws, WriteOnlyWorksheet):
+        for rows in row_groups:
+            for row in rows:
+                widths.update(row)
+                ws.append(row)
+        widths.apply(ws)
+        return
+
+    with _RowSpool() as spool:
+        for rows in row_groups:
+            for row in rows:
+                widths.update(row)
+                spool.append(row)
+        widths.apply(ws)
+        for row in spool:
+            ws.append(row)
+
+
+class _ColumnWidths():
+    """Widest value of every column, as redimension_cell_width measures it"""
+
+    def __init__(self):
+        self._widths = {}
+
+    def update(self, row):
+        widths = self._widths
+        for column, value in enumerate(row, 1):
+            if value:
+                width = len(str(value))
+                if width > widths.get(column, 0):
+                    widths[column] = width
+
+    def merge(self, other):
+        for column, width in other._widths.items():
+            if width > self._widths.get(column, 0):
+                self._widths[column] = width
+
+    def apply(self, ws):
+        for column, width in self._widths.items():
+            ws.column_dimensions[get_column_letter(column)].width = width
+
+    def as_dict(self):
+        return dict(self._widths)
+
+
+class _RowSpool():
+    """Temporary file with rows, read back in the order they were added"""
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(suffix=".rows")
+        self._fhand = os.fdopen(fd, "w+b")
+
+    def append(self, row):
+        pickle.dump(row, self._fhand, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def flush(self):
+        self._fhand.flush()
+
+    def __iter__(self):
+        self._fhand.seek(0)
+        return iter_pickled_rows(self._fhand)
+
+    def close(self):
+        if not self._fhand.closed:
+            self._fhand.close()
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _SideTable():
+    """
+    Rows of a sheet that is filled while the strains are written.
+
+    The rows are spooled to a temporary file, and measured, as they are
+    added. Only a digest of the key of every group of rows, and the row it
+    starts at, is kept in memory, to add each group once. The groups that
+    are replaced keep their place, and their new rows are kept in memory
+    until the table is read.
+
+    Args:
+        header (list): first row.
+    """
+
+    def __init__(self, header):
+        self._spool = _RowSpool()
+        self._widths = _ColumnWidths()
+        # first row of every group, by the digest of its key, in order
+        self._starts = {}
+        self._replacements = {}
+        self._num_rows = 0
+        self._append(header)
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+
+    def __contains__(self, key):
+        return self._digest(key) in self._starts
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, key, *rows):
+        """Add the rows of a key, unless the key was already added"""
+        digest = self._digest(key)
+        if digest in self._starts:
+            return
+        self._add(digest, rows)
+
+    def replace(self, key, *rows):
+        """Add the rows of a key, in place of the ones added before for it"""
+        digest = self._digest(key)
+        if digest in self._starts:
+            self._replacements[digest] = rows
+        else:
+            self._add(digest, rows)
+
+    def _add(self, digest, rows):
+        self._starts[digest] = self._num_rows
+        for row in rows:
+            self._append(row)
+
+    def _append(self, row):
+        self._widths.update(row)
+        self._spool.append(row)
+        self._num_rows += 1
+
+    def _apply_replacements(self):
+        # the spool is rewritten, and measured again, with the new groups
+        if not self._replacements:
+            return
+        old_spool, old_num_rows = self._spool, self._num_rows
+        old_rows = iter(old_spool)
+        starts = self._starts
+        self._spool = _RowSpool()
+        self._widths = _ColumnWidths()
+        self._starts = {}
+        self._num_rows = 0
+        try:
+            self._append(next(old_rows))
+            ends = chain(islice(starts.values(), 1, None), [old_num_rows])
+            for (digest, start), end in zip(starts.items(), ends):
+                rows = [next(old_rows) for _ in range(end - start)]
+                self._add(digest, self._replacements.get(digest, rows))
+        finally:
+            old_spool.close()
+        self._replacements = {}
+
+    def write(self, ws):
+        self._apply_replacements()
+        if isinstance(ws, _SheetSegments):
+            self._spool.flush()
+            ws.add_rows_file(self._spool.path, self._num_rows, self._widths)
+            return
+        self._widths.apply(ws)
+        for row in self:
+            ws.append(row)
+
+    def __iter__(self):
+        """Rows, from the header"""
+        self._apply_replacements()
+        return iter(self._spool)
+
+    def close(self):
+        self._spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _SheetSegments():
+    """
+    Sheet written as segments by the workers of the parallel engine.
+
+    The rows are spooled to files of rows_per_segment rows, and every file
+    is given to the workers as soon as it is full. The XML of the head of
+    the sheet, with the column widths, is written at the end by get_segments.
+    """
+
+    def __init__(self, pool, directory, compress_level=DEFAULT_COMPRESS_LEVEL,
+                 rows_per_segment=None):
+        self._pool = pool
+        self._directory = Path(directory)
+        self._directory.mkdir()
+        self._compress_level = compress_level
+        self._rows_per_segment = rows_per_segment or ROWS_PER_SEGMENT
+        self._widths = _ColumnWidths()
+        self._futures = []
+        self._num_rows = 0
+        self._rows_file = None
+        self._rows_path = None
+        self._rows_first_row = None
+
+    def _get_path(self, suffix):
+        return self._directory / f"{len(self._futures)}.{suffix}"
+
+    def append(self, row):
+        if self._rows_file is None:
+            self._rows_path = self._get_path("rows")
+            self._rows_file = self._rows_path.open("wb")
+            self._rows_first_row = self._num_rows + 1
+        self._widths.update(row)
+        pickle.dump(row, self._rows_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._num_rows += 1
+        if self._num_rows - self._rows_first_row + 1 >= self._rows_per_segment:
+            self.submit()
+
+    def submit(self):
+        """Give the rows appended so far to the workers"""
+        if self._rows_file is None:
+            return
+        self._rows_file.close()
+        self._rows_file = None
+        self._submit(self._rows_path, self._rows_first_row)
+
+    def _submit(self, rows_path, first_row):
+        self._futures.append(self._pool.submit(
+            write_rows_segment, str(rows_path), first_row, str(self._get_path("xml")),
+            self._compress_level))
+
+    def add_rows_file(self, rows_path, num_rows, widths):
+        """Add the rows of a file written with one pickle.dump per row"""
+        self.submit()
+        self._submit(rows_path, self._num_rows + 1)
+        self._num_rows += num_rows
+        self._widths.merge(widths)
+
+    def wait(self):
+        self.submit()
+        for future in self._futures:
+            future.result()
+
+    def get_segments(self):
+        self.wait()
+        head = write_segment([worksheet_head(self._widths.as_dict())],
+                             self._directory / "head.xml",
+                             compress_level=self._compress_level)
+        tail = write_segment([WORKSHEET_TAIL], self._directory / "tail.xml",
+                             compress_level=self._compress_level)
+        return [head] + [future.result() for future in self._futures] + [tail]
+
+
+class _TemplateSheet():
+    """Sheet of the parallel engine with the cached XML of a template"""
+
+    def __init__(self, segment):
+        self._segment = segment
+
+    def wait(self):
+        pass
+
+    def get_segments(self):
+        return [self._segment]
+
+
+class _SegmentsWorkbook():
+    """
+    Workbook of the parallel engine, see mirri.io.writers.xlsx.
+
+    The XML of the template sheets is taken from template_cache, and only
+    built the first time.
+    """
+
+    def __init__(self, processes=None, compress_level=DEFAULT_COMPRESS_LEVEL,
+                 template_cache=None):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._pool = ProcessPoolExecutor(processes)
+        self.compress_level = compress_level
+        if template_cache is None:
+            template_cache = _get_template_cache()
+        self._template_cache = template_cache
+        self._sheets = []
+
+    def add_template_sheet(self, template):
+        def get_chunks():
+            return chain([worksheet_head(template.widths.as_dict())],
+                         rows_to_xml(template.rows, 1), [WORKSHEET_TAIL])
+
+        segment = self._template_cache.get(template.key, get_chunks,
+                                           compress_level=self.compress_level)
+        self._sheets.append((template.title, _TemplateSheet(segment)))
+
+    def create_sheet(self, title):
+        sheet = _SheetSegments(self._pool, Path(self._tmp_dir.name) / str(len(self._sheets)),
+                               compress_level=self.compress_level)
+        self._sheets.append((title, sheet))
+        return sheet
+
+    def wait(self):
+        for _, sheet in self._sheets:
+            sheet.wait()
+
+    def save(self, path):
+        with XlsxPackage(path, compress_level=self.compress_level) as package:
+            for title, sheet in self._sheets:
+                package.add_sheet(title, sheet.get_segments())
+
+    def close(self):
+        self._pool.shutdown()
+        self._tmp_dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@lru_cache(maxsize=None)
+def _get_template_cache(directory=None):
+    return SegmentCache(directory)
 
 
 def redimension_cell_width(ws):
@@ -0,0 +1,447 @@
+"""
+Minimal XLSX package writer made of independently built parts.
+
+Every worksheet is written as a list of segments: deflate streams of a
+piece of its XML, ended with a sync flush, so they can be produced in
+different processes and then concatenated byte by byte into the zip
+package. Their CRC-32 are combined without reading them again.
+
+The cells are written as inline strings, numbers and booleans, with no
+styles, so the parts do not have to share any table.
+
+    with XlsxPackage(path) as package:
+        package.add_sheet("Strains", [
+            write_segment([worksheet_head(widths)], "head.xml"),
+            write_rows_segment("rows.pickle", 1, "rows.xml"),
+            write_segment([WORKSHEET_TAIL], "tail.xml")])
+"""
+import os
+import pickle
+import struct
+import tempfile
+import time
+import zlib
+from collections import namedtuple
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+STORED = 0
+DEFAULT_COMPRESS_LEVEL = 6
+
+# piece of a part: its file, compression method, the CRC-32 and size of its
+# content and the size of the file. The segments held in memory have their
+# bytes in data instead of a path
+Segment = namedtuple("Segment", ["path", "method", "crc", "size", "compress_size", "data"])
+Segment.__new__.__defaults__ = (None,)
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+WORKSHEET_TAIL = b"</sheetData></worksheet>"
+
+_STYLES = (
+    f'{_XML_DECLARATION}<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>')
+
+_ZIP_VERSION = 20
+_UTF8_FLAG = 0x800
+_ZIP_MAX_SIZE = 0xFFFFFFFF
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_SEGMENT_SUFFIX = ".segment"
+_SEGMENT_MAGIC = b"MXS1"
+_SEGMENT_HEADER = struct.Struct("<4sBII")
+_DEFLATE_END = zlib.compressobj(1, zlib.DEFLATED, -zlib.MAX_WBITS).flush(zlib.Z_FINISH)
+
+
+def iter_pickled_rows(fhand):
+    """Rows of a file written with one pickle.dump per row"""
+    while True:
+        try:
+            yield pickle.load(fhand)
+        except EOFError:
+            return
+
+
+def worksheet_head(widths: dict) -> bytes:
+    """
+    XML of a worksheet up to its first row.
+
+    Args:
+        widths (dict): width of the columns, by column number starting at 1.
+    """
+    head = f'{_XML_DECLARATION}<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+    if widths:
+        cols = "".join(f'<col min="{column}" max="{column}" width="{width}" customWidth="1"/>'
+                       for column, width in sorted(widths.items()))
+        head += f"<cols>{cols}</cols>"
+    return (head + "<sheetData>").encode("utf-8")
+
+
+def _format_text(value):
+    if ILLEGAL_CHARACTERS_RE.search(value):
+        raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+    text = escape(value)
+    if value[:1].isspace() or value[-1:].isspace():
+        return f'<is><t xml:space="preserve">{text}</t></is>'
+    return f"<is><t>{text}</t></is>"
+
+
+def rows_to_xml(rows, first_row: int):
+    """
+    XML of worksheet rows, a row at a time.
+
+    Args:
+        rows (iterable): lists of values. None and "" are empty cells, as in
+            openpyxl.
+        first_row (int): number of the first row, starting at 1.
+    """
+    letters = []
+    for row_number, row in enumerate(rows, first_row):
+        if len(letters) < len(row):
+            letters.extend(get_column_letter(column)
+                           for column in range(len(letters) + 1, len(row) + 1))
+        cells = []
+        for letter, value in zip(letters, row):
+            if value is None or value == "":
+                continue
+            if isinstance(value, str):
+                cells.append(f'<c r="{letter}{row_number}" t="inlineStr">'
+                             f'{_format_text(value)}</c>')
+            elif isinstance(value, bool):
+                cells.append(f'<c r="{letter}{row_number}" t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, (int, float)):
+                cells.append(f'<c r="{letter}{row_number}"><v>{value!r}</v></c>')
+            else:
+                raise ValueError(f"Cannot convert {value!r} to Excel")
+        yield f'<row r="{row_number}">{"".join(cells)}</row>'.encode("utf-8")
+
+
+def write_segment(chunks, path, compress_level: int = DEFAULT_COMPRESS_LEVEL) -> Segment:
+    """
+    Write a piece of a part.
+
+    Args:
+        chunks (iterable): bytes of the piece.
+        path (str or Path): segment file.
+        compress_level (int, optional): 0 to store the content, or the deflate
+            level, from 1 to 9.
+
+    Returns:
+        Segment
+    """
+    with open(path, "wb") as fhand:
+        method, crc, size = _compress(chunks, fhand.write, compress_level)
+        compress_size = fhand.tell()
+    return Segment(str(path), method, crc, size, compress_size)
+
+
+def build_segment(chunks, compress_level: int = DEFAULT_COMPRESS_LEVEL) -> Segment:
+    """Same as write_segment, but the segment is kept in memory"""
+    pieces = []
+    method, crc, size = _compress(chunks, pieces.append, compress_level)
+    data = b"".join(pieces)
+    return Segment(None, method, crc, size, len(data), data)
+
+
+def _compress(chunks, write, compress_level):
+    crc = 0
+    size = 0
+    compressor = None
+    method = STORED
+    if compress_level != STORED:
+        compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        method = zlib.DEFLATED
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        write(chunk if compressor is None else compressor.compress(chunk))
+    if compressor is not None:
+        # a sync flush leaves the stream open, so more segments can follow
+        write(compressor.flush(zlib.Z_SYNC_FLUSH))
+    return method, crc, size
+
+
+def write_rows_segment(rows_path, first_row: int, path,
+                       compress_level: int = DEFAULT_COMPRESS_LEVEL) -> Segment:
+    """
+    Write the rows of a file made with pickle.dump as a worksheet segment.
+
+    It only takes picklable arguments, so it can run in a process pool.
+    """
+    with open(rows_path, "rb") as fhand:
+        return write_segment(rows_to_xml(iter_pickled_rows(fhand), first_row), path,
+                             compress_level=compress_level)
+
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """CRC-32 of two pieces of data from their CRC-32, as zlib crc32_combine"""
+    if len2 == 0:
+        return crc1
+    # operator for one zero bit, then squared for two and four zero bits
+    odd = [0xEDB88320] + [1 << bit for bit in range(31)]
+    even = _gf2_matrix_square(odd)
+    odd = _gf2_matrix_square(even)
+    while True:
+        even = _gf2_matrix_square(odd)
+        if len2 & 1:
+            crc1 = _gf2_matrix_times(even, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+        odd = _gf2_matrix_square(even)
+        if len2 & 1:
+            crc1 = _gf2_matrix_times(odd, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+    return crc1 ^ crc2
+
+
+def _gf2_matrix_times(matrix, vector):
+    result = 0
+    index = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[index]
+        vector >>= 1
+        index += 1
+    return result
+
+
+def _gf2_matrix_square(matrix):
+    return [_gf2_matrix_times(matrix, row) for row in matrix]
+
+
+class SegmentCache():
+    """
+    Segments that are the same in every package, e.g. constant worksheets.
+
+    The segments are kept in memory and, if a directory is given, in files,
+    so other processes and later runs reuse them. The key has to change
+    with the content of the segment.
+
+    Args:
+        directory (str or Path, optional): cache directory. It is created if
+            needed.
+    """
+
+    def __init__(self, directory=None) -> None:
+        self.directory = None if directory is None else Path(directory)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._segments = {}
+
+    def get(self, key: str, get_chunks, compress_level: int = DEFAULT_COMPRESS_LEVEL) -> Segment:
+        """
+        Get a segment, building it if it is not in the cache.
+
+        Args:
+            key (str): segment key.
+            get_chunks (callable): returns the bytes of the segment content.
+            compress_level (int, optional): compression level of the segment.
+        """
+        name = f"{key}.{compress_level}"
+        segment = self._segments.get(name)
+        if segment is not None:
+            return segment
+        path = None if self.directory is None else self.directory / f"{name}{_SEGMENT_SUFFIX}"
+        if path is not None:
+            segment = self._load(path)
+        if segment is None:
+            segment = build_segment(get_chunks(), compress_level=compress_level)
+            if path is not None:
+                self._store(path, segment)
+        self._segments[name] = segment
+        return segment
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    @staticmethod
+    def _load(path):
+        try:
+            with path.open("rb") as fhand:
+                content = fhand.read()
+        except FileNotFoundError:
+            return None
+        if len(content) < _SEGMENT_HEADER.size:
+            return None
+        magic, method, crc, size = _SEGMENT_HEADER.unpack_from(content)
+        if magic != _SEGMENT_MAGIC:
+            return None
+        data = content[_SEGMENT_HEADER.size:]
+        return Segment(None, method, crc, size, len(data), data)
+
+    def _store(self, path, segment):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fhand:
+                fhand.write(_SEGMENT_HEADER.pack(_SEGMENT_MAGIC, segment.method,
+                                                 segment.crc, segment.size))
+                fhand.write(segment.data)
+            # other processes never read a half written segment
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class XlsxPackage():
+    """
+    XLSX file assembled from worksheet segments.
+
+    The workbook, styles and relationship parts are written by close.
+
+    Args:
+        path (str or Path): output file.
+        compress_level (int, optional): level of the parts written by the
+            package. The segments keep the level they were written with.
+    """
+
+    def __init__(self, path, compress_level: int = DEFAULT_COMPRESS_LEVEL) -> None:
+        self._fhand = open(path, "wb")
+        self.compress_level = compress_level
+        self._entries = []
+        self._sheet_titles = []
+        now = time.localtime()
+        self._dos_time = (now.tm_hour << 11) | (now.tm_min << 5) | (now.tm_sec // 2)
+        self._dos_date = ((now.tm_year - 1980) << 9) | (now.tm_mon << 5) | now.tm_mday
+
+    def add_sheet(self, title: str, segments) -> None:
+        """
+        Add a worksheet made of segments, in order.
+
+        The segments have to hold the whole worksheet XML, from
+        worksheet_head to WORKSHEET_TAIL, and be written with the same
+        compression method.
+        """
+        methods = {segment.method for segment in segments}
+        if len(methods) != 1:
+            raise ValueError("The segments of a sheet need the same compression method")
+        method = methods.pop()
+        self._sheet_titles.append(title)
+        name = f"xl/worksheets/sheet{len(self._sheet_titles)}.xml"
+        # an empty final block ends the deflate stream
+        end = _DEFLATE_END if method == zlib.DEFLATED else b""
+        crc = 0
+        size = 0
+        compress_size = len(end)
+        for segment in segments:
+            crc = crc32_combine(crc, segment.crc, segment.size)
+            size += segment.size
+            compress_size += segment.compress_size
+        self._write_header(name, method, crc, size, compress_size)
+        for segment in segments:
+            if segment.data is not None:
+                self._fhand.write(segment.data)
+                continue
+            with open(segment.path, "rb") as fhand:
+                while True:
+                    chunk = fhand.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    self._fhand.write(chunk)
+        self._fhand.write(end)
+
+    def _write_part(self, name: str, content: str) -> None:
+        data = content.encode("utf-8")
+        crc = zlib.crc32(data)
+        if self.compress_level == STORED:
+            method = STORED
+            compressed = data
+        else:
+            method = zlib.DEFLATED
+            compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED,
+                                          -zlib.MAX_WBITS)
+            compressed = compressor.compress(data) + compressor.flush()
+        self._write_header(name, method, crc, len(data), len(compressed))
+        self._fhand.write(compressed)
+
+    def _write_header(self, name, method, crc, size, compress_size):
+        if max(size, compress_size, self._fhand.tell()) > _ZIP_MAX_SIZE:
+            raise ValueError("The XLSX package is too big, ZIP64 is not supported")
+        encoded_name = name.encode("utf-8")
+        self._entries.append((encoded_name, method, crc, size, compress_size,
+                              self._fhand.tell()))
+        self._fhand.write(_LOCAL_HEADER.pack(
+            0x04034B50, _ZIP_VERSION, _UTF8_FLAG, method, self._dos_time,
+            self._dos_date, crc, compress_size, size, len(encoded_name), 0))
+        self._fhand.write(encoded_name)
+
+    def close(self) -> None:
+        if self._fhand.closed:
+            return
+        try:
+            self._write_package_parts()
+            self._write_central_directory()
+        finally:
+            self._fhand.close()
+
+    def _write_package_parts(self):
+        num_sheets = len(self._sheet_titles)
+        sheet_overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="'
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for index in range(1, num_sheets + 1))
+        self._write_part("[Content_Types].xml", (
+            f'{_XML_DECLARATION}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="'
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="'
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{sheet_overrides}</Types>'))
+        self._write_part("_rels/.rels", (
+            f'{_XML_DECLARATION}<Relationships xmlns="{_PKG_REL_NS}">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+            '2006/relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>'))
+
+        sheets = "".join(f'<sheet name={quoteattr(title)} sheetId="{index}" r:id="rId{index}"/>'
+                         for index, title in enumerate(self._sheet_titles, 1))
+        self._write_part("xl/workbook.xml", (
+            f'{_XML_DECLARATION}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets>{sheets}</sheets></workbook>'))
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{index}" Type="http://schemas.openxmlformats.org/'
+            f'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, num_sheets + 1))
+        self._write_part("xl/_rels/workbook.xml.rels", (
+            f'{_XML_DECLARATION}<Relationships xmlns="{_PKG_REL_NS}">{sheet_rels}'
+            f'<Relationship Id="rId{num_sheets + 1}" Type="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships/styles" Target="styles.xml"/></Relationships>'))
+        self._write_part("xl/styles.xml", _STYLES)
+
+    def _write_central_directory(self):
+        start = self._fhand.tell()
+        for name, method, crc, size, compress_size, offset in self._entries:
+            self._fhand.write(_CENTRAL_HEADER.pack(
+                0x02014B50, _ZIP_VERSION, _ZIP_VERSION, _UTF8_FLAG, method, self._dos_time,
+                self._dos_date, crc, compress_size, size, len(name), 0, 0, 0, 0, 0, offset))
+            self._fhand.write(name)
+        end = self._fhand.tell()
+        if end > _ZIP_MAX_SIZE:
+            raise ValueError("The XLSX package is too big, ZIP64 is not supported")
+        self._fhand.write(_END_RECORD.pack(0x06054B50, 0, 0, len(self._entries),
+                                           len(self._entries), end - start, start, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,3 +1,5 @@
 from .error import Entity, Error
 from .error_message import ErrorMessage
-from .error_log import ErrorLog
\ No newline at end of file
+from .error_log import ErrorLog
+from .renderers import (CSVRenderer, JSONRenderer, TextRenderer, XLSXRenderer,
+                        render_error_log)
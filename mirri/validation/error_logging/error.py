@@ -1,5 +1,6 @@
+import sys
 from typing import Optional
-from .error_message import ErrorMessage
+from .error_message import ENTITY_NAMES, format_error_message
 
 
 class Entity():
@@ -15,24 +16,10 @@ class Entity():
     def __str__(self) -> str:
         return f"Entity {self.acronym}: {self.name}"
 
-    @property
-    def _acronyms(self) -> list:
-        return [
-            func
-            for func in dir(self)
-            if func.isupper() and
-            callable(getattr(self, func)) and
-            not func.startswith("__")
-        ]
-
-    @property
-    def _names(self) -> dict:
-        return {acr: getattr(self, acr)() for acr in self._acronyms}
-
     @property
     def name(self) -> str:
         try:
-            return self._names[self.acronym]
+            return ENTITY_NAMES[self.acronym]
         except KeyError:
             raise KeyError(f'Unknown acronym {self.acronym}.')
 
@@ -44,30 +31,6 @@ class Entity():
     def acronym(self, acronym: str) -> None:
         self._acronym = acronym
 
-    def EFS(self) -> str:
-        return 'Excel File Structure'
-
-    def GMD(self) -> str:
-        return 'Growth Media'
-
-    def GOD(self) -> str:
-        return 'Geographic Origin'
-
-    def LID(self) -> str:
-        return 'Literature'
-
-    def STD(self) -> str:
-        return 'Strains'
-
-    def GID(self) -> str:
-        return 'Genomic Information'
-
-    def OTD(self) -> str:
-        return 'Ontobiotope'
-
-    def UCT(self) -> str:
-        return 'Uncategorized'
-
 
 class Error():
     """Error information
@@ -76,12 +39,21 @@ class Error():
             message (str): Error message
             entity (Entity, optional): Entity related to the error. If None will default to Uncategorized. Defaults to None.
             data (str, optional): Data used for sorting the messages. Defaults to None.
+            sheet (str, optional): Sheet where the error was found. Defaults to None.
+            field (str, optional): Column of the sheet where the error was found. Defaults to None.
+            row (int, optional): Excel row number where the error was found. Defaults to None.
     """
+    __slots__ = ('_code', '_pk', '_data', 'sheet', 'field', 'row')
 
-    def __init__(self, code: str, pk: Optional[str] = None, data: Optional[str] = None) -> None:
-        self.code = code.upper()
+    def __init__(self, code: str, pk: Optional[str] = None, data: Optional[str] = None,
+                 sheet: Optional[str] = None, field: Optional[str] = None,
+                 row: Optional[int] = None) -> None:
+        self.code = code
         self.pk = pk
         self.data = data
+        self.sheet = sheet
+        self.field = field
+        self.row = row
 
     def __str__(self):
         return f"Error {self._code}: {self.message}"
@@ -92,7 +64,7 @@ class Error():
 
     @code.setter
     def code(self, code: str) -> None:
-        self._code = code.upper()
+        self._code = sys.intern(code.upper())
 
     @property
     def pk(self) -> Optional[str]:
@@ -116,4 +88,4 @@ class Error():
 
     @property
     def message(self) -> str:
-        return ErrorMessage(self.code, self.pk, self.data).message
+        return format_error_message(self.code, self.pk, self.data)
@@ -1,32 +1,97 @@
+import sys
+from array import array
+from collections import namedtuple
+from io import StringIO
 from typing import Optional, Union
 from datetime import datetime
 from .error import Error
+from .error_message import ERROR_REGISTRY
+
+NO_ROW = -1
+
+ErrorRecord = namedtuple('ErrorRecord', ['entity', 'code', 'pk', 'message', 'sheet', 'field', 'row'])
+
+
+class ErrorAggregate(namedtuple('ErrorAggregate', ['code', 'count', 'first_row', 'last_row'])):
+    """All the occurrences of an error code summarized in one record"""
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        occurrences = 'occurrence' if self.count == 1 else 'occurrences'
+        if self.first_row is None:
+            return f"{self.code} ({self.count} {occurrences})"
+        if self.first_row == self.last_row:
+            return f"{self.code} in row {self.first_row} ({self.count} {occurrences})"
+        return f"{self.code} in rows {self.first_row}–{self.last_row} ({self.count} {occurrences})"
+
+
+class _InternTable():
+    """Stores every distinct value once and refers to it by its index"""
+    __slots__ = ('_values', '_indexes')
+
+    def __init__(self):
+        self._values = [None]
+        self._indexes = {(type(None), None): 0}
+
+    def __getitem__(self, index: int):
+        return self._values[index]
+
+    def add(self, value) -> int:
+        # the type is part of the key to keep 1, 1.0 and True apart
+        key = (value.__class__, value)
+        try:
+            return self._indexes[key]
+        except KeyError:
+            self._indexes[key] = len(self._values)
+        except TypeError:
+            # unhashable values can not be shared
+            pass
+        self._values.append(value)
+        return len(self._values) - 1
 
 
 class ErrorLog():
-    def __init__(self, input_filename: str, cc: Optional[str] = None, date: Optional[Union[str, datetime]] = None, limit: int = 100):
+    def __init__(self, input_filename: str, cc: Optional[str] = None, date: Optional[Union[str, datetime]] = None, limit: int = 100,
+                 max_errors_per_code: Optional[int] = None):
         """
         Logger for Error instances.
 
+        Errors are not kept as Error instances, they are stored in parallel
+        arrays of indexes to tables of interned codes and values, and the
+        Error instances are rebuilt when asked for.
+
         Args:
             input_filename (str): name of the file to be logged
             cc (str, optional): name of the curator. Defaults to None.
             date (str, optional): date (e.g. created, last modified) associated with the file. Useful for versioning. Defaults to None.
             limit (int, optional): limit of errors to print to the report. Defaults to 100.
+            max_errors_per_code (int, optional): errors of the same code to keep in detail. Once reached,
+                further errors of that code only update its aggregate. Defaults to None, keep all.
         """
         self._input_filename = input_filename
         self._cc = cc
         self._date = date
-        self._errors = {}
         self.limit = limit
-        self._counter = 0
+        self.max_errors_per_code = max_errors_per_code
+        self._codes = _InternTable()
+        self._values = _InternTable()
+        self._locations = _InternTable()
+        self._code_ids = array('L')
+        self._pk_ids = array('L')
+        self._data_ids = array('L')
+        self._location_ids = array('L')
+        self._rows = array('l')
+        self._positions_by_entity = {}
+        self._aggregates = {}
 
     def __str__(self) -> str:
-        output = f"""Error Log for file {self._input_filename}\nENTITY | CODE   | MESSAGE"""
-        for acronym, error_list in self.get_errors().items():
-            for error in error_list:
-                output += f"\n{acronym:6} | {error.code:6} | {error.message[:100]}"
-        return output
+        from .renderers import TextRenderer
+        fhand = StringIO()
+        TextRenderer(fhand, group_by='entity', limit=self.limit).render(self)
+        return fhand.getvalue().rstrip('\n')
+
+    def __len__(self) -> int:
+        return len(self._code_ids)
 
     @property
     def input_filename(self) -> str:
@@ -55,6 +120,38 @@ class ErrorLog():
         else:
             self._date = date
 
+    @property
+    def total_errors(self) -> int:
+        """Number of errors logged, including those only kept in the aggregates"""
+        return sum(aggregate[0] for aggregate in self._aggregates.values())
+
+    def _get_error(self, position: int) -> Error:
+        sheet, field = self._locations[self._location_ids[position]]
+        row = self._rows[position]
+        return Error(self._codes[self._code_ids[position]],
+                     pk=self._values[self._pk_ids[position]],
+                     data=self._values[self._data_ids[position]],
+                     sheet=sheet, field=field,
+                     row=None if row == NO_ROW else row)
+
+    def iter_errors(self, acronym: Optional[str] = None):
+        """
+        Iterate over the errors without building them all at once
+
+        Args:
+            acronym (str, optional): only the errors of this entity. Defaults to None, all the errors.
+
+        Yields:
+            Error: Error instances grouped by entity acronym.
+        """
+        if acronym is None:
+            acronyms = self._positions_by_entity.keys()
+        else:
+            acronyms = [acronym] if acronym in self._positions_by_entity else []
+        for acronym in acronyms:
+            for position in self._positions_by_entity[acronym]:
+                yield self._get_error(position)
+
     def get_errors(self) -> dict:
         """
         Get all errors
@@ -62,7 +159,18 @@ class ErrorLog():
         Returns:
             dict: Error intances grouped by entity acronym.
         """
-        return self._errors
+        return {acronym: [self._get_error(position) for position in positions]
+                for acronym, positions in self._positions_by_entity.items()}
+
+    def get_aggregates(self) -> list:
+        """
+        Get a summary of the errors by code
+
+        Returns:
+            list: ErrorAggregate instances in order of first appearance.
+        """
+        return [ErrorAggregate(code, *aggregate)
+                for code, aggregate in self._aggregates.items()]
 
     def add_error(self, error: Error) -> None:
         """
@@ -71,7 +179,88 @@ class ErrorLog():
         Args:
             error (Error): Error instance.
         """
-        if error.entity.acronym not in self._errors:
-            self._errors[error.entity.acronym] = [error]
+        self.add(error.code, pk=error.pk, data=error.data, sheet=error.sheet,
+                 field=error.field, row=error.row)
+
+    def add(self, code: str, pk: Optional[str] = None, data: Optional[str] = None,
+            sheet: Optional[str] = None, field: Optional[str] = None,
+            row: Optional[int] = None) -> None:
+        """
+        Add an error without creating an Error instance.
+
+        Args:
+            code (str): Error code.
+            pk (str, optional): primary key of the instance that triggered the error. Defaults to None.
+            data (str, optional): value that triggered the error. Defaults to None.
+            sheet (str, optional): sheet where the error was found. Defaults to None.
+            field (str, optional): column where the error was found. Defaults to None.
+            row (int, optional): excel row number where the error was found. Defaults to None.
+        """
+        code = sys.intern(code.upper())
+        aggregate = self._aggregates.get(code, None)
+        if aggregate is None:
+            aggregate = [0, None, None]
+            self._aggregates[code] = aggregate
+        aggregate[0] += 1
+        if row is not None:
+            if aggregate[1] is None or row < aggregate[1]:
+                aggregate[1] = row
+            if aggregate[2] is None or row > aggregate[2]:
+                aggregate[2] = row
+        if self.max_errors_per_code is not None and aggregate[0] > self.max_errors_per_code:
+            return
+
+        acronym = code[:3]
+        positions = self._positions_by_entity.get(acronym, None)
+        if positions is None:
+            positions = array('L')
+            self._positions_by_entity[acronym] = positions
+        positions.append(len(self._code_ids))
+
+        self._code_ids.append(self._codes.add(code))
+        self._pk_ids.append(self._values.add(pk))
+        self._data_ids.append(self._values.add(data))
+        self._location_ids.append(self._locations.add((sheet, field)))
+        self._rows.append(NO_ROW if row is None else row)
+
+    def iter_records(self, acronym: Optional[str] = None, group_by_entity: bool = True):
+        """
+        Iterate over the logged errors with their messages already formatted.
+
+        Args:
+            acronym (str, optional): only the errors of this entity. Defaults to None, all the errors.
+            group_by_entity (bool, optional): yield the errors grouped by entity acronym instead of
+                in the order they were added. Defaults to True.
+
+        Yields:
+            ErrorRecord: one record per logged error.
+        """
+        if acronym is not None:
+            positions = self._positions_by_entity.get(acronym, [])
+        elif group_by_entity:
+            positions = (position for positions in self._positions_by_entity.values()
+                         for position in positions)
         else:
-            self._errors[error.entity.acronym].append(error)
+            positions = range(len(self._code_ids))
+
+        for position in positions:
+            code = self._codes[self._code_ids[position]]
+            pk = self._values[self._pk_ids[position]]
+            try:
+                formatter = ERROR_REGISTRY[code].formatter
+            except KeyError:
+                raise ValueError(f"{code} not found")
+            message = formatter(pk=pk, value=self._values[self._data_ids[position]])
+            sheet, field = self._locations[self._location_ids[position]]
+            row = self._rows[position]
+            yield ErrorRecord(code[:3], code, pk, message, sheet, field,
+                              None if row == NO_ROW else row)
+
+    def render(self) -> list:
+        """
+        Format the messages of all the logged errors in one pass.
+
+        Returns:
+            list: (entity acronym, code, pk, message) tuples grouped by entity acronym.
+        """
+        return [record[:4] for record in self.iter_records()]
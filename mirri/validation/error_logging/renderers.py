@@ -0,0 +1,253 @@
+import csv
+import json
+from itertools import islice
+from typing import Optional
+
+from openpyxl import Workbook
+
+from .error_message import ENTITY_NAMES
+
+NO_GROUPING = None
+GROUP_BY_ENTITY = 'entity'
+GROUP_BY_CODE = 'code'
+GROUPINGS = (NO_GROUPING, GROUP_BY_ENTITY, GROUP_BY_CODE)
+
+ERROR_COLUMNS = ('entity', 'code', 'pk', 'message', 'sheet', 'field', 'row')
+AGGREGATE_COLUMNS = ('entity', 'code', 'count', 'first_row', 'last_row')
+
+
+class ErrorLogRenderer():
+    """Writes an ErrorLog to a file handle one error at a time
+
+    The messages are formatted as they are written, so the memory used does
+    not depend on the number of errors in the log.
+
+    Args:
+        fhand: file handle to write to. Text mode for every format but xlsx.
+        group_by (str, optional): None to write the errors in the order they were logged,
+            'entity' to group them by entity or 'code' to write one aggregate per error code.
+            Defaults to None.
+        limit (int, optional): maximum number of errors (or aggregates) to write. Defaults to None, all.
+        offset (int, optional): number of errors (or aggregates) to skip before writing. Defaults to 0.
+    """
+
+    def __init__(self, fhand, group_by: Optional[str] = NO_GROUPING,
+                 limit: Optional[int] = None, offset: int = 0) -> None:
+        if group_by not in GROUPINGS:
+            raise ValueError(f'Unknown grouping {group_by}. Use one of {GROUPINGS}')
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError('limit and offset must be positive numbers')
+        self.fhand = fhand
+        self.group_by = group_by
+        self.limit = limit
+        self.offset = offset
+
+    def _paginate(self, items):
+        stop = None if self.limit is None else self.offset + self.limit
+        return islice(items, self.offset, stop)
+
+    def _remaining(self, total: int, written: int) -> int:
+        return max(total - self.offset - written, 0)
+
+    def render(self, error_log) -> int:
+        """
+        Write the error log.
+
+        Args:
+            error_log (ErrorLog): log to write.
+
+        Returns:
+            int: number of errors (or aggregates) written.
+        """
+        if self.group_by == GROUP_BY_CODE:
+            aggregates = error_log.get_aggregates()
+            self._start(error_log)
+            written = 0
+            for aggregate in self._paginate(aggregates):
+                self._write_aggregate(aggregate)
+                written += 1
+            self._finish(error_log, self._remaining(len(aggregates), written))
+            return written
+
+        records = error_log.iter_records(
+            group_by_entity=self.group_by == GROUP_BY_ENTITY)
+        self._start(error_log)
+        written = 0
+        current_entity = None
+        for record in self._paginate(records):
+            if self.group_by == GROUP_BY_ENTITY and record.entity != current_entity:
+                if current_entity is not None:
+                    self._end_entity(current_entity)
+                current_entity = record.entity
+                self._start_entity(current_entity)
+            self._write_error(record)
+            written += 1
+        if current_entity is not None:
+            self._end_entity(current_entity)
+        self._finish(error_log, self._remaining(len(error_log), written))
+        return written
+
+    def _start(self, error_log) -> None:
+        pass
+
+    def _start_entity(self, acronym: str) -> None:
+        pass
+
+    def _end_entity(self, acronym: str) -> None:
+        pass
+
+    def _write_error(self, record) -> None:
+        raise NotImplementedError()
+
+    def _write_aggregate(self, aggregate) -> None:
+        raise NotImplementedError()
+
+    def _finish(self, error_log, remaining: int) -> None:
+        pass
+
+
+class TextRenderer(ErrorLogRenderer):
+    """Human readable report"""
+
+    def _start(self, error_log) -> None:
+        self.fhand.write(f'Error Log for file {error_log.input_filename}\n')
+        if self.group_by is NO_GROUPING:
+            self.fhand.write('ENTITY | CODE   | MESSAGE\n')
+        elif self.group_by == GROUP_BY_CODE:
+            self.fhand.write('ENTITY | SUMMARY\n')
+
+    def _start_entity(self, acronym: str) -> None:
+        self.fhand.write(f'\n{acronym}\n')
+        self.fhand.write('-' * len(acronym) + '\n')
+
+    def _write_error(self, record) -> None:
+        if self.group_by is NO_GROUPING:
+            self.fhand.write(f'{record.entity:6} | {record.code:6} | {record.message}\n')
+            return
+        if record.pk:
+            self.fhand.write(f'{record.pk}: ')
+        self.fhand.write(f'{record.message} - {record.code}\n')
+
+    def _write_aggregate(self, aggregate) -> None:
+        self.fhand.write(f'{aggregate.code[:3]:6} | {aggregate}\n')
+
+    def _finish(self, error_log, remaining: int) -> None:
+        if remaining:
+            self.fhand.write(f'... {remaining} more not shown\n')
+
+
+class JSONRenderer(ErrorLogRenderer):
+    """JSON document with the errors in a list, or in an object keyed by entity"""
+
+    def _start(self, error_log) -> None:
+        self._first_item = True
+        header = json.dumps({'input_filename': error_log.input_filename,
+                             'total_errors': error_log.total_errors})
+        self.fhand.write(header[:-1])
+        opening = '{' if self.group_by == GROUP_BY_ENTITY else '['
+        self.fhand.write(f', "errors": {opening}')
+
+    def _start_entity(self, acronym: str) -> None:
+        if not self._first_item:
+            self.fhand.write(', ')
+        self.fhand.write(f'{json.dumps(acronym)}: [')
+        self._first_item = True
+
+    def _end_entity(self, acronym: str) -> None:
+        self.fhand.write(']')
+        self._first_item = False
+
+    def _write_item(self, item: dict) -> None:
+        if not self._first_item:
+            self.fhand.write(', ')
+        self._first_item = False
+        self.fhand.write(json.dumps(item, default=str))
+
+    def _write_error(self, record) -> None:
+        self._write_item(record._asdict())
+
+    def _write_aggregate(self, aggregate) -> None:
+        self._write_item({'entity': aggregate.code[:3], **aggregate._asdict()})
+
+    def _finish(self, error_log, remaining: int) -> None:
+        closing = '}' if self.group_by == GROUP_BY_ENTITY else ']'
+        self.fhand.write(f'{closing}, "not_shown": {remaining}}}\n')
+
+
+class CSVRenderer(ErrorLogRenderer):
+    """One row per error, or per error code when grouped by code"""
+
+    def _start(self, error_log) -> None:
+        self._writer = csv.writer(self.fhand)
+        if self.group_by == GROUP_BY_CODE:
+            self._writer.writerow(AGGREGATE_COLUMNS)
+        else:
+            self._writer.writerow(ERROR_COLUMNS)
+
+    def _write_error(self, record) -> None:
+        self._writer.writerow(record)
+
+    def _write_aggregate(self, aggregate) -> None:
+        self._writer.writerow((aggregate.code[:3], *aggregate))
+
+
+class XLSXRenderer(ErrorLogRenderer):
+    """Excel workbook written in openpyxl write-only mode.
+
+    When grouped by entity every entity gets its own sheet. The file handle
+    must be opened in binary mode.
+    """
+
+    def _start(self, error_log) -> None:
+        self._workbook = Workbook(write_only=True)
+        if self.group_by == GROUP_BY_CODE:
+            self._sheet = self._workbook.create_sheet('Summary')
+            self._sheet.append(AGGREGATE_COLUMNS)
+        elif self.group_by is NO_GROUPING:
+            self._sheet = self._workbook.create_sheet('Errors')
+            self._sheet.append(ERROR_COLUMNS)
+
+    def _start_entity(self, acronym: str) -> None:
+        self._sheet = self._workbook.create_sheet(ENTITY_NAMES.get(acronym, acronym)[:31])
+        self._sheet.append(ERROR_COLUMNS)
+
+    def _write_error(self, record) -> None:
+        self._sheet.append([value if value is None or isinstance(value, (int, float))
+                            else str(value) for value in record])
+
+    def _write_aggregate(self, aggregate) -> None:
+        self._sheet.append((aggregate.code[:3], *aggregate))
+
+    def _finish(self, error_log, remaining: int) -> None:
+        if not self._workbook.worksheets:
+            # a workbook needs at least one sheet
+            self._workbook.create_sheet('Errors').append(ERROR_COLUMNS)
+        self._workbook.save(self.fhand)
+
+
+RENDERERS = {
+    'text': TextRenderer,
+    'json': JSONRenderer,
+    'csv': CSVRenderer,
+    'xlsx': XLSXRenderer,
+}
+
+
+def render_error_log(error_log, fhand, format: str = 'text', **kwargs) -> int:
+    """
+    Write an error log to a file handle in the given format.
+
+    Args:
+        error_log (ErrorLog): log to write.
+        fhand: file handle to write to.
+        format (str, optional): one of text, json, csv or xlsx. Defaults to 'text'.
+        kwargs: grouping, limit and offset, see ErrorLogRenderer.
+
+    Returns:
+        int: number of errors (or aggregates) written.
+    """
+    try:
+        renderer_class = RENDERERS[format]
+    except KeyError:
+        raise ValueError(f'Unknown format {format}. Use one of {list(RENDERERS)}')
+    return renderer_class(fhand, **kwargs).render(error_log)
@@ -0,0 +1,568 @@
+"""
+Annotated copy of a validated excel file.
+
+The cells with errors are filled in red and get a comment with the error
+messages, but on the sheets that already have comments or VML drawings: the
+existing parts are not merged, so the cells there only get the fill, and
+the number of cells left without comment is logged as a warning.
+
+Only the parts of the xlsx package that need changes (the sheets with
+errors, their relationships, styles and content types) are rewritten, and
+they are rewritten as a stream of SAX events, so the workbook is never
+loaded in memory. The rest of the zip members are copied unchanged.
+"""
+import copy
+import logging
+import posixpath
+import re
+import shutil
+import zipfile
+from xml.etree.ElementTree import iterparse
+from xml.sax import make_parser
+from xml.sax.handler import ContentHandler
+from xml.sax.saxutils import XMLGenerator, escape
+
+from openpyxl.utils.cell import column_index_from_string, get_column_letter
+
+logger = logging.getLogger(__name__)
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+COMMENTS_REL_TYPE = f"{REL_NS}/comments"
+VML_REL_TYPE = f"{REL_NS}/vmlDrawing"
+COMMENTS_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.comments+xml"
+VML_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.vmlDrawing"
+
+ERROR_FILL_COLOR = "FFFFC7CE"
+COMMENT_AUTHOR = "MIRRI validator"
+
+# worksheet children that go after legacyDrawing, in schema order
+_AFTER_LEGACY_DRAWING = {"legacyDrawingHF", "drawingHF", "picture", "oleObjects",
+                         "controls", "webPublishItems", "tableParts", "extLst"}
+_CELL_REFERENCE = re.compile(r"([A-Z]+)(\d+)")
+_RID_NUMBER = re.compile(r"rId(\d+)$")
+
+_VML_HEADER = """<xml xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office" xmlns:x="urn:schemas-microsoft-com:office:excel">
+<o:shapelayout v:ext="edit"><o:idmap v:ext="edit" data="{idmap}"/></o:shapelayout>
+<v:shapetype id="_x0000_t202" coordsize="21600,21600" o:spt="202" path="m,l,21600r21600,l21600,xe"><v:stroke joinstyle="miter"/><v:path gradientshapeok="t" o:connecttype="rect"/></v:shapetype>
+"""
+_VML_SHAPE = """<v:shape id="_x0000_s{shape_id}" type="#_x0000_t202" style="position:absolute;margin-left:59.25pt;margin-top:1.5pt;width:216pt;height:80pt;z-index:{z_index};visibility:hidden" fillcolor="#ffffe1" o:insetmode="auto"><v:fill color2="#ffffe1"/><v:shadow on="t" color="black" obscured="t"/><v:path o:connecttype="none"/><v:textbox style="mso-direction-alt:auto"><div style="text-align:left"/></v:textbox><x:ClientData ObjectType="Note"><x:MoveWithCells/><x:SizeWithCells/><x:AutoFill>False</x:AutoFill><x:Row>{row}</x:Row><x:Column>{column}</x:Column></x:ClientData></v:shape>
+"""
+
+
+def annotate_excel(in_fhand, error_log, out_fhand):
+    """
+    Write a copy of an excel file with the cells that have errors highlighted
+    and commented.
+
+    The errors are located with their sheet, field and row. Errors without
+    row can not be placed in a cell and are left out, and errors whose field
+    is not a column of the sheet are placed in the first column of the row.
+    The cells of the sheets that already have comments are highlighted but
+    not commented, and a warning tells how many of them there are.
+
+    Args:
+        in_fhand: binary file handle of the validated excel file.
+        error_log (ErrorLog): errors found in the file.
+        out_fhand: binary file handle to write the annotated copy to.
+
+    Returns:
+        int: number of annotated cells.
+    """
+    annotated_cells = 0
+    with zipfile.ZipFile(in_fhand) as in_zip, \
+            zipfile.ZipFile(out_fhand, "w", zipfile.ZIP_DEFLATED) as out_zip:
+        members = set(in_zip.namelist())
+        sheet_paths = _get_sheet_paths(in_zip)
+        errors_by_sheet = _group_errors_by_sheet(error_log, sheet_paths)
+        header_columns = _get_header_columns(in_zip, sheet_paths, errors_by_sheet)
+
+        sheets = {}
+        for sheet_name, errors in errors_by_sheet.items():
+            cells = _locate_errors(errors, header_columns[sheet_name])
+            if cells:
+                sheets[sheet_paths[sheet_name]] = cells
+                annotated_cells += len(cells)
+        if not sheets:
+            for info in in_zip.infolist():
+                _copy_member(in_zip, out_zip, info)
+            return 0
+
+        styles_path = _get_styles_path(in_zip)
+        fill_id, xf_count = _count_styles(in_zip, styles_path)
+
+        # comments are only added to the sheets that do not have any yet
+        comment_parts = {}
+        uncommented_cells = 0
+        for number, sheet_path in enumerate(sorted(sheets), start=1):
+            rels_path = _get_rels_path(sheet_path)
+            rel_types, rel_ids = _read_rels(in_zip, rels_path)
+            if COMMENTS_REL_TYPE in rel_types or VML_REL_TYPE in rel_types:
+                uncommented_cells += len(sheets[sheet_path])
+                continue
+            comment_parts[sheet_path] = {
+                "rels": rels_path,
+                "comments": _free_part_name(members, "xl/comments{}.xml"),
+                "vml": _free_part_name(members, "xl/drawings/vmlDrawing{}.vml"),
+                "comments_rid": _free_rel_id(rel_ids),
+                "idmap": number,
+            }
+            comment_parts[sheet_path]["vml_rid"] = _free_rel_id(rel_ids)
+        if uncommented_cells:
+            logger.warning("%d cells with errors are highlighted without comment, their "
+                           "sheets already have comments", uncommented_cells)
+
+        sheet_rels = {parts["rels"]: parts for parts in comment_parts.values()}
+        for info in in_zip.infolist():
+            if info.filename in sheets:
+                vml_rid = comment_parts.get(info.filename, {}).get("vml_rid")
+                _rewrite_member(in_zip, out_zip, info, _SheetAnnotator,
+                                sheets[info.filename], xf_count, vml_rid)
+            elif info.filename == styles_path:
+                _rewrite_member(in_zip, out_zip, info, _StylesAnnotator, fill_id, xf_count)
+            elif info.filename == "[Content_Types].xml":
+                _rewrite_member(in_zip, out_zip, info, _ContentTypesAnnotator,
+                                comment_parts.values())
+            elif info.filename in sheet_rels:
+                _rewrite_member(in_zip, out_zip, info, _RelsAnnotator,
+                                sheet_rels.pop(info.filename))
+            else:
+                _copy_member(in_zip, out_zip, info)
+
+        for rels_path, parts in sheet_rels.items():
+            with out_zip.open(rels_path, "w") as out:
+                out.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n')
+                out.write(f'<Relationships xmlns="{PKG_REL_NS}">'.encode())
+                for rel_id, rel_type, target in _get_new_relationships(parts):
+                    out.write(f'<Relationship Id="{rel_id}" Type="{rel_type}" '
+                              f'Target="{target}"/>'.encode())
+                out.write(b"</Relationships>")
+        for sheet_path, parts in comment_parts.items():
+            _write_comments(out_zip, parts, sheets[sheet_path])
+
+    return annotated_cells
+
+
+def _group_errors_by_sheet(error_log, sheet_paths):
+    errors_by_sheet = {}
+    for record in error_log.iter_records(group_by_entity=False):
+        if record.row is None or record.sheet not in sheet_paths:
+            continue
+        errors_by_sheet.setdefault(record.sheet, []).append(record)
+    return errors_by_sheet
+
+
+def _locate_errors(errors, header_columns):
+    cells = {}
+    for record in errors:
+        column = header_columns.get(record.field, 1)
+        messages = cells.setdefault((record.row, column), [])
+        messages.append(f"{record.code}: {record.message}")
+    return cells
+
+
+def _local_name(name):
+    return name.rpartition(":")[2]
+
+
+def _split_reference(reference):
+    match = _CELL_REFERENCE.match(reference)
+    if match is None:
+        raise ValueError(f"Invalid cell reference {reference}")
+    return int(match.group(2)), column_index_from_string(match.group(1))
+
+
+def _get_sheet_paths(in_zip):
+    rel_targets = {}
+    with in_zip.open("xl/_rels/workbook.xml.rels") as fhand:
+        for _, element in iterparse(fhand):
+            if element.tag == f"{{{PKG_REL_NS}}}Relationship":
+                rel_targets[element.get("Id")] = element.get("Target")
+
+    sheet_paths = {}
+    with in_zip.open("xl/workbook.xml") as fhand:
+        for _, element in iterparse(fhand):
+            if element.tag == f"{{{MAIN_NS}}}sheet":
+                target = rel_targets[element.get(f"{{{REL_NS}}}id")]
+                sheet_paths[element.get("name")] = _resolve_target("xl/workbook.xml", target)
+    return sheet_paths
+
+
+def _resolve_target(source_path, target):
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_path), target))
+
+
+def _get_rels_path(part_path):
+    directory, name = posixpath.split(part_path)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _get_sheet_path_from_rels(rels_path):
+    directory, name = posixpath.split(rels_path)
+    return posixpath.join(posixpath.dirname(directory), name[:-len(".rels")])
+
+
+def _get_styles_path(in_zip):
+    with in_zip.open("xl/_rels/workbook.xml.rels") as fhand:
+        for _, element in iterparse(fhand):
+            if element.get("Type") == f"{REL_NS}/styles":
+                return _resolve_target("xl/workbook.xml", element.get("Target"))
+    raise ValueError("The excel file has no styles part")
+
+
+def _get_header_columns(in_zip, sheet_paths, sheet_names):
+    """Map the column names of the first row of each sheet to column indexes"""
+    headers = {}
+    needed_strings = set()
+    for sheet_name in sheet_names:
+        header = {}
+        with in_zip.open(sheet_paths[sheet_name]) as fhand:
+            column = 0
+            for _, element in iterparse(fhand):
+                if element.tag == f"{{{MAIN_NS}}}c":
+                    if element.get("r") is None:
+                        column += 1
+                    else:
+                        column = _split_reference(element.get("r"))[1]
+                    cell_type = element.get("t", "n")
+                    value = element.find(f"{{{MAIN_NS}}}v")
+                    if cell_type == "inlineStr":
+                        header[column] = "".join(element.itertext())
+                    elif value is not None and cell_type == "s":
+                        header[column] = int(value.text)
+                        needed_strings.add(int(value.text))
+                    elif value is not None:
+                        header[column] = value.text
+                elif element.tag == f"{{{MAIN_NS}}}row":
+                    break
+        headers[sheet_name] = header
+
+    shared_strings = _read_shared_strings(in_zip, needed_strings)
+    header_columns = {}
+    for sheet_name, header in headers.items():
+        columns = {}
+        for column, value in header.items():
+            if isinstance(value, int):
+                value = shared_strings.get(value)
+            if value is not None:
+                columns.setdefault(value.strip(), column)
+        header_columns[sheet_name] = columns
+    return header_columns
+
+
+def _read_shared_strings(in_zip, indexes):
+    strings = {}
+    if not indexes or "xl/sharedStrings.xml" not in in_zip.namelist():
+        return strings
+    last_index = max(indexes)
+    with in_zip.open("xl/sharedStrings.xml") as fhand:
+        index = 0
+        for _, element in iterparse(fhand):
+            if element.tag != f"{{{MAIN_NS}}}si":
+                continue
+            if index in indexes:
+                # phonetic runs are not part of the value
+                phonetic_texts = {text for phonetic in element.iter(f"{{{MAIN_NS}}}rPh")
+                                  for text in phonetic.iter(f"{{{MAIN_NS}}}t")}
+                strings[index] = "".join(text.text or "" for text in element.iter(f"{{{MAIN_NS}}}t")
+                                         if text not in phonetic_texts)
+            if index == last_index:
+                break
+            index += 1
+            element.clear()
+    return strings
+
+
+def _count_styles(in_zip, styles_path):
+    fills = xfs = None
+    with in_zip.open(styles_path) as fhand:
+        for _, element in iterparse(fhand):
+            if element.tag == f"{{{MAIN_NS}}}fills":
+                fills = len(element)
+            elif element.tag == f"{{{MAIN_NS}}}cellXfs":
+                xfs = len(element)
+    if fills is None or xfs is None:
+        raise ValueError("The styles of the excel file have no fills or cell formats")
+    return fills, xfs
+
+
+def _read_rels(in_zip, rels_path):
+    rel_types, rel_ids = set(), set()
+    if rels_path not in in_zip.namelist():
+        return rel_types, rel_ids
+    with in_zip.open(rels_path) as fhand:
+        for _, element in iterparse(fhand):
+            if element.tag == f"{{{PKG_REL_NS}}}Relationship":
+                rel_types.add(element.get("Type"))
+                rel_ids.add(element.get("Id"))
+    return rel_types, rel_ids
+
+
+def _free_rel_id(rel_ids):
+    numbers = [int(match.group(1)) for match in map(_RID_NUMBER.match, rel_ids) if match]
+    rel_id = f"rId{max(numbers, default=0) + 1}"
+    rel_ids.add(rel_id)
+    return rel_id
+
+
+def _free_part_name(members, template):
+    number = 1
+    while template.format(number) in members:
+        number += 1
+    name = template.format(number)
+    members.add(name)
+    return name
+
+
+def _copy_member(in_zip, out_zip, info):
+    # a copy of the info, writing resets the sizes that are needed to read
+    out_info = copy.copy(info)
+    with in_zip.open(info) as in_member, \
+            out_zip.open(out_info, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as out_member:
+        shutil.copyfileobj(in_member, out_member)
+
+
+def _rewrite_member(in_zip, out_zip, info, handler_class, *handler_args):
+    out_info = copy.copy(info)
+    out_info.compress_type = zipfile.ZIP_DEFLATED
+    # the rewritten part grows, leave room for it
+    force_zip64 = info.file_size > zipfile.ZIP64_LIMIT // 2
+    with in_zip.open(info) as in_member, \
+            out_zip.open(out_info, "w", force_zip64=force_zip64) as out_member:
+        parser = make_parser()
+        parser.setContentHandler(handler_class(out_member, *handler_args))
+        parser.parse(in_member)
+
+
+def _get_new_relationships(parts):
+    sheet_dir = posixpath.dirname(_get_sheet_path_from_rels(parts["rels"]))
+    return [(parts["comments_rid"], COMMENTS_REL_TYPE, posixpath.relpath(parts["comments"], sheet_dir)),
+            (parts["vml_rid"], VML_REL_TYPE, posixpath.relpath(parts["vml"], sheet_dir))]
+
+
+def _write_comments(out_zip, parts, cells):
+    with out_zip.open(parts["comments"], "w") as out:
+        out.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n')
+        out.write(f'<comments xmlns="{MAIN_NS}"><authors><author>{escape(COMMENT_AUTHOR)}'
+                  '</author></authors><commentList>'.encode())
+        for (row, column), messages in cells.items():
+            reference = f"{get_column_letter(column)}{row}"
+            text = escape("\n".join(messages))
+            out.write(f'<comment ref="{reference}" authorId="0"><text>'
+                      f'<t xml:space="preserve">{text}</t></text></comment>'.encode())
+        out.write(b"</commentList></comments>")
+
+    with out_zip.open(parts["vml"], "w") as out:
+        out.write(_VML_HEADER.format(idmap=parts["idmap"]).encode())
+        for index, (row, column) in enumerate(cells, start=1):
+            out.write(_VML_SHAPE.format(shape_id=parts["idmap"] * 1024 + index, z_index=index,
+                                        row=row - 1, column=column - 1).encode())
+        out.write(b"</xml>")
+
+
+class _XMLRewriter(ContentHandler):
+    """Writes back every SAX event it receives, subclasses change some of them"""
+
+    def __init__(self, out):
+        super().__init__()
+        self._out = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+        self._depth = 0
+
+    def startDocument(self):
+        self._out.startDocument()
+
+    def endDocument(self):
+        self._out.endDocument()
+
+    def startElement(self, name, attrs):
+        self._depth += 1
+        self._out.startElement(name, attrs)
+
+    def endElement(self, name):
+        self._depth -= 1
+        self._out.endElement(name)
+
+    def characters(self, content):
+        self._out.characters(content)
+
+    def ignorableWhitespace(self, content):
+        self._out.ignorableWhitespace(content)
+
+    def processingInstruction(self, target, data):
+        self._out.processingInstruction(target, data)
+
+    def _write_element(self, name, attrs):
+        self._out.startElement(name, attrs)
+        self._out.endElement(name)
+
+
+class _SheetAnnotator(_XMLRewriter):
+    """Highlights the cells with errors, creating the missing ones, and links
+    the sheet with its comments"""
+
+    def __init__(self, out, cells, xf_count, vml_rid=None):
+        super().__init__(out)
+        self._xf_count = xf_count
+        self._vml_rid = vml_rid
+        self._prefix = ""
+        self._rels_prefix = None
+        self._pending_rows = {}
+        for row, column in cells:
+            self._pending_rows.setdefault(row, set()).add(column)
+        self._row = 0
+        self._row_columns = []
+        self._column = 0
+
+    def startElement(self, name, attrs):
+        local_name = _local_name(name)
+        if self._depth == 0:
+            self._prefix = name[:-len(local_name)]
+            for attr_name, value in attrs.items():
+                if value == REL_NS and attr_name.startswith("xmlns:"):
+                    self._rels_prefix = attr_name[len("xmlns:"):]
+        elif self._depth == 1 and local_name in _AFTER_LEGACY_DRAWING:
+            self._write_legacy_drawing()
+
+        if local_name == "row" and self._depth == 2:
+            row = int(attrs["r"]) if "r" in attrs else self._row + 1
+            self._write_rows_before(row)
+            self._row = row
+            self._column = 0
+            self._row_columns = sorted(self._pending_rows.pop(self._row, ()))
+            if self._row_columns and "spans" in attrs:
+                attrs = {key: value for key, value in attrs.items() if key != "spans"}
+        elif local_name == "c" and self._depth == 3:
+            if "r" in attrs:
+                self._column = _split_reference(attrs["r"])[1]
+            else:
+                self._column += 1
+            self._write_cells_before(self._column)
+            if self._row_columns and self._row_columns[0] == self._column:
+                self._row_columns.pop(0)
+                attrs = dict(attrs.items())
+                attrs["s"] = str(self._xf_count + int(attrs.get("s", 0)))
+        super().startElement(name, attrs)
+
+    def endElement(self, name):
+        local_name = _local_name(name)
+        if local_name == "row" and self._depth == 3:
+            self._write_cells_before(None)
+        elif local_name == "sheetData" and self._depth == 2:
+            self._write_rows_before(None)
+        elif local_name == "worksheet" and self._depth == 1:
+            self._write_legacy_drawing()
+        super().endElement(name)
+
+    def _write_cells_before(self, column):
+        while self._row_columns and (column is None or self._row_columns[0] < column):
+            reference = f"{get_column_letter(self._row_columns.pop(0))}{self._row}"
+            self._write_element(f"{self._prefix}c", {"r": reference, "s": str(self._xf_count)})
+
+    def _write_rows_before(self, row):
+        for pending_row in sorted(self._pending_rows):
+            if row is not None and pending_row >= row:
+                break
+            self._row = pending_row
+            self._row_columns = sorted(self._pending_rows.pop(pending_row))
+            self._out.startElement(f"{self._prefix}row", {"r": str(pending_row)})
+            self._write_cells_before(None)
+            self._out.endElement(f"{self._prefix}row")
+
+    def _write_legacy_drawing(self):
+        if self._vml_rid is None:
+            return
+        if self._rels_prefix is None:
+            attrs = {"xmlns:r": REL_NS, "r:id": self._vml_rid}
+        else:
+            attrs = {f"{self._rels_prefix}:id": self._vml_rid}
+        self._write_element(f"{self._prefix}legacyDrawing", attrs)
+        self._vml_rid = None
+
+
+class _StylesAnnotator(_XMLRewriter):
+    """Adds the error fill, and a copy of every cell format using it.
+
+    The highlighted version of the cell format n is xf_count + n.
+    """
+
+    def __init__(self, out, fill_id, xf_count):
+        super().__init__(out)
+        self._fill_id = fill_id
+        self._xf_count = xf_count
+        self._xf_events = None
+
+    def startElement(self, name, attrs):
+        local_name = _local_name(name)
+        if local_name == "fills":
+            attrs = dict(attrs.items(), count=str(self._fill_id + 1))
+        elif local_name == "cellXfs":
+            attrs = dict(attrs.items(), count=str(self._xf_count * 2))
+            self._xf_events = []
+        elif self._xf_events is not None:
+            if local_name == "xf" and self._depth == 2:
+                self._xf_events.append(("start", name, dict(attrs.items(), fillId=str(self._fill_id),
+                                                           applyFill="1")))
+            else:
+                self._xf_events.append(("start", name, dict(attrs.items())))
+        super().startElement(name, attrs)
+
+    def endElement(self, name):
+        local_name = _local_name(name)
+        prefix = name[:-len(local_name)]
+        if local_name == "fills":
+            self._out.startElement(f"{prefix}fill", {})
+            self._out.startElement(f"{prefix}patternFill", {"patternType": "solid"})
+            self._write_element(f"{prefix}fgColor", {"rgb": ERROR_FILL_COLOR})
+            self._write_element(f"{prefix}bgColor", {"indexed": "64"})
+            self._out.endElement(f"{prefix}patternFill")
+            self._out.endElement(f"{prefix}fill")
+        elif local_name == "cellXfs":
+            for event, event_name, *attrs in self._xf_events:
+                if event == "start":
+                    self._out.startElement(event_name, attrs[0])
+                else:
+                    self._out.endElement(event_name)
+            self._xf_events = None
+        elif self._xf_events is not None:
+            self._xf_events.append(("end", name))
+        super().endElement(name)
+
+
+class _ContentTypesAnnotator(_XMLRewriter):
+    def __init__(self, out, comment_parts):
+        super().__init__(out)
+        self._comment_parts = list(comment_parts)
+        self._has_vml_default = False
+
+    def startElement(self, name, attrs):
+        if _local_name(name) == "Default" and attrs.get("Extension", "").lower() == "vml":
+            self._has_vml_default = True
+        super().startElement(name, attrs)
+
+    def endElement(self, name):
+        if _local_name(name) == "Types":
+            prefix = name[:-len("Types")]
+            if self._comment_parts and not self._has_vml_default:
+                self._write_element(f"{prefix}Default", {"Extension": "vml",
+                                                         "ContentType": VML_CONTENT_TYPE})
+            for parts in self._comment_parts:
+                self._write_element(f"{prefix}Override", {"PartName": f"/{parts['comments']}",
+                                                          "ContentType": COMMENTS_CONTENT_TYPE})
+        super().endElement(name)
+
+
+class _RelsAnnotator(_XMLRewriter):
+    def __init__(self, out, parts):
+        super().__init__(out)
+        self._parts = parts
+
+    def endElement(self, name):
+        if _local_name(name) == "Relationships":
+            prefix = name[:-len("Relationships")]
+            for rel_id, rel_type, target in _get_new_relationships(self._parts):
+                self._write_element(f"{prefix}Relationship",
+                                    {"Id": rel_id, "Type": rel_type, "Target": target})
+        super().endElement(name)
@@ -7,7 +7,8 @@ from calendar import monthrange
 
 from openpyxl import load_workbook
 
-from mirri.io.parsers.excel import workbook_sheet_reader, get_all_cell_data_from_sheet
+from mirri.io.parsers.excel import (workbook_sheet_reader, workbook_sheet_row_reader,
+                                    get_all_cell_data_from_sheet)
 from mirri.validation.error_logging import ErrorLog, Error
 from mirri.validation.tags import (CHOICES, COLUMNS, COORDINATES, CROSSREF, CROSSREF_NAME, DATE,
                                    ERROR_CODE, FIELD, MANDATORY, MATCH,
@@ -45,9 +46,8 @@ def validate_excel(fhand, configuration):
     structure_errors = list(validate_excel_structure(workbook, validation_conf))
     if structure_errors:
         for error in structure_errors:
-            error = Error(error[ERROR_CODE], pk=error['id'],
-                          data=error['value'])
-            error_log.add_error(error)
+            error_log.add(error[ERROR_CODE], pk=error['id'], data=error['value'],
+                          sheet=error['sheet'], field=error['field'])
 
         return error_log
 
@@ -59,9 +59,9 @@ def validate_excel(fhand, configuration):
     for error in content_errors:
         # if error[ERROR_CODE] == 'STD43':
         #     continue
-        error = Error(error[ERROR_CODE], pk=error['id'], data=error['value'])
-
-        error_log.add_error(error)
+        error_log.add(error[ERROR_CODE], pk=error['id'], data=error['value'],
+                      sheet=error['sheet'], field=error['field'],
+                      row=error['row'])
     return error_log
 
 
@@ -141,13 +141,13 @@ def validate_content(workbook, validation_conf, crossrefs, in_memory_sheets):
         sheet_id_column = sheet_conf['id_field']
         shown_values = {}
         row_validation_steps = sheet_conf.get(ROW_VALIDATION, None)
-        for row in workbook_sheet_reader(workbook, sheet_name):
+        for row_number, row in workbook_sheet_row_reader(workbook, sheet_name):
             id_ = row.get(sheet_id_column, None)
             if id_ is None:
                 error_code = _get_missing_row_id_error(sheet_id_column,
                                                        sheet_conf)
                 yield {'id': id_, 'sheet': sheet_name,
-                       'field': sheet_id_column,
+                       'field': sheet_id_column, 'row': row_number,
                        'error_code': error_code, 'value': None}
                 continue
             do_have_cell_error = False
@@ -161,14 +161,16 @@ def validate_content(workbook, validation_conf, crossrefs, in_memory_sheets):
                     if error_code is not None:
                         do_have_cell_error = True
                         yield {'id': id_, 'sheet': sheet_name, 'field': label,
-                               'error_code': error_code, 'value': value}
+                               'row': row_number, 'error_code': error_code,
+                               'value': value}
 
             if not do_have_cell_error and row_validation_steps:
                 error_code = validate_row(
                     row, row_validation_steps, in_memory_sheets)
                 if error_code is not None:
                     yield {'id': id_, 'sheet': sheet_name, 'field': 'row',
-                           'error_code': error_code, 'value': 'row'}
+                           'row': row_number, 'error_code': error_code,
+                           'value': 'row'}
 
 
 def _get_missing_row_id_error(sheet_id_column, sheet_conf):
@@ -422,7 +424,6 @@ def _is_valid_taxon(value):
             for index in range(0, len(items[2:]), 2):
                 rank = SUBTAXAS.get(items[index + 2], None)
                 if rank is None:
-                    print(value)
                     return False
 
     return True
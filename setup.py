@@ -24,6 +24,7 @@ setuptools.setup(
     #              "mirri.io.writers": "mirri.io.writers",
     #              'mirri.validation': 'mirri.vallidation'},
     install_requires=requirements,
+    extras_require={"msgpack": ["msgpack"]},
     scripts=scripts,
     license="GNU General Public License v3.0",
     classifiers=[
@@ -0,0 +1,190 @@
+"""
+Local stand-in for the Biolomics web services.
+
+It answers the requests of BiolomicsClient with canned records, keeps the
+connections alive, as the real server does, and counts the connections and
+the requests, so the tests and the benchmarks can see how the client uses
+them. Failures and slow answers can be asked for. The requests with an
+expired or unknown access token are answered with a 401.
+
+The token is fetched over plain HTTP, so OAUTHLIB_INSECURE_TRANSPORT has
+to be set while the client is used.
+
+    with FakeBiolomicsServer() as server:
+        client = BiolomicsClient(server.url, "v2", "id", "secret", "user", "pass")
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+ENDPOINTS = ["WS Strains", "WS Sequences", "WS Growth media", "WS Taxonomy",
+             "WS Locality", "WS Ontobiotope", "WS Bibliography"]
+# fields of the schemas, only the ones of the tests
+RESULT_FIELDS = {
+    "WS Growth media": ["Full description", "Ingredients", "Medium description",
+                        "Other name", "pH", "Sterilization conditions"],
+}
+TOKEN_PATH = "/connect/token"
+TOKEN_EXPIRES_IN = 3600
+
+
+class FakeBiolomicsServer():
+    def __init__(self, token_expires_in=TOKEN_EXPIRES_IN):
+        self.token_expires_in = token_expires_in
+        self.connections = 0
+        self.requests = 0
+        self.token_requests = 0
+        # most requests answered at the same time
+        self.max_in_flight = 0
+        self._in_flight = 0
+        # seconds to wait before every answer
+        self.delay = 0
+        self._failures = []
+        self._next_id = 1
+        # access tokens given and the monotonic time they expire at
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _build_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def fail_next(self, status, times=1, headers=None):
+        """
+        Answer the next requests, but the token ones, with an error.
+
+        With no status the connection is closed without an answer, after
+        the request is read.
+        """
+        with self._lock:
+            self._failures.extend([(status, headers or {})] * times)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def _answer(self, method, path, body, authorization=None):
+        """Status, headers and JSON content of the answer to a request"""
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            return self._get_answer(method, path, body, authorization)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _get_answer(self, method, path, body, authorization):
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            self.requests += 1
+            if path == TOKEN_PATH:
+                self.token_requests += 1
+                token = f"token-{self.token_requests}"
+                self._tokens[token] = time.monotonic() + self.token_expires_in
+                return 200, {}, {"access_token": token, "token_type": "Bearer",
+                                 "expires_in": self.token_expires_in}
+            token = (authorization or "").replace("Bearer ", "", 1)
+            if time.monotonic() >= self._tokens.get(token, 0):
+                return 401, {}, {"error": "invalid token"}
+            if self._failures:
+                status, headers = self._failures.pop(0)
+                return status, headers, {"error": "failure asked for"}
+
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts == ["schemas"]:
+            return 200, {}, [{"TableViews": [
+                {"TableViewName": endpoint,
+                 "ResultFields": [{"title": title, "FieldType": "E"}
+                                  for title in RESULT_FIELDS.get(endpoint, [])]}
+                for endpoint in ENDPOINTS]}]
+        if "search" in parts:
+            if parts[-1] == "findByName":
+                return 404, {}, {"error": "not found"}
+            return 200, {}, {"Records": [], "TotalCount": 0}
+        if "data" not in parts:
+            return 404, {}, {"error": "not found"}
+        if method == "POST":
+            with self._lock:
+                record_id = self._next_id
+                self._next_id += 1
+            return 200, {}, dict(body, RecordId=record_id)
+        if method == "DELETE":
+            return 200, {}, {}
+        record_id = int(parts[-1])
+        if method == "PUT":
+            return 200, {}, dict(body, RecordId=record_id)
+        return 200, {}, {"RecordId": record_id, "RecordName": f"record {record_id}",
+                         "RecordDetails": {}}
+
+
+def _build_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        # keep-alive
+        protocol_version = "HTTP/1.1"
+        # every answer in a single send, flushed by handle_one_request. The
+        # default unbuffered writes meet the delayed ACKs of the client.
+        wbufsize = -1
+
+        def setup(self):
+            super().setup()
+            server._count_connection()
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if self.headers.get("Content-Type", "").startswith("application/json") and body:
+                body = json.loads(body)
+            else:
+                body = {}
+            status, headers, content = server._answer(self.command,
+                                                      urlparse(self.path).path, body,
+                                                      self.headers.get("Authorization"))
+            if status is None:
+                self.close_connection = True
+                return
+            content = json.dumps(content).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def finish(self):
+            try:
+                super().finish()
+            except (BrokenPipeError, ConnectionResetError):
+                # the client gave up waiting, e.g. in the timeout tests
+                pass
+
+        do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from mirri.biolomics.remote.async_client import AsyncBiolomicsMirriClient
+from mirri.biolomics.remote.endoint_names import GROWTH_MEDIUM_WS
+from mirri.entities.growth_medium import GrowthMedium
+
+from .fake_server import FakeBiolomicsServer
+
+VERSION = "v2"
+
+
+class AsyncBiolomicsMirriClientTest(unittest.TestCase):
+    def setUp(self):
+        # the token is fetched from the fake server over http
+        environ = patch.dict(os.environ, {"OAUTHLIB_INSECURE_TRANSPORT": "1"})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.server = FakeBiolomicsServer().start()
+        self.addCleanup(self.server.stop)
+
+    def run_with_client(self, get_result, concurrency=4):
+        async def run():
+            client = await AsyncBiolomicsMirriClient.connect(
+                self.server.url, VERSION, "client_id", "secret", "user", "password",
+                concurrency=concurrency)
+            async with client:
+                return await get_result(client)
+        return asyncio.run(run())
+
+    def test_bounded_concurrency(self):
+        async def retrieve(client):
+            self.server.delay = 0.1
+            return await asyncio.gather(*[client.retrieve_by_id(GROWTH_MEDIUM_WS, record_id)
+                                          for record_id in range(1, 17)])
+
+        start = time.perf_counter()
+        media = self.run_with_client(retrieve, concurrency=4)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([medium.record_id for medium in media], list(range(1, 17)))
+        self.assertEqual(self.server.max_in_flight, 4)
+        # 4 rounds of 4 requests, not 16 one after the other
+        self.assertLess(elapsed, 1.2)
+        # one for the token and one per request in flight
+        self.assertLessEqual(self.server.connections, 5)
+
+    def test_operations(self):
+        async def operate(client):
+            medium = GrowthMedium()
+            medium.acronym = "AAA"
+            medium.description = "a medium"
+            created = await client.create(GROWTH_MEDIUM_WS, medium)
+            created.full_description = "a full description"
+            updated = await client.update(GROWTH_MEDIUM_WS, created)
+            found = await client.retrieve_by_name(GROWTH_MEDIUM_WS, "a medium")
+            result = await client.search(GROWTH_MEDIUM_WS, {"Query": []})
+            await client.delete_by_id(GROWTH_MEDIUM_WS, created.record_id)
+            return created, updated, found, result
+
+        created, updated, found, result = self.run_with_client(operate)
+        self.assertEqual(created.record_id, 1)
+        self.assertEqual(created.description, "a medium")
+        self.assertEqual(updated.full_description, "a full description")
+        self.assertIsNone(found)
+        self.assertEqual(result, {"total": 0, "records": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
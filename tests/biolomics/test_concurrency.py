@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from mirri.biolomics.remote.concurrency import AIMDController, run_adaptive
+from mirri.biolomics.remote.rest_client import BiolomicsClient
+from mirri.biolomics.remote.retry import RetryPolicy
+
+from .fake_server import FakeBiolomicsServer
+
+
+def observe(controller, latency, status=200, times=None):
+    for _ in range(times or controller.window):
+        controller.observe("WS Strains", "GET", latency, status)
+
+
+class AIMDControllerTest(unittest.TestCase):
+    def test_additive_increase(self):
+        controller = AIMDController(min_limit=2, max_limit=4, window=10)
+        # the limit is not raised if it was not reached
+        observe(controller, 0.1)
+        self.assertEqual(controller.limit, 2)
+        for limit in (3, 4, 4):
+            for _ in range(controller.limit):
+                controller.acquire()
+            observe(controller, 0.1)
+            for _ in range(controller.in_flight):
+                controller.release()
+            self.assertEqual(controller.limit, limit)
+
+    def test_multiplicative_decrease(self):
+        controller = AIMDController(min_limit=2, max_limit=32, initial_limit=32, window=10)
+        with self.assertLogs("mirri.biolomics.remote.concurrency", "INFO") as logs:
+            # a single throttled request
+            observe(controller, 0.1, times=9)
+            observe(controller, 0.1, status=429, times=1)
+            self.assertEqual(controller.limit, 16)
+            # errors over the threshold
+            observe(controller, 0.1, times=9)
+            observe(controller, 0.1, status=None, times=1)
+            self.assertEqual(controller.limit, 8)
+            # latency over the double of the lowest median
+            observe(controller, 0.1, times=8)
+            observe(controller, 0.5, times=2)
+            self.assertEqual(controller.limit, 4)
+            observe(controller, 0.1, status=503)
+            observe(controller, 0.1, status=503)
+            self.assertEqual(controller.limit, 2)
+        self.assertEqual(len(logs.output), 4)
+        self.assertIn("Requests in flight 32 -> 16: 1 of 10 requests throttled",
+                      logs.output[0])
+
+    def test_latency_target(self):
+        controller = AIMDController(initial_limit=8, window=10, latency_target=0.2)
+        observe(controller, 0.15)
+        self.assertEqual(controller.limit, 8)
+        observe(controller, 0.25)
+        self.assertEqual(controller.limit, 4)
+
+    def test_limit_holds_the_callers(self):
+        controller = AIMDController(min_limit=1, max_limit=3, initial_limit=3)
+        in_flight = []
+        lock = threading.Lock()
+
+        def work(item):
+            with lock:
+                in_flight.append(controller.in_flight)
+            time.sleep(0.01)
+            return item * 2
+
+        results = dict(run_adaptive(controller, work, range(20)))
+        self.assertEqual(results, {item: item * 2 for item in range(20)})
+        self.assertEqual(max(in_flight), 3)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_errors_stop_the_run(self):
+        controller = AIMDController(max_limit=2)
+        done = []
+
+        def work(item):
+            if item == 3:
+                raise RuntimeError("failed")
+            done.append(item)
+
+        with self.assertRaises(RuntimeError):
+            list(run_adaptive(controller, work, range(100)))
+        self.assertLess(len(done), 10)
+
+
+class AdaptiveClientTest(unittest.TestCase):
+    def setUp(self):
+        # the token is fetched from the fake server over http
+        environ = patch.dict(os.environ, {"OAUTHLIB_INSECURE_TRANSPORT": "1"})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.server = FakeBiolomicsServer().start()
+        self.addCleanup(self.server.stop)
+
+    def test_follow_the_server(self):
+        client = BiolomicsClient(self.server.url, "v2", "client_id", "secret", "user",
+                                 "password", pool_size=8,
+                                 retry_policy=RetryPolicy(max_retries=30,
+                                                          backoff_factor=0.001))
+        self.addCleanup(client.close)
+        controller = AIMDController(max_limit=8, window=10)
+        client.add_listener(controller.observe)
+        self.server.delay = 0.02
+
+        def retrieve(record_id):
+            return client.retrieve("WS Strains", record_id).status_code
+
+        list(run_adaptive(controller, retrieve, range(200)))
+        self.assertGreater(controller.limit, 4)
+        self.assertGreater(self.server.max_in_flight, 4)
+
+        # the retries of the throttled requests are observed too
+        self.server.fail_next(429, times=30)
+        limit = controller.limit
+        with self.assertLogs("mirri.biolomics.remote.concurrency", "INFO") as logs:
+            statuses = [status for _, status in run_adaptive(controller, retrieve,
+                                                             range(30))]
+        self.assertEqual(set(statuses), {200})
+        self.assertIn(f"Requests in flight {limit} -> {limit // 2}", logs.output[0])
+        self.assertIn("requests throttled", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
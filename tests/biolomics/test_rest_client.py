@@ -0,0 +1,120 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from mirri.biolomics.remote.rest_client import BiolomicsClient
+from mirri.biolomics.remote.retry import RetryPolicy
+
+from .fake_server import FakeBiolomicsServer
+
+VERSION = "v2"
+
+
+class BiolomicsClientSessionTest(unittest.TestCase):
+    def setUp(self):
+        # the token is fetched from the fake server over http
+        environ = patch.dict(os.environ, {"OAUTHLIB_INSECURE_TRANSPORT": "1"})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.server = FakeBiolomicsServer().start()
+        self.addCleanup(self.server.stop)
+
+    def get_client(self, **kwargs):
+        return BiolomicsClient(self.server.url, VERSION, "client_id", "secret",
+                               "user", "password", **kwargs)
+
+    def test_connections_are_reused(self):
+        with self.get_client() as client:
+            for record_id in range(1, 11):
+                response = client.retrieve("WS Strains", record_id)
+                self.assertEqual(response.json()["RecordId"], record_id)
+            client.search("WS Strains", {"Query": []})
+            client.update("WS Strains", 3, {"RecordDetails": {}, "RecordName": "a",
+                                            "RecordId": 3})
+            self.assertEqual(client.find_by_name("WS Strains", "a").status_code, 404)
+            client.delete("WS Strains", 3)
+
+        # one for the token and one for the rest
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.server.requests, 16)
+
+    def test_retries(self):
+        retry_policy = RetryPolicy(max_retries=2, backoff_factor=0.01)
+        with self.get_client(retry_policy=retry_policy) as client:
+            self.server.fail_next(503, times=2)
+            self.assertEqual(client.retrieve("WS Strains", 1).status_code, 200)
+            # the last answer is returned when the retries are exhausted
+            self.server.fail_next(503, times=3)
+            self.assertEqual(client.retrieve("WS Strains", 1).status_code, 503)
+            self.assertEqual(client.get_counters()["retries"], 4)
+
+            # the searches are retried, even if they are posted
+            self.server.fail_next(None)
+            self.assertEqual(client.search("WS Strains", {}).status_code, 200)
+
+            # the creations only when the server did not do them
+            data = {"RecordDetails": {}, "RecordName": "a"}
+            self.server.fail_next(503)
+            self.assertEqual(client.create("WS Strains", data).status_code, 200)
+            self.server.fail_next(502)
+            self.assertEqual(client.create("WS Strains", data).status_code, 502)
+            self.server.fail_next(None)
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.create("WS Strains", data)
+            self.assertEqual(client.get_counters()["retries"], 6)
+
+    def test_retry_after(self):
+        with self.get_client() as client:
+            self.server.fail_next(429, headers={"Retry-After": "3"})
+            with patch("mirri.biolomics.remote.rest_client.time.sleep") as sleep:
+                self.assertEqual(client.retrieve("WS Strains", 1).status_code, 200)
+            sleep.assert_called_once_with(3.0)
+
+    def test_retry_after_the_token_expiry(self):
+        self.server.token_expires_in = 2
+        with self.get_client(token_skew=0) as client:
+            # the server holds the retry past the expiry of the token in use
+            self.server.fail_next(429, headers={"Retry-After": "2.5"})
+            self.assertEqual(client.retrieve("WS Strains", 1).status_code, 200)
+        self.assertEqual(self.server.token_requests, 2)
+
+    def test_rate_limit(self):
+        with self.get_client(rate_limit=20, burst=2) as client:
+            start = time.perf_counter()
+            for record_id in range(6):
+                client.retrieve("WS Strains", record_id)
+            # every endpoint has its own limit
+            client.retrieve("WS Sequences", 1)
+            elapsed = time.perf_counter() - start
+            counters = client.get_counters()
+        # 2 at once and 4 at 20 per second
+        self.assertGreaterEqual(elapsed, 0.19)
+        self.assertEqual(counters["throttle_waits"], 4)
+        self.assertGreater(counters["throttle_seconds"], 0.15)
+
+    def test_timeout(self):
+        retry_policy = RetryPolicy(max_retries=2, backoff_factor=0.01)
+        with self.get_client(timeout=0.1, retry_policy=retry_policy) as client:
+            self.server.delay = 0.5
+            # the reads that time out are retried
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                client.retrieve("WS Strains", 1)
+            self.assertEqual(client.get_counters()["retries"], 2)
+            # the creations are not, the server could have done them
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                client.create("WS Strains", {"RecordDetails": {}, "RecordName": "a"})
+            self.assertEqual(client.get_counters()["retries"], 2)
+
+    def test_close(self):
+        client = self.get_client()
+        with patch.object(client.session, "close") as close:
+            with client:
+                close.assert_not_called()
+            close.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
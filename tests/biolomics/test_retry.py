@@ -0,0 +1,75 @@
+import time
+import unittest
+from email.utils import formatdate
+from unittest.mock import Mock
+
+from requests.exceptions import (ChunkedEncodingError, ConnectionError, ConnectTimeout,
+                                 ReadTimeout)
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from mirri.biolomics.remote.retry import (RetryPolicy, TokenBucket, parse_retry_after,
+                                          was_sent)
+
+
+def get_response(status_code, headers=None):
+    return Mock(status_code=status_code, headers=headers or {})
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_statuses(self):
+        policy = RetryPolicy(max_retries=2, backoff_factor=1)
+        for status in (429, 502, 503, 504):
+            self.assertIsNotNone(policy.get_wait(0, True, response=get_response(status)))
+        self.assertIsNone(policy.get_wait(0, True, response=get_response(500)))
+        self.assertIsNone(policy.get_wait(2, True, response=get_response(503)))
+        # the writes only when the server turned them down
+        self.assertIsNotNone(policy.get_wait(0, False, response=get_response(503)))
+        self.assertIsNone(policy.get_wait(0, False, response=get_response(502)))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=3)
+        for retry, longest in ((0, 1), (1, 2), (2, 3)):
+            wait = policy.get_wait(retry, True, response=get_response(503))
+            self.assertTrue(0 <= wait <= longest)
+        response = get_response(503, {"Retry-After": "120"})
+        self.assertEqual(policy.get_wait(0, True, response=response), 120)
+        # the server can not hold the retry for ever
+        policy = RetryPolicy(max_retry_after=60)
+        self.assertEqual(policy.get_wait(0, True, response=response), 60)
+
+    def test_errors(self):
+        policy = RetryPolicy()
+        refused = ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "no")))
+        reset = ConnectionError(ProtocolError("reset"))
+        self.assertFalse(was_sent(refused))
+        self.assertFalse(was_sent(ConnectTimeout()))
+        self.assertTrue(was_sent(reset))
+        self.assertIsNotNone(policy.get_wait(0, True, error=reset))
+        self.assertIsNone(policy.get_wait(0, False, error=reset))
+        self.assertIsNotNone(policy.get_wait(0, False, error=refused))
+        # the reads can be repeated, the writes could still be done by the server
+        self.assertIsNotNone(policy.get_wait(0, True, error=ReadTimeout()))
+        self.assertIsNotNone(policy.get_wait(0, True, error=ChunkedEncodingError()))
+        self.assertIsNone(policy.get_wait(0, False, error=ReadTimeout()))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30)), 30, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 30)), 0)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_rate(self):
+        bucket = TokenBucket(rate=50, burst=5)
+        start = time.perf_counter()
+        waits = [bucket.acquire() for _ in range(15)]
+        elapsed = time.perf_counter() - start
+        self.assertEqual(waits[:5], [0] * 5)
+        self.assertTrue(all(waits[5:]))
+        self.assertAlmostEqual(elapsed, 10 / 50, delta=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
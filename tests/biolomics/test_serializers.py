@@ -1,6 +1,5 @@
 import unittest
 import pycountry
-import deepdiff
 from pprint import pprint
 from mirri.biolomics.serializers.sequence import (
     GenomicSequenceBiolomics,
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from oauthlib.oauth2.rfc6749.errors import OAuth2Error
+
+from mirri.biolomics.remote.token_manager import TokenManager
+
+from .fake_server import TOKEN_PATH, FakeBiolomicsServer
+
+
+class TokenManagerTest(unittest.TestCase):
+    def setUp(self):
+        # the token is fetched from the fake server over http
+        environ = patch.dict(os.environ, {"OAUTHLIB_INSECURE_TRANSPORT": "1"})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.server = FakeBiolomicsServer(token_expires_in=600).start()
+        self.addCleanup(self.server.stop)
+
+    def get_manager(self, token_path=TOKEN_PATH, **kwargs):
+        manager = TokenManager(self.server.url + token_path, "client_id", "secret",
+                               "user", "password", **kwargs)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_refresh_ahead_of_expiry(self):
+        manager = self.get_manager(skew=100)
+        now = [1000]
+        with patch("mirri.biolomics.remote.token_manager.time.monotonic",
+                   lambda: now[0]):
+            self.assertEqual(manager.get_access_token(), "token-1")
+            now[0] += 499
+            self.assertEqual(manager.get_access_token(), "token-1")
+            # 100 seconds before the expiry
+            now[0] += 1
+            self.assertEqual(manager.get_access_token(), "token-2")
+
+        # the skew is at most half of the life of the token
+        manager = self.get_manager(skew=1000)
+        with patch("mirri.biolomics.remote.token_manager.time.monotonic",
+                   lambda: now[0]):
+            self.assertEqual(manager.get_access_token(), "token-3")
+            now[0] += 299
+            self.assertEqual(manager.get_access_token(), "token-3")
+            now[0] += 1
+            self.assertEqual(manager.get_access_token(), "token-4")
+        # the session, and its connection, is kept
+        self.assertEqual(self.server.connections, 2)
+
+    def test_single_flight_threads(self):
+        manager = self.get_manager()
+        self.server.delay = 0.2
+        with ThreadPoolExecutor(8) as executor:
+            tokens = list(executor.map(lambda _: manager.get_access_token(), range(8)))
+        self.assertEqual(tokens, ["token-1"] * 8)
+        self.assertEqual(self.server.token_requests, 1)
+
+    def test_single_flight_asyncio(self):
+        manager = self.get_manager()
+        self.server.delay = 0.2
+
+        async def get_tokens():
+            loop = asyncio.get_running_loop()
+            # the threads and the coroutines share the fetch
+            in_thread = loop.run_in_executor(None, manager.get_access_token)
+            tokens = await asyncio.gather(
+                *[manager.get_access_token_async() for _ in range(8)])
+            return list(tokens) + [await in_thread]
+
+        self.assertEqual(asyncio.run(get_tokens()), ["token-1"] * 9)
+        self.assertEqual(self.server.token_requests, 1)
+
+    def test_errors_reach_every_caller(self):
+        manager = self.get_manager(token_path="/bad/token")
+        self.server.delay = 0.2
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(manager.get_access_token) for _ in range(4)]
+            for future in futures:
+                with self.assertRaises(OAuth2Error):
+                    future.result()
+        # a new caller tries again
+        self.server.delay = 0
+        requests = self.server.requests
+        with self.assertRaises(OAuth2Error):
+            manager.get_access_token()
+        self.assertEqual(self.server.requests, requests + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from io import BytesIO
+from pathlib import Path
+
+from mirri.biolomics.serializers.sequence import GenomicSequenceBiolomics
+from mirri.entities.publication import Publication
+from mirri.entities.sequence import NucleotideSequence
+from mirri.entities.strain import OrganismType, Strain, StrainMirri
+from mirri.io import codec
+from mirri.io.codec import decode, dump_catalog, encode, load_catalog
+from mirri.io.parsers.mirri_excel import parse_mirri_excel
+from mirri.settings import ISOLATION, PUBLICATIONS, SUBSTRATE_HOST_OF_ISOLATION
+
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+def _without_dict_gaps(data):
+    # dict() leaves out the isolation substrate and the publication attributes
+    data = dict(data)
+    if ISOLATION in data:
+        data[ISOLATION] = {key: value for key, value in data[ISOLATION].items()
+                           if key != SUBSTRATE_HOST_OF_ISOLATION}
+        if not data[ISOLATION]:
+            del data[ISOLATION]
+    if PUBLICATIONS in data:
+        data[PUBLICATIONS] = [{key: value for key, value in pub.items()
+                               if key != codec.PUBLICATION_ATTRIBUTES_KEY}
+                              for pub in data[PUBLICATIONS]]
+    return data
+
+
+class CodecTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        with in_path.open("rb") as fhand:
+            parsed_data = parse_mirri_excel(fhand, version="20200601")
+        cls.strains = list(parsed_data["strains"])
+        cls.growth_media = list(parsed_data["growth_media"])
+
+    def test_encode_decode(self):
+        for strain in self.strains:
+            encoded = encode(strain)
+            self.assertEqual(_without_dict_gaps(encoded), strain.dict())
+            decoded = decode(encoded, StrainMirri)
+            self.assertIsInstance(decoded, StrainMirri)
+            self.assertEqual(encode(decoded), encoded)
+
+        strain = decode(encode(self.strains[0]), StrainMirri)
+        self.assertEqual(strain.collect.date.strfdate, "19211212")
+        self.assertIsInstance(strain.genetics.markers[0], GenomicSequenceBiolomics)
+        self.assertIsInstance(strain.taxonomy.organism_type[0], OrganismType)
+        self.assertEqual(strain.publications[0].full_reference, "Cosa")
+
+        # the marker sequences are encoded as str and decoded packed
+        strain.genetics.markers[0].marker_seq = "ACGTNacgt"
+        encoded = encode(strain)
+        self.assertEqual(encoded["genetics"]["Markers"][0]["marker_seq"], "ACGTNacgt")
+        marker = decode(encoded, StrainMirri).genetics.markers[0]
+        self.assertIsInstance(marker.packed_marker_seq, NucleotideSequence)
+        self.assertEqual(marker.marker_seq, "ACGTNacgt")
+
+    def test_decode_empty(self):
+        strain = decode({}, Strain)
+        self.assertEqual(strain.dict(), Strain().dict())
+        self.assertIsNone(strain.is_subject_to_quarantine)
+        strain.collect.location.country = "ESP"
+        self.assertEqual(encode(strain), {"collect": {"location": {"countryOfOriginCode": "ESP"}}})
+
+        try:
+            encode(object())
+            self.fail()
+        except ValueError:
+            pass
+
+    def _check_catalog(self, format):
+        entities = self.strains + self.growth_media + [Publication({"id": 3})]
+        fhand = BytesIO()
+        self.assertEqual(dump_catalog(entities, fhand, format=format), len(entities))
+        fhand.seek(0)
+        loaded = list(load_catalog(fhand, format=format))
+        self.assertEqual([entity.__class__ for entity in loaded],
+                         [entity.__class__ for entity in entities])
+        self.assertEqual([entity.dict() for entity in loaded],
+                         [entity.dict() for entity in entities])
+
+    def test_json_catalog(self):
+        self._check_catalog(codec.JSON)
+        try:
+            list(load_catalog(BytesIO(b'{"a": 1}\n')))
+            self.fail()
+        except ValueError:
+            pass
+
+    @unittest.skipIf(codec.msgpack is None, "msgpack is not installed")
+    def test_msgpack_catalog(self):
+        self._check_catalog(codec.MSGPACK)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from copy import deepcopy
+from pathlib import Path
+
+from mirri.entities.diff import (ADDED, CHANGED, REMOVED, Change, compile_exclude,
+                                 diff_data, diff_entities, fingerprint)
+from mirri.entities.publication import Publication
+from mirri.io.parsers.mirri_excel import parse_mirri_excel
+
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+class DiffTests(unittest.TestCase):
+
+    def test_diff_data(self):
+        old = {"a": 1, "b": {"c": [1, 2, 3]}, "d": "x"}
+        self.assertEqual(diff_data(old, deepcopy(old)), [])
+
+        new = {"a": 1.0, "b": {"c": [3, 1, 2]}, "d": "x"}
+        self.assertEqual(diff_data(old, new), [])
+
+        new = {"a": 2, "b": {"c": [1, 2]}, "e": None}
+        self.assertEqual(diff_data(old, new),
+                         [Change(CHANGED, ("a",), 1, 2),
+                          Change(REMOVED, ("b", "c", 2), 3, None),
+                          Change(REMOVED, ("d",), "x", None),
+                          Change(ADDED, ("e",), None, None)])
+        self.assertEqual(diff_data([1], [1, 1]), [Change(ADDED, (1,), None, 1)])
+        self.assertEqual(diff_data({"a": True}, {"a": 1}),
+                         [Change(CHANGED, ("a",), True, 1)])
+        self.assertEqual(str(diff_data({"a": [1]}, {"a": [2]})[0]),
+                         "removed root['a'][0]: 1 -> None")
+
+    def test_list_of_dicts(self):
+        old = {"pubs": [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]}
+        new = {"pubs": [{"id": 7, "title": "b"}, {"id": 8, "title": "a"}]}
+        exclude = [("pubs", "*", "id")]
+        self.assertEqual(diff_data(old, new, exclude=exclude), [])
+        self.assertEqual(diff_data(old, new, exclude=compile_exclude(exclude)), [])
+        self.assertEqual(len(diff_data(old, new)), 4)
+
+        # an item edited in place is reported field by field
+        new = {"pubs": [{"id": 2, "title": "b"}, {"id": 1, "title": "c"}]}
+        self.assertEqual(diff_data(old, new, exclude=exclude),
+                         [Change(CHANGED, ("pubs", 1, "title"), "a", "c")])
+
+        self.assertEqual(fingerprint([{"a": [1, 2]}, 3]),
+                         fingerprint([3, {"a": [2, 1]}]))
+        self.assertEqual(diff_data({"a": [1]}, {"a": [2]}, exclude=[("a", "*")]), [])
+
+        # the items of a nested list excluded as a whole
+        exclude = [("p", "*", "t", "*")]
+        old = {"p": [{"t": [{"x": 1}]}]}
+        new = {"p": [{"t": [{"x": 2}]}, {"t": []}]}
+        self.assertEqual(diff_data(old, new, exclude=exclude),
+                         [Change(ADDED, ("p", 1), None, {"t": []})])
+        self.assertEqual(diff_data(old, {"p": [{"t": [{"x": 2}]}]}, exclude=exclude), [])
+
+    def test_diff_strains(self):
+        with (TEST_DATA_DIR / "valid.mirri.xlsx").open("rb") as fhand:
+            strain = list(parse_mirri_excel(fhand, version="20200601")["strains"])[0]
+        remote_strain = deepcopy(strain)
+        self.assertEqual(diff_entities(remote_strain, strain), [])
+
+        # the ids of the publications in the server are not compared
+        remote_strain.publications[0].id = 1000
+        self.assertEqual(diff_entities(remote_strain, strain), [])
+
+        pub = Publication()
+        pub.id = 3
+        pub.title = "New"
+        strain.publications = strain.publications + [pub]
+        strain.taxonomy.species = "other"
+        changes = diff_entities(remote_strain, strain)
+        self.assertEqual([(change.kind, change.path) for change in changes],
+                         [(CHANGED, ("taxonomy", "species", "name")),
+                          (ADDED, ("publications", 1))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,12 +4,14 @@ Created on 2020(e)ko abe. 2(a)
 @author: peio
 """
 
+import pickle
+from datetime import date
 import unittest
 
 from mirri.entities.publication import Publication
-from mirri.entities.date_range import DateRange
-from mirri.entities.location import Location
-from mirri.entities.sequence import GenomicSequence
+from mirri.entities.date_range import DateRange, DateRangeIndex, FrozenDateRange
+from mirri.entities.location import Location, intern_location
+from mirri.entities.sequence import GenomicSequence, NucleotideSequence
 from mirri.entities.strain import (
     Collect,
     Deposit,
@@ -23,6 +25,8 @@ from mirri.entities.strain import (
 from mirri.settings import (
     COLLECT,
     COUNTRY,
+    SITE,
+    DATE_OF_COLLECTION,
     DATE_OF_ISOLATION,
     DEPOSIT,
     DEPOSITOR,
@@ -37,6 +41,7 @@ from mirri.settings import (
     ORGANISM_TYPE,
     OTHER_CULTURE_NUMBERS,
     PLOIDY,
+    PUBLICATIONS,
     RECOMMENDED_GROWTH_MEDIUM,
     TAXONOMY,
     DATE_OF_INCLUSION, NO_RESTRICTION
@@ -88,6 +93,56 @@ class TestDataRange(unittest.TestCase):
         self.assertEqual(dr2.range["end"].day, 31)
 
 
+class TestFrozenDateRange(unittest.TestCase):
+    def test_frozen_date_range(self):
+        dr = FrozenDateRange.from_strfdate("201410--")
+        self.assertEqual(dr.strfdate, "201410--")
+        self.assertEqual(dr.range["end"], date(2014, 10, 31))
+        self.assertEqual(dr.start_ordinal, date(2014, 10, 1).toordinal())
+        with self.assertRaises(AttributeError):
+            dr._month = 11
+        self.assertEqual(dr.strpdate("2015").strfdate, "2015----")
+        self.assertEqual(dr.strfdate, "201410--")
+
+        self.assertEqual(dr, DateRange(year=2014, month=10).freeze())
+        self.assertNotEqual(dr, FrozenDateRange(2014, 10, 1))
+        self.assertEqual(len({dr, FrozenDateRange(2014, 10), DateRange(2014, 10).freeze()}), 1)
+        self.assertEqual(sorted([FrozenDateRange(2015), FrozenDateRange(2014, 10, 1),
+                                 FrozenDateRange(), dr]),
+                         [FrozenDateRange(), FrozenDateRange(2014, 10, 1), dr,
+                          FrozenDateRange(2015)])
+        self.assertIn(date(2014, 10, 12), dr)
+        self.assertTrue(dr.overlaps(DateRange(2014)))
+        self.assertFalse(dr.overlaps(DateRange(2015)))
+        self.assertEqual(pickle.loads(pickle.dumps(dr)), dr)
+        self.assertEqual(dr.thaw().strfdate, "201410--")
+
+    def test_date_range_index(self):
+        dates = [FrozenDateRange(2014), FrozenDateRange(2014, 10, 11),
+                 FrozenDateRange(2014, 10, 12), FrozenDateRange(2013, 12),
+                 FrozenDateRange(2020, 2, 29), FrozenDateRange()]
+        index = DateRangeIndex(dates)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(list(index)[0], FrozenDateRange(2013, 12))
+
+        nagoya = date(2014, 10, 12)
+        self.assertEqual(index.after(nagoya), [FrozenDateRange(2020, 2, 29)])
+        self.assertEqual(index.before(nagoya),
+                         [FrozenDateRange(2013, 12), FrozenDateRange(2014, 10, 11)])
+        self.assertEqual(index.overlapping(nagoya, nagoya),
+                         [FrozenDateRange(2014), FrozenDateRange(2014, 10, 12)])
+        self.assertEqual(index.overlapping(DateRange(2013, 12)),
+                         sorted(dates[:5]))
+        self.assertEqual(index.overlapping(end=date(2013, 12, 31)),
+                         [FrozenDateRange(2013, 12)])
+
+        strains = [Strain(), Strain()]
+        strains[0].collect.date = DateRange(1999, 5)
+        index = DateRangeIndex(strains, get_date=lambda strain: strain.collect.date)
+        self.assertEqual(index.overlapping(date(1999, 5, 3), date(1999, 5, 3)),
+                         [strains[0]])
+
+
 class TestCollect(unittest.TestCase):
     def test_collect_basic(self):
         collect = Collect()
@@ -122,6 +177,19 @@ class TestOrganismType(unittest.TestCase):
 
         org_type = OrganismType("Archaea")
 
+    def test_shared_instances(self):
+        org_type = OrganismType(3)
+        self.assertIs(org_type, OrganismType("Bacteria"))
+        self.assertIs(org_type, OrganismType("3"))
+        self.assertIs(org_type, pickle.loads(pickle.dumps(org_type)))
+        with self.assertRaises(AttributeError):
+            org_type.code = 4
+        self.assertEqual(OrganismType(3).name, "Bacteria")
+        with self.assertRaises(ValidationError):
+            OrganismType("Fungi")
+        with self.assertRaises(ValidationError):
+            OrganismType(10)
+
 
 class TestTaxonomy(unittest.TestCase):
     def test_taxonomy_basic(self):
@@ -152,6 +220,27 @@ class TestLocation(unittest.TestCase):
         loc.state = None
         self.assertEqual(loc.dict(), {COUNTRY: "esp"})
 
+    def test_hash_and_intern(self):
+        loc1 = Location({COUNTRY: "ESP", SITE: "Valencia"})
+        loc2 = Location({COUNTRY: "ESP", SITE: "Valencia"})
+        loc3 = Location({COUNTRY: "ESP", SITE: "Paterna"})
+        self.assertEqual(loc1, loc2)
+        self.assertEqual(hash(loc1), hash(loc2))
+        self.assertNotEqual(loc1, loc3)
+        self.assertEqual(len({loc1, loc2, loc3}), 2)
+        self.assertEqual(pickle.loads(pickle.dumps(loc1)), loc1)
+
+        self.assertIs(intern_location(loc1), loc1)
+        self.assertIs(intern_location(loc2), loc1)
+        self.assertIs(intern_location(loc3), loc3)
+        empty = Location()
+        self.assertIsNot(intern_location(Location()), intern_location(empty))
+
+        collect1, collect2 = Collect(), Collect()
+        collect1.location = intern_location(Location({COUNTRY: "ESP", SITE: "Sueca"}))
+        collect2.location = intern_location(Location({COUNTRY: "ESP", SITE: "Sueca"}))
+        self.assertIs(collect1.location, collect2.location)
+
 
 class TestStrain(unittest.TestCase):
     def test_empty_strain(self):
@@ -258,6 +347,50 @@ class TestStrain(unittest.TestCase):
 
         pprint.pprint(strain.dict())
 
+    def test_strain_is_frozen(self):
+        strain = Strain()
+        for entity in (strain, strain.id, strain.taxonomy, strain.collect,
+                       strain.collect.location, strain.isolation, strain.deposit,
+                       strain.growth, strain.genetics, Publication()):
+            self.assertFalse(hasattr(entity, "__dict__"))
+        try:
+            strain.collect.ko = "a"
+            self.fail()
+        except TypeError:
+            pass
+        # errors in the setters are not hidden
+        try:
+            strain.collect.habitat_ontobiotope = "OBT:11111"
+            self.fail()
+        except ValidationError:
+            pass
+
+        strain.id.number = "1"
+        strain.collect.location.country = "ESP"
+        copied = pickle.loads(pickle.dumps(strain))
+        self.assertEqual(copied.dict(), strain.dict())
+
+    def test_lazy_parts(self):
+        strain = Strain({COLLECT: {DATE_OF_COLLECTION: "1991----"}})
+        for part in (TAXONOMY, ISOLATION, DEPOSIT, GROWTH, GENETICS, PUBLICATIONS,
+                     OTHER_CULTURE_NUMBERS):
+            self.assertNotIn(part, strain._data)
+        self.assertNotIn(LOCATION, strain.collect._data)
+        self.assertEqual(strain.dict(), {COLLECT: {DATE_OF_COLLECTION: "1991----"}})
+
+        # the parts are built on first access, always the same instance
+        self.assertIs(strain.taxonomy, strain.taxonomy)
+        self.assertEqual(strain.publications, [])
+        self.assertFalse(strain.collect.location)
+        self.assertFalse(strain.collect.location.country)
+        # touched but empty parts are left out as before
+        self.assertEqual(strain.dict(), {COLLECT: {DATE_OF_COLLECTION: "1991----"}})
+
+        strain.collect.location.country = "ESP"
+        strain.publications.append(Publication({"id": "1"}))
+        self.assertEqual(strain.dict()[COLLECT][LOCATION], {COUNTRY: "ESP"})
+        self.assertEqual(len(strain.dict()[PUBLICATIONS]), 1)
+
     def test_strain_validation(self):
         strain = Strain()
         strain.form_of_supply = ['Lyo']
@@ -312,6 +445,32 @@ class TestGenomicSequence(unittest.TestCase):
         self.assertEqual(gen_seq.dict(), {
                          "marker_type": "16S rRNA", "INSDC": "pepe"})
 
+    def test_packed_sequence(self):
+        for sequence in ("", "A", "ACGTA", "aattgacgat", "ACNNGT-RYacg", "nnnn"):
+            packed = NucleotideSequence(sequence)
+            self.assertEqual(str(packed), sequence)
+            self.assertEqual(len(packed), len(sequence))
+            self.assertEqual(packed, sequence)
+            self.assertEqual(packed, NucleotideSequence(sequence))
+            self.assertEqual(hash(packed), hash(NucleotideSequence(sequence)))
+            self.assertEqual(pickle.loads(pickle.dumps(packed)), packed)
+        self.assertNotEqual(NucleotideSequence("ACGT"), NucleotideSequence("ACGA"))
+        self.assertNotEqual(NucleotideSequence("ACGT"), "acgt")
+        with self.assertRaises(AttributeError):
+            NucleotideSequence("ACGT")._length = 3
+
+        gen_seq = GenomicSequence()
+        gen_seq.marker_seq = "ACGTTGCAN"
+        self.assertIsInstance(gen_seq.packed_marker_seq, NucleotideSequence)
+        self.assertEqual(gen_seq.marker_seq, "ACGTTGCAN")
+        self.assertEqual(gen_seq.dict()["marker_seq"], "ACGTTGCAN")
+
+    def test_marker_types(self):
+        gen_seq = GenomicSequence()
+        gen_seq.marker_type = "ITS"
+        with self.assertRaises(ValidationError):
+            gen_seq.marker_type = "IT"
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'TestStrain']
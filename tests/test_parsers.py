@@ -1,7 +1,13 @@
 from mirri.entities.strain import ValidationError
+import os
 import unittest
 from pathlib import Path
 from pprint import pprint
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from mirri.io.parsers import mirri_excel
+from mirri.io.parsers.cache import ParseCache
 from mirri.io.parsers.mirri_excel import parse_mirri_excel
 
 TEST_DATA_DIR = Path(__file__).parent / "data"
@@ -25,6 +31,69 @@ class MirriExcelTests(unittest.TestCase):
         self.assertEqual(strain.id.number, "1")
         pprint(strain.dict())
 
+    def test_parser_returns_publications(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.xlsx"
+        with in_path.open("rb") as fhand:
+            parsed_data = parse_mirri_excel(fhand, version="20200601")
+        self.assertEqual(parsed_data["publications"][0].title, 'Cosa')
+
+    def test_mirri_excel_parser_cache(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.xlsx"
+        with TemporaryDirectory() as cache_dir:
+            cache = ParseCache(cache_dir)
+            with in_path.open("rb") as fhand:
+                parsed_data = parse_mirri_excel(fhand, version="20200601", cache=cache)
+            self.assertEqual(len(cache), 1)
+
+            with mock.patch.object(mirri_excel, "load_workbook") as load_workbook:
+                with in_path.open("rb") as fhand:
+                    cached_data = parse_mirri_excel(fhand, version="20200601",
+                                                    cache=cache)
+                load_workbook.assert_not_called()
+
+            self.assertEqual([strain.dict() for strain in cached_data["strains"]],
+                             [strain.dict() for strain in parsed_data["strains"]])
+            self.assertEqual([gm.dict() for gm in cached_data["growth_media"]],
+                             [gm.dict() for gm in parsed_data["growth_media"]])
+            self.assertEqual([pub.dict() for pub in cached_data["publications"]],
+                             [pub.dict() for pub in parsed_data["publications"]])
+
+            # a new parser version does not use the old entries
+            with mock.patch.object(mirri_excel, "PARSER_VERSION",
+                                   mirri_excel.PARSER_VERSION + 1):
+                with in_path.open("rb") as fhand:
+                    parse_mirri_excel(fhand, version="20200601", cache=cache)
+            self.assertEqual(len(cache), 2)
+
+    def test_cache_eviction_is_lru(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.xlsx"
+        with in_path.open("rb") as fhand:
+            parsed_data = parse_mirri_excel(fhand, version="20200601")
+        parsed_data["strains"] = list(parsed_data["strains"])
+
+        with TemporaryDirectory() as cache_dir:
+            cache = ParseCache(cache_dir)
+            for index, key in enumerate(("a", "b", "c")):
+                cache.set(key, parsed_data)
+                path = cache._get_path(key)
+                os.utime(path, (index, index))
+            entry_size = cache._get_path("a").stat().st_size
+
+            # a hit makes an entry the most recently used one
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNone(cache.get("missing"))
+
+            cache.max_size = entry_size * 2
+            self.assertEqual(cache.evict(), 1)
+            self.assertNotIn("b", cache)
+            self.assertIn("a", cache)
+            self.assertIn("c", cache)
+
+            # corrupted entries are misses
+            cache._get_path("c").write_bytes(b"garbage")
+            self.assertIsNone(cache.get("c"))
+            self.assertNotIn("c", cache)
+
     def xtest_mirri_excel_parser_invalid_fail(self):
         in_path = TEST_DATA_DIR / "invalid.mirri.xlsx"
         with in_path.open("rb") as fhand:
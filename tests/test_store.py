@@ -0,0 +1,91 @@
+import unittest
+from datetime import date
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from mirri.biolomics.serializers.strain import StrainMirri
+from mirri.entities.date_range import DateRange
+from mirri.io.parsers.mirri_excel import parse_mirri_excel
+from mirri.io.store import CatalogStore
+
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+class CatalogStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        with (TEST_DATA_DIR / "valid.mirri.xlsx").open("rb") as fhand:
+            self.parsed = parse_mirri_excel(fhand, version="20200601")
+        self.parsed["strains"] = list(self.parsed["strains"])
+
+    def test_ingest_and_get(self):
+        with CatalogStore() as store:
+            counts = store.ingest(self.parsed, batch_size=7)
+            self.assertEqual(counts, {"strains": 20, "growth_media": 10,
+                                      "publications": 2})
+            self.assertEqual(len(store), 20)
+            self.assertIn("TESTCC 1", store)
+
+            strain = store.get_strain("TESTCC 10")
+            self.assertIsInstance(strain, StrainMirri)
+            expected = [strain for strain in self.parsed["strains"]
+                        if strain.id.strain_id == "TESTCC 10"][0]
+            self.assertEqual(strain.dict(), expected.dict())
+            self.assertIsNone(store.get_strain("TESTCC 1000"))
+
+            self.assertEqual([gm.acronym for gm in store.iter_growth_media()][0], "1")
+            self.assertEqual([pub.title for pub in store.iter_publications()][0], "Cosa")
+
+            # the strains are replaced, not duplicated
+            store.add_strains(self.parsed["strains"][:3])
+            self.assertEqual(len(store), 20)
+            self.assertEqual(store.remove_strains(["TESTCC 1", "TESTCC 1000"]), 1)
+            self.assertEqual(len(store), 19)
+
+    def test_queries(self):
+        self.parsed["strains"][0].isolation.date = DateRange(year=1950)
+        with CatalogStore() as store:
+            store.ingest(self.parsed)
+            self.assertEqual(store.count_strains(genus="Bacillus"), 13)
+            self.assertEqual(store.count_strains(genus="Bacillus", species="subtilis"), 3)
+            self.assertEqual(store.count_strains(collection="TESTCC"), 20)
+            self.assertEqual(store.count_strains(organism_type="Bacteria"), 20)
+            self.assertEqual(store.count_strains(organism_type=3), 20)
+            self.assertEqual(store.count_strains(organism_type=4), 0)
+            self.assertEqual(store.count_strains(country="ESP"), 0)
+
+            strains = store.find_strains(isolated_from=date(2003, 1, 1),
+                                         isolated_to="2005-12-31")
+            self.assertEqual([strain.id.strain_id for strain in strains],
+                             ["TESTCC 16", "TESTCC 34"])
+            strains = store.find_strains(isolated_from="2006-05-01",
+                                         isolated_to="2006-05-01")
+            self.assertEqual([strain.id.strain_id for strain in strains],
+                             ["TESTCC 37"])
+            # a date without month and day matches the whole year
+            strains = store.find_strains(isolated_from="1950-06-15",
+                                         isolated_to="1950-06-16")
+            self.assertEqual([strain.id.strain_id for strain in strains],
+                             ["TESTCC 1"])
+            # and a year or a month given to a query too
+            strains = store.find_strains(isolated_from="2003", isolated_to="2005")
+            self.assertEqual([strain.id.strain_id for strain in strains],
+                             ["TESTCC 16", "TESTCC 34"])
+            self.assertEqual(store.count_strains(isolated_from="2006-05",
+                                                 isolated_to="2006-05"), 1)
+            with self.assertRaises(ValueError):
+                store.count_strains(isolated_to="05-2006")
+
+    def test_store_file_persists(self):
+        with TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "catalog.sqlite"
+            with CatalogStore(path) as store:
+                store.ingest(self.parsed)
+            with CatalogStore(path) as store:
+                self.assertEqual(len(store), 20)
+                strains = store.find_strains(genus="Halorubrum")
+                self.assertEqual(next(strains).id.strain_id, "TESTCC 16")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
 from datetime import datetime
+import csv
+import json
 import unittest
+from io import BytesIO, StringIO
+from zipfile import ZipFile
 from pathlib import Path
 from itertools import chain
 
+from openpyxl import load_workbook
+from openpyxl.comments import Comment
+
 from mirri.validation.tags import (
     CHOICES,
     COORDINATES,
@@ -34,6 +41,17 @@ from mirri.validation.excel_validator import (
     is_valid_file,
     validate_mirri_excel,
 )
+from mirri.validation.excel_annotator import annotate_excel
+from mirri.validation.error_logging import (
+    CSVRenderer,
+    Entity,
+    Error,
+    ErrorLog,
+    ErrorMessage,
+    JSONRenderer,
+    TextRenderer,
+    XLSXRenderer,
+)
 
 
 TEST_DATA_DIR = Path(__file__).parent / "data"
@@ -582,6 +600,236 @@ class ValidatoionFunctionsTest(unittest.TestCase):
                 assert_func(is_valid_file(value,))
 
 
+class ErrorLoggingTest(unittest.TestCase):
+
+    def test_error_message(self):
+        error = Error('std07', pk='CECT 1', data=5)
+        self.assertEqual(error.code, 'STD07')
+        self.assertEqual(error.entity.name, 'Strains')
+        self.assertIn('Accession Number CECT 1', error.message)
+        self.assertIn('Your value is 5', error.message)
+        self.assertEqual(ErrorMessage('STD07', 'CECT 1', 5).message,
+                         error.message)
+
+        self.assertEqual(Error('EFS01').message,
+                         "The 'Growth media' sheet is missing. Please check the provided excel template.")
+        try:
+            Error('STD99').message
+            self.fail()
+        except ValueError:
+            pass
+        try:
+            Entity('XXX').name
+            self.fail()
+        except KeyError:
+            pass
+
+    def test_render_error_log(self):
+        error_log = ErrorLog('test')
+        error_log.add_error(Error('STD04', pk='CECT1'))
+        error_log.add_error(Error('GOD04', pk='1'))
+        error_log.add_error(Error('STD22', pk='CECT 2'))
+
+        rendered = error_log.render()
+        self.assertEqual([r[:3] for r in rendered],
+                         [('STD', 'STD04', 'CECT1'), ('STD', 'STD22', 'CECT 2'),
+                          ('GOD', 'GOD04', '1')])
+        self.assertEqual(rendered[1][3], Error('STD22', pk='CECT 2').message)
+
+    def test_compact_error_storage(self):
+        error_log = ErrorLog('test')
+        for row in range(10, 9801):
+            error_log.add('STD07', pk=f'CECT {row}', data=4, sheet='Strains',
+                          field='Restrictions on use', row=row)
+        error_log.add('STD07', pk='CECT 1', data='4', row=5)
+        error_log.add_error(Error('GOD04', pk='1'))
+
+        self.assertEqual(len(error_log), 9793)
+        errors = error_log.get_errors()
+        self.assertEqual(list(errors.keys()), ['STD', 'GOD'])
+        first = errors['STD'][0]
+        self.assertEqual((first.code, first.pk, first.data, first.sheet, first.field, first.row),
+                         ('STD07', 'CECT 10', 4, 'Strains', 'Restrictions on use', 10))
+        # values of different type are not mixed
+        self.assertEqual(errors['STD'][-1].data, '4')
+        self.assertIsNone(errors['GOD'][0].row)
+
+        aggregates = error_log.get_aggregates()
+        self.assertEqual(str(aggregates[0]), 'STD07 in rows 5–9800 (9792 occurrences)')
+        self.assertEqual(str(aggregates[1]), 'GOD04 (1 occurrence)')
+
+    def test_max_errors_per_code(self):
+        error_log = ErrorLog('test', max_errors_per_code=2)
+        for row in range(2, 102):
+            error_log.add('STD22', pk=f'CECT {row}', row=row)
+
+        self.assertEqual(len(error_log), 2)
+        self.assertEqual(error_log.total_errors, 100)
+        self.assertEqual(str(error_log.get_aggregates()[0]),
+                         'STD22 in rows 2–101 (100 occurrences)')
+
+    def test_error_coordinates_in_validation(self):
+        in_path = TEST_DATA_DIR / "invalid_content.mirri.xlsx"
+        with in_path.open("rb") as fhand:
+            error_log = validate_mirri_excel(fhand)
+        errors = [error for error in error_log.iter_errors('STD')
+                  if error.code == 'STD11']
+        self.assertEqual(errors[0].sheet, 'Strains')
+        self.assertEqual(errors[0].field, 'Strain from a registered collection')
+        self.assertEqual(errors[0].row, 2)
+
+
+
+class ErrorLogRenderersTest(unittest.TestCase):
+    def setUp(self):
+        self.error_log = ErrorLog('test.xlsx', limit=2)
+        self.error_log.add('STD04', pk='CECT 1', sheet='Strains', row=2)
+        self.error_log.add('GOD04', pk='1', sheet='Geographic origin', row=3)
+        self.error_log.add('STD22', pk='CECT 2', sheet='Strains', row=3)
+        self.error_log.add('STD22', pk='CECT 3', sheet='Strains', row=9)
+
+    def test_text(self):
+        fhand = StringIO()
+        TextRenderer(fhand, group_by='entity').render(self.error_log)
+        lines = fhand.getvalue().splitlines()
+        self.assertEqual(lines[:4], ['Error Log for file test.xlsx', '', 'STD', '---'])
+        self.assertEqual(lines[4], 'CECT 1: ' + Error('STD04', pk='CECT 1').message + ' - STD04')
+        self.assertEqual(lines[-2:], ['---', '1: ' + Error('GOD04', pk='1').message + ' - GOD04'])
+
+        # __str__ groups the errors by entity, honours the limit and does not
+        # truncate the messages
+        lines = str(self.error_log).splitlines()
+        self.assertEqual(lines[2:4], ['STD', '---'])
+        self.assertEqual(lines[4], 'CECT 1: ' + Error('STD04', pk='CECT 1').message + ' - STD04')
+        self.assertEqual(lines[5], 'CECT 2: ' + Error('STD22', pk='CECT 2').message + ' - STD22')
+        self.assertEqual(lines[-1], '... 2 more not shown')
+
+        fhand = StringIO()
+        TextRenderer(fhand, group_by='code').render(self.error_log)
+        self.assertIn('STD22 in rows 3–9 (2 occurrences)', fhand.getvalue())
+
+    def test_json(self):
+        fhand = StringIO()
+        JSONRenderer(fhand).render(self.error_log)
+        report = json.loads(fhand.getvalue())
+        self.assertEqual(report['total_errors'], 4)
+        self.assertEqual([error['code'] for error in report['errors']],
+                         ['STD04', 'GOD04', 'STD22', 'STD22'])
+        self.assertEqual(report['errors'][1]['row'], 3)
+
+        fhand = StringIO()
+        JSONRenderer(fhand, group_by='entity', limit=2, offset=1).render(self.error_log)
+        report = json.loads(fhand.getvalue())
+        self.assertEqual(list(report['errors']), ['STD'])
+        self.assertEqual([error['pk'] for error in report['errors']['STD']],
+                         ['CECT 2', 'CECT 3'])
+        self.assertEqual(report['not_shown'], 1)
+
+        fhand = StringIO()
+        JSONRenderer(fhand, group_by='code').render(self.error_log)
+        report = json.loads(fhand.getvalue())
+        self.assertEqual(report['errors'][1], {'entity': 'GOD', 'code': 'GOD04', 'count': 1,
+                                               'first_row': 3, 'last_row': 3})
+
+    def test_csv(self):
+        fhand = StringIO()
+        written = CSVRenderer(fhand, offset=3).render(self.error_log)
+        self.assertEqual(written, 1)
+        rows = list(csv.reader(StringIO(fhand.getvalue())))
+        self.assertEqual(rows[0], ['entity', 'code', 'pk', 'message', 'sheet', 'field', 'row'])
+        self.assertEqual(rows[1][:3] + rows[1][4:], ['STD', 'STD22', 'CECT 3', 'Strains', '', '9'])
+
+    def test_xlsx(self):
+        fhand = BytesIO()
+        XLSXRenderer(fhand, group_by='entity').render(self.error_log)
+        fhand.seek(0)
+        workbook = load_workbook(fhand, read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Strains', 'Geographic Origin'])
+        rows = list(workbook['Strains'].values)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[3][2], 'CECT 3')
+        self.assertEqual(rows[3][6], 9)
+
+    def test_wrong_grouping(self):
+        try:
+            TextRenderer(StringIO(), group_by='sheet')
+            self.fail()
+        except ValueError:
+            pass
+
+
+class ExcelAnnotatorTest(unittest.TestCase):
+    def test_annotate_invalid_content(self):
+        in_path = TEST_DATA_DIR / "invalid_content.mirri.xlsx"
+        with in_path.open("rb") as fhand:
+            error_log = validate_mirri_excel(fhand)
+        out_fhand = BytesIO()
+        with in_path.open("rb") as fhand:
+            annotated_cells = annotate_excel(fhand, error_log, out_fhand)
+        self.assertEqual(annotated_cells, 13)
+
+        out_fhand.seek(0)
+        workbook = load_workbook(out_fhand)
+        cell = workbook["Strains"]["G2"]
+        self.assertEqual(cell.fill.fgColor.rgb, "FFFFC7CE")
+        self.assertTrue(cell.comment.text.startswith("STD11: "))
+        # the values are kept
+        original = load_workbook(in_path, read_only=True)
+        self.assertEqual(cell.value, original["Strains"]["G2"].value)
+
+        # untouched parts are copied as they are
+        with ZipFile(in_path) as in_zip, ZipFile(out_fhand) as out_zip:
+            for name in ("xl/sharedStrings.xml", "xl/worksheets/sheet3.xml"):
+                self.assertEqual(in_zip.read(name), out_zip.read(name))
+
+    def test_annotate_missing_cells(self):
+        error_log = ErrorLog("valid")
+        error_log.add("STD04", pk="CECT 1", sheet="Strains",
+                      field="Accession number", row=500)
+        error_log.add("STD07", pk="CECT 1", sheet="Strains",
+                      field="Restrictions on use", row=500)
+        error_log.add("STD43", pk="CECT 1", sheet="Strains", field="row", row=500)
+        # errors without row can not be placed
+        error_log.add("EFS01")
+
+        in_path = TEST_DATA_DIR / "valid.mirri.xlsx"
+        out_fhand = BytesIO()
+        with in_path.open("rb") as fhand:
+            annotated_cells = annotate_excel(fhand, error_log, out_fhand)
+        self.assertEqual(annotated_cells, 2)
+
+        out_fhand.seek(0)
+        sheet = load_workbook(out_fhand)["Strains"]
+        comment = sheet["A500"].comment.text
+        self.assertIn("STD04: ", comment)
+        self.assertIn("\nSTD43: ", comment)
+        commented = [cell.coordinate for row in sheet.iter_rows(min_row=500)
+                     for cell in row if cell.comment]
+        self.assertEqual(len(commented), 2)
+
+    def test_annotate_sheet_with_comments(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.xlsx"
+        workbook = load_workbook(in_path)
+        workbook["Strains"]["B1"].comment = Comment("a comment", "curator")
+        in_fhand = BytesIO()
+        workbook.save(in_fhand)
+        in_fhand.seek(0)
+
+        error_log = ErrorLog("valid")
+        error_log.add("STD04", pk="CECT 1", sheet="Strains",
+                      field="Accession number", row=2)
+        out_fhand = BytesIO()
+        with self.assertLogs("mirri.validation.excel_annotator", "WARNING") as logs:
+            self.assertEqual(annotate_excel(in_fhand, error_log, out_fhand), 1)
+        self.assertIn("1 cells with errors are highlighted without comment", logs.output[0])
+
+        out_fhand.seek(0)
+        sheet = load_workbook(out_fhand)["Strains"]
+        self.assertEqual(sheet["A2"].fill.fgColor.rgb, "FFFFC7CE")
+        self.assertIsNone(sheet["A2"].comment)
+        self.assertEqual(sheet["B1"].comment.text, "a comment")
+
+
 if __name__ == "__main__":
     import sys
     # sys.argv = ['',
@@ -1,8 +1,26 @@
 
+import csv
+import json
+import tempfile
 import unittest
+import zipfile
+import zlib
+from copy import deepcopy
 from pathlib import Path
-from mirri.io.writers.mirri_excel import write_mirri_excel
+from unittest.mock import patch
+
+from openpyxl import load_workbook
+
+from mirri.entities.publication import Publication
+from mirri.entities.strain import Strain
+from mirri.io.writers.exports import (CSV_FILES, DWC_CORE_FILE, DWC_META_FILE,
+                                      REFERENCES_FILE, write_csv_bundle, write_dwca,
+                                      write_jsonl)
+from mirri.io.writers.mirri_excel import _get_template_cache, write_mirri_excel
+from mirri.io.writers.xlsx import SegmentCache, crc32_combine
 from mirri.io.parsers.mirri_excel import parse_mirri_excel
+from mirri.settings import MIRRI_FIELDS
+from mirri.validation.error_logging import ErrorLog
 
 TEST_DATA_DIR = Path(__file__).parent / "data"
 
@@ -17,6 +35,229 @@ class MirriExcelTests(unittest.TestCase):
 
         write_mirri_excel(out_path, strains, growth_media, version="20200601")
 
+    def test_write_only(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        parsed_data = parse_mirri_excel(in_path.open('rb'), version="20200601")
+        strains = list(parsed_data["strains"])
+        growth_media = parsed_data["growth_media"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "test.xlsx"
+            write_mirri_excel(path, strains, growth_media, version="20200601")
+            stream_path = Path(tmp_dir) / "test.stream.xlsx"
+            # the strains can be given by a generator
+            write_mirri_excel(stream_path, iter(strains), growth_media,
+                              version="20200601", write_only=True)
+
+            self.assert_same_workbooks(path, stream_path)
+
+    def test_parallel_engine(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        parsed_data = parse_mirri_excel(in_path.open('rb'), version="20200601")
+        strains = list(parsed_data["strains"])
+        growth_media = parsed_data["growth_media"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "test.xlsx"
+            write_mirri_excel(path, strains, growth_media, version="20200601")
+            for compress_level in (0, 6):
+                parallel_path = Path(tmp_dir) / f"test.{compress_level}.xlsx"
+                # several segments per sheet
+                with patch("mirri.io.writers.mirri_excel.ROWS_PER_SEGMENT", 4):
+                    write_mirri_excel(parallel_path, iter(strains), growth_media,
+                                      version="20200601", engine="parallel",
+                                      processes=2, compress_level=compress_level)
+                with zipfile.ZipFile(parallel_path) as zip_file:
+                    self.assertIsNone(zip_file.testzip())
+                    compress_types = {info.compress_type for info in zip_file.infolist()}
+                expected = zipfile.ZIP_STORED if compress_level == 0 else zipfile.ZIP_DEFLATED
+                self.assertEqual(compress_types, {expected})
+                self.assert_same_workbooks(path, parallel_path)
+
+        with self.assertRaises(ValueError):
+            write_mirri_excel(path, strains, growth_media, version="20200601",
+                              engine="xlsxwriter")
+
+    def test_template_cache(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        parsed_data = parse_mirri_excel(in_path.open('rb'), version="20200601")
+        strains = list(parsed_data["strains"])
+        growth_media = parsed_data["growth_media"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir) / "templates"
+            path = Path(tmp_dir) / "test.xlsx"
+            write_mirri_excel(path, strains, growth_media, version="20200601")
+            for num_write in range(2):
+                parallel_path = Path(tmp_dir) / f"test.{num_write}.xlsx"
+                # as in a new process, the segments are read from the disk
+                _get_template_cache.cache_clear()
+                write_mirri_excel(parallel_path, strains, growth_media,
+                                  version="20200601", engine="parallel",
+                                  processes=1, template_cache_dir=cache_dir)
+                segment_paths = sorted(cache_dir.glob("*.segment"))
+                self.assertEqual([path.name.split("-")[0] for path in segment_paths],
+                                 ["Markers", "Ontobiotope"])
+                if num_write:
+                    self.assertEqual([path.stat().st_mtime_ns for path in segment_paths],
+                                     mtimes)
+                mtimes = [path.stat().st_mtime_ns for path in segment_paths]
+                self.assert_same_workbooks(path, parallel_path)
+
+            key, compress_level = segment_paths[0].stem.rsplit(".", 1)
+            segment = SegmentCache(cache_dir).get(key, get_chunks=None,
+                                                  compress_level=int(compress_level))
+            self.assertTrue(segment.data)
+
+    def test_crc32_combine(self):
+        data = b"<row r='1'><c r='A1'><v>1</v></c></row>" * 100
+        for split in (0, 1, 57, len(data)):
+            self.assertEqual(crc32_combine(zlib.crc32(data[:split]),
+                                           zlib.crc32(data[split:]), len(data) - split),
+                             zlib.crc32(data))
+
+    def assert_same_workbooks(self, path1, path2):
+        workbook1 = load_workbook(path1)
+        workbook2 = load_workbook(path2)
+        self.assertEqual(workbook1.sheetnames, workbook2.sheetnames)
+        for sheet1 in workbook1:
+            sheet2 = workbook2[sheet1.title]
+            self.assertEqual(list(sheet1.values), list(sheet2.values))
+            widths1 = {col: dim.width for col, dim in sheet1.column_dimensions.items()}
+            widths2 = {col: dim.width for col, dim in sheet2.column_dimensions.items()}
+            self.assertEqual(widths1, widths2)
+
+    def test_references_to_missing_entities(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        parsed_data = parse_mirri_excel(in_path.open('rb'), version="20200601")
+        growth_media = parsed_data["growth_media"]
+        # no location and a growth medium that is not in the growth media sheet
+        strain = Strain()
+        strain.id.collection = "CECT"
+        strain.id.number = "1"
+        strain.growth.recommended_media = ["AAA"]
+        strain.collect.habitat = "soil"
+        error_log = ErrorLog("test.xlsx")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "test.xlsx"
+            write_mirri_excel(path, [strain], growth_media, version="20200601",
+                              error_log=error_log)
+            header, row = load_workbook(path)["Strains"].values
+
+        errors = list(error_log.iter_errors())
+        self.assertEqual([(error.code, error.pk, error.data, error.row) for error in errors],
+                         [("STD35", "CECT 1", "AAA", 2)])
+        self.assertEqual(len(row), len(MIRRI_FIELDS))
+        self.assertEqual(row[header.index("Isolation habitat")], "soil")
+        self.assertIsNone(row[header.index("Geographic origin")])
+
+    def test_repeated_accession_number(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        parsed_data = parse_mirri_excel(in_path.open('rb'), version="20200601")
+        growth_media = parsed_data["growth_media"]
+        strains = [strain for strain in parsed_data["strains"] if strain.genetics.markers]
+        first, second = strains[:2]
+        # the markers of the last strain with the accession number are kept
+        repeated = deepcopy(second)
+        repeated.id.collection = first.id.collection
+        repeated.id.number = first.id.number
+        strains.append(repeated)
+        # a last strain without markers removes them
+        without_markers = deepcopy(strains[2])
+        without_markers.genetics.markers = []
+        strains.append(without_markers)
+        expected = [(first.id.strain_id, marker.marker_type, marker.marker_id,
+                     marker.marker_seq) for marker in second.genetics.markers]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for engine in ("openpyxl", "parallel"):
+                path = Path(tmp_dir) / f"test.{engine}.xlsx"
+                write_mirri_excel(path, strains, growth_media, version="20200601",
+                                  engine=engine, processes=1)
+                rows = list(load_workbook(path)["Genomic information"].values)[1:]
+                # in the place of the first strain
+                self.assertEqual(rows[:len(expected)], expected)
+                self.assertEqual(sum(row[0] == first.id.strain_id for row in rows),
+                                 len(expected))
+                self.assertNotIn(strains[2].id.strain_id, [row[0] for row in rows])
+
+
+class ExportsTests(unittest.TestCase):
+    def setUp(self):
+        in_path = TEST_DATA_DIR / "valid.mirri.full.xlsx"
+        parsed_data = parse_mirri_excel(in_path.open('rb'), version="20200601")
+        self.strains = list(parsed_data["strains"])
+        self.growth_media = parsed_data["growth_media"]
+
+    def test_csv_bundle(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "test.xlsx"
+            write_mirri_excel(path, self.strains, self.growth_media, version="20200601")
+            bundle_dir = Path(tmp_dir) / "bundle"
+            num_strains = write_csv_bundle(bundle_dir, iter(self.strains), self.growth_media)
+            self.assertEqual(num_strains, len(self.strains))
+
+            workbook = load_workbook(path)
+            for sheet, fname in CSV_FILES.items():
+                with (bundle_dir / fname).open(newline="") as fhand:
+                    csv_rows = list(csv.reader(fhand))
+                sheet_rows = [["" if value is None else str(value) for value in row]
+                              for row in workbook[sheet].values]
+                self.assertEqual(csv_rows, sheet_rows)
+
+    def test_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "strains.jsonl"
+            self.assertEqual(write_jsonl(path, iter(self.strains)), len(self.strains))
+            with path.open() as fhand:
+                records = [json.loads(line) for line in fhand]
+
+        self.assertEqual([record["Accession number"] for record in records],
+                         [strain.id.strain_id for strain in self.strains])
+        record = records[0]
+        self.assertEqual(record["Taxon name"], "Bacillus alcalophilus")
+        self.assertEqual(record["Literature"][0]["Title"], "Cosa")
+        self.assertEqual(record["Genomic information"],
+                         [{"Marker": "16S rRNA", "INSDC AN": "X76436"}])
+        self.assertNotIn(None, record.values())
+
+    def test_dwca(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "strains.zip"
+            self.assertEqual(write_dwca(path, iter(self.strains)), len(self.strains))
+            with zipfile.ZipFile(path) as zip_file:
+                meta = zip_file.read(DWC_META_FILE).decode()
+                core = list(csv.reader(zip_file.read(DWC_CORE_FILE).decode().splitlines(),
+                                       delimiter="\t"))
+                references = list(csv.reader(
+                    zip_file.read(REFERENCES_FILE).decode().splitlines(), delimiter="\t"))
+
+        self.assertIn(f"<location>{DWC_CORE_FILE}</location>", meta)
+        header, row = core[0], core[1]
+        self.assertEqual(len(core), len(self.strains) + 1)
+        record = dict(zip(header, row))
+        self.assertEqual(record["id"], "TESTCC 1")
+        self.assertEqual(record["http://rs.tdwg.org/dwc/terms/countryCode"], "ES")
+        self.assertEqual(record["http://rs.tdwg.org/dwc/terms/eventDate"], "1921-12-12")
+        self.assertEqual([row[0] for row in references[1:]], ["TESTCC 1", "TESTCC 12"])
+
+    def test_dwca_publication_without_full_reference(self):
+        strain = Strain()
+        strain.id.collection = "CECT"
+        strain.id.number = "1"
+        publication = Publication()
+        publication.id = 1
+        publication.title = "A title"
+        strain.publications = [publication]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "strains.zip"
+            self.assertEqual(write_dwca(path, [strain]), 1)
+            with zipfile.ZipFile(path) as zip_file:
+                references = list(csv.reader(
+                    zip_file.read(REFERENCES_FILE).decode().splitlines(), delimiter="\t"))
+        self.assertEqual(references[1][:4], ["CECT 1", "1", "", "A title"])
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['',